@@ -0,0 +1,10 @@
+"""
+Benchmarks for the record_validator package.
+
+Modules:
+    generator:
+        Functions to generate synthetic vendor records for each record type.
+    run:
+        Functions to time each stage of validation and report throughput and peak
+        memory. Run with `python -m benchmarks`.
+"""
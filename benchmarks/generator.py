@@ -0,0 +1,244 @@
+"""
+This module contains functions to generate synthetic shelf-ready vendor records.
+
+Functions:
+    generate_record:
+        Generate a single `pymarc.Record` of a given record type.
+    generate_records:
+        Generate a list of records of a given record type.
+
+Constants:
+    RECORD_TYPES:
+        The record types returned by `get_record_type` that can be generated.
+    ERROR_KINDS:
+        The kinds of errors that can be introduced into a generated record.
+"""
+
+import random
+from typing import Callable, Dict, List, Union
+
+from pymarc import Field as MarcField
+from pymarc import Indicators, Record, Subfield
+
+from record_validator.constants import ValidOrderItems
+
+RECORD_TYPES = (
+    "evp_monograph",
+    "leila_monograph",
+    "auxam_monograph",
+    "evp_other",
+    "leila_other",
+    "auxam_other",
+)
+
+FILLER_TAGS = ["100", "245", "250", "264", "490", "500", "504", "650", "700", "830"]
+
+
+def _data_field(
+    tag: str, indicators: List[str], subfields: Dict[str, str]
+) -> MarcField:
+    return MarcField(
+        tag=tag,
+        indicators=Indicators(*indicators),
+        subfields=[
+            Subfield(code=code, value=value) for code, value in subfields.items()
+        ],
+    )
+
+
+def _item_field(
+    rng: random.Random, vendor: str, item_location: str, item_type: Union[str, None]
+) -> MarcField:
+    subfields = {
+        "z": "8528",
+        "a": f"ReCAP 24-{rng.randint(0, 999999):06d}",
+        "c": "1",
+        "h": "43",
+        "i": f"33433{rng.randint(0, 999999999):09d}",
+        "l": item_location,
+        "p": f"{rng.randint(1, 99)}.00",
+        "v": vendor,
+    }
+    if item_type is not None:
+        subfields["t"] = item_type
+    return _data_field("949", [" ", "1"], subfields)
+
+
+def _remove_invoice(record: Record, rng: random.Random) -> None:
+    record.remove_fields("980")
+
+
+def _bad_order_location(record: Record, rng: random.Random) -> None:
+    record["960"].delete_subfield("t")
+    record["960"].add_subfield("t", "XYZ")
+
+
+def _bad_invoice_date(record: Record, rng: random.Random) -> None:
+    record["980"].delete_subfield("a")
+    record["980"].add_subfield("a", "2024-01-01")
+
+
+def _bad_barcode(record: Record, rng: random.Random) -> None:
+    items = record.get_fields("949")
+    if not items:
+        return _bad_invoice_date(record, rng)
+    item = rng.choice(items)
+    item.delete_subfield("i")
+    item.add_subfield("i", "12345")
+
+
+def _order_item_mismatch(record: Record, rng: random.Random) -> None:
+    if not record.get_fields("949"):
+        return _remove_invoice(record, rng)
+    item_location, item_type = record["949"].get("l"), record["949"].get("t")
+    locations = sorted({i["order_location"] for i in ValidOrderItems.to_list()})
+    record["960"].delete_subfield("t")
+    record["960"].add_subfield(
+        "t",
+        rng.choice(
+            [
+                i
+                for i in locations
+                if not ValidOrderItems.is_valid(i, item_location, item_type)
+            ]
+        ),
+    )
+
+
+ERROR_KINDS: Dict[str, Callable[[Record, random.Random], None]] = {
+    "missing_field": _remove_invoice,
+    "literal_error": _bad_order_location,
+    "string_pattern_mismatch": _bad_invoice_date,
+    "string_too_short": _bad_barcode,
+    "order_item_mismatch": _order_item_mismatch,
+}
+
+
+def generate_record(
+    record_type: str,
+    size: int = 30,
+    items: int = 1,
+    error_rate: float = 0.0,
+    rng: Union[random.Random, None] = None,
+) -> Record:
+    """
+    Generate a synthetic vendor record that `get_record_type` identifies as
+    `record_type`.
+
+    Args:
+        record_type: one of `RECORD_TYPES` (eg. "evp_monograph")
+        size:
+            the minimum number of fields in the record. Generic data fields are
+            added until the record reaches this size.
+        items: the number of 949 item fields in a monograph record
+        error_rate:
+            the probability that one error from `ERROR_KINDS` is introduced
+        rng: a `random.Random` instance used to generate values
+
+    Returns:
+        a `pymarc.Record`
+    """
+    if record_type not in RECORD_TYPES:
+        raise ValueError(f"Unknown record type: {record_type}")
+    rng = rng or random.Random()
+    vendor, material_type = record_type.split("_")
+    vendor = vendor.upper()
+    record = Record()
+    record.leader = "00000cam a2200000 a 4500"
+    record.add_field(MarcField(tag="001", data=f"ocn{rng.randint(0, 999999999):09d}"))
+    record.add_field(MarcField(tag="003", data="OCoLC"))
+    record.add_field(MarcField(tag="005", data="20240101125000.0"))
+    record.add_field(
+        MarcField(tag="008", data="210505s2021    nyu           000 0 eng d")
+    )
+    record.add_field(_data_field("050", [" ", "4"], {"a": "PJ7962.H565"}))
+    record.add_field(_data_field("245", ["0", "0"], {"a": "Title :", "b": "subtitle"}))
+    if material_type == "other" and vendor != "AUXAM":
+        extent = rng.choice(["5 pages", "3 volumes", "40 p."])
+    else:
+        extent = f"{rng.randint(50, 900)} pages :"
+    record.add_field(_data_field("300", [" ", " "], {"a": extent}))
+    if material_type == "monograph":
+        order_item = rng.choice(
+            [i for i in ValidOrderItems.to_list() if i["item_location"] is not None]
+        )
+        record.add_field(
+            _data_field(
+                "852", ["8", " "], {"h": f"ReCAP 24-{rng.randint(0, 999999):06d}"}
+            )
+        )
+    elif vendor == "AUXAM":
+        order_item = ValidOrderItems.MAB.value
+        record.add_field(_data_field("852", ["8", " "], {"h": "ReCAP 24-"}))
+    else:
+        order_item = ValidOrderItems.MAB.value
+    record.add_field(_data_field("901", [" ", " "], {"a": vendor}))
+    record.add_field(_data_field("910", [" ", " "], {"a": "RL"}))
+    if material_type == "monograph":
+        for _ in range(items):
+            record.add_field(
+                _item_field(
+                    rng, vendor, order_item["item_location"], order_item["item_type"]
+                )
+            )
+    record.add_field(
+        _data_field(
+            "960",
+            [" ", " "],
+            {"s": "100", "t": order_item["order_location"], "u": "41901apprv"},
+        )
+    )
+    record.add_field(
+        _data_field(
+            "980",
+            [" ", " "],
+            {
+                "a": "240101",
+                "b": "100",
+                "c": "0",
+                "d": "0",
+                "e": "100",
+                "f": f"{rng.randint(0, 99999999):08d}",
+                "g": "1",
+            },
+        )
+    )
+    while len(record.fields) < size:
+        tag = rng.choice(FILLER_TAGS)
+        record.add_ordered_field(
+            _data_field(tag, [" ", "0"], {"a": f"Filler {tag}", "x": "Subdivision"})
+        )
+    if rng.random() < error_rate:
+        ERROR_KINDS[rng.choice(sorted(ERROR_KINDS))](record, rng)
+    return record
+
+
+def generate_records(
+    record_type: str,
+    count: int,
+    size: int = 30,
+    items: int = 1,
+    error_rate: float = 0.0,
+    seed: Union[int, None] = 0,
+) -> List[Record]:
+    """
+    Generate a list of synthetic vendor records of a single record type.
+
+    Args:
+        record_type: one of `RECORD_TYPES` (eg. "evp_monograph")
+        count: the number of records to generate
+        size: the minimum number of fields in each record
+        items: the number of 949 item fields in each monograph record
+        error_rate: the probability that each record contains an error
+        seed: a seed for the random number generator
+
+    Returns:
+        a list of `pymarc.Record` objects
+    """
+    rng = random.Random(seed)
+    return [
+        generate_record(
+            record_type, size=size, items=items, error_rate=error_rate, rng=rng
+        )
+        for _ in range(count)
+    ]
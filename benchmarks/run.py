@@ -0,0 +1,209 @@
+"""
+This module times each stage of validation against synthetic vendor records and
+reports throughput and peak memory.
+
+Functions:
+    time_stage:
+        Time a single stage of validation and measure its peak memory.
+    run_benchmarks:
+        Time each stage for each record type and return the results.
+    format_results:
+        Format benchmark results as a plain text table.
+    main:
+        Parse command line arguments, run the benchmarks and print the results.
+
+Constants:
+    STAGES:
+        The stages of validation that are timed.
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Sequence, Union
+
+from pydantic import ValidationError
+from pydantic_core import ErrorDetails
+from pymarc import Record
+
+from benchmarks.generator import RECORD_TYPES, generate_records
+from record_validator.adapters import ADAPTER_REGISTRY
+from record_validator.marc_errors import MarcValidationError, get_examples_index
+from record_validator.marc_models import RecordModel
+from record_validator.rules import get_rule_set
+from record_validator.utils import get_record_type
+from record_validator.validators import validate_all
+
+
+def _model_validate(record: Record) -> Any:
+    try:
+        return RecordModel.model_validate(
+            {"leader": str(record.leader), "fields": record.fields}
+        )
+    except ValidationError as e:
+        return e
+
+
+def _validate_all(record: Record) -> Any:
+    try:
+        return validate_all(record.fields)
+    except ValidationError as e:
+        return e
+
+
+def _validate_all_rules(record: Record) -> Any:
+    try:
+        return validate_all(record.fields, engine="rules")
+    except ValidationError as e:
+        return e
+
+
+def _get_errors(record: Record) -> List[ErrorDetails]:
+    try:
+        RecordModel(leader=record.leader, fields=record.fields)
+    except ValidationError as e:
+        return e.errors()
+    return []
+
+
+STAGES: Dict[str, Callable[[Any], Any]] = {
+    "RecordModel.model_validate": _model_validate,
+    "validate_all": _validate_all,
+    "validate_all (rules)": _validate_all_rules,
+    "get_record_type": lambda record: get_record_type(record.fields),
+    "MarcValidationError": MarcValidationError,
+}
+
+
+def time_stage(
+    stage: Callable[[Any], Any], inputs: Sequence[Any], repeat: int = 1
+) -> Dict[str, float]:
+    """
+    Time a stage of validation and measure its peak memory.
+
+    Args:
+        stage: a function that is called once for each input
+        inputs: a list of inputs to the stage
+        repeat: the number of times to time the stage; the fastest run is reported
+
+    Returns:
+        a dictionary with the elapsed time in seconds, the number of inputs
+        processed per second and the peak memory allocated in KiB
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in inputs:
+            stage(i)
+        timings.append(time.perf_counter() - start)
+    elapsed = min(timings)
+    tracemalloc.start()
+    try:
+        for i in inputs:
+            stage(i)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds": elapsed,
+        "records_per_sec": len(inputs) / elapsed if elapsed else float("inf"),
+        "peak_memory_kib": peak / 1024,
+    }
+
+
+def run_benchmarks(
+    record_types: Sequence[str] = RECORD_TYPES,
+    count: int = 1000,
+    size: int = 30,
+    items: int = 1,
+    error_rate: float = 0.1,
+    seed: Union[int, None] = 0,
+    repeat: int = 1,
+) -> List[Dict[str, Any]]:
+    """
+    Generate records for each record type and time each stage in `STAGES`.
+    Adapters and the examples index are built before timing starts so that the
+    results reflect steady-state throughput.
+
+    Args:
+        record_types: the record types to generate
+        count: the number of records to generate for each record type
+        size: the minimum number of fields in each record
+        items: the number of 949 item fields in each monograph record
+        error_rate: the probability that each record contains an error
+        seed: a seed for the random number generator
+        repeat: the number of times to time each stage
+
+    Returns:
+        a list of dictionaries with the results for each record type and stage
+    """
+    ADAPTER_REGISTRY.warm()
+    for record_type in record_types:
+        get_rule_set(record_type)
+    get_examples_index(by_alias=True)
+    get_examples_index(by_alias=False)
+    results = []
+    for record_type in record_types:
+        records = generate_records(
+            record_type,
+            count,
+            size=size,
+            items=items,
+            error_rate=error_rate,
+            seed=seed,
+        )
+        error_lists = [i for i in (_get_errors(r) for r in records) if i]
+        for name, stage in STAGES.items():
+            inputs = error_lists if name == "MarcValidationError" else records
+            result: Dict[str, Any] = {
+                "record_type": record_type,
+                "stage": name,
+                "records": len(inputs),
+            }
+            if inputs:
+                result.update(time_stage(stage, inputs, repeat=repeat))
+            results.append(result)
+    return results
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    """Format benchmark results as a plain text table."""
+    header = f"{'record type':<16}{'stage':<28}{'records':>8}"
+    header += f"{'records/sec':>14}{'peak KiB':>12}"
+    lines = [header, "-" * len(header)]
+    for i in results:
+        line = f"{i['record_type']:<16}{i['stage']:<28}{i['records']:>8}"
+        if "records_per_sec" in i:
+            line += f"{i['records_per_sec']:>14.1f}{i['peak_memory_kib']:>12.1f}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Union[List[str], None] = None) -> None:
+    """Parse command line arguments, run the benchmarks and print the results."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Time each stage of validation against synthetic records.",
+    )
+    parser.add_argument(
+        "--types", nargs="+", default=RECORD_TYPES, choices=RECORD_TYPES
+    )
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=30)
+    parser.add_argument("--items", type=int, default=1)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+    results = run_benchmarks(
+        record_types=args.types,
+        count=args.count,
+        size=args.size,
+        items=args.items,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        repeat=args.repeat,
+    )
+    print(json.dumps(results, indent=2) if args.json else format_results(results))
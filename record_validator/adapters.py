@@ -2,11 +2,24 @@
 This module contains functions and types that are used in the record_validator package
 to identify the correct model to validate a field against.
 
+Classes:
+    AdapterRegistry:
+        A thread-safe, process-wide cache of `TypeAdapter` objects. Each adapter
+        is built once, either lazily on first use or eagerly with `warm`, and the
+        time spent building it is recorded.
+    TagTable:
+        The classification of every three-digit tag in a record type, along with
+        the tags that are required, not allowed and not repeatable.
+
 Functions:
     get_adapter: Return a TypeAdapter for the correct model based on the material
         type and vendor.
+    get_adapter_key: Return the name of the field tuple used to build the adapter
+        for a record type.
     tag_discriminator: Get the tag of a field to use as a discriminator for the
         TypeAdapter.
+    get_tag_table: Return the `TagTable` for a record type.
+    get_matching_tags: Return the three-digit tags that match a pattern.
 
 Types:
     AuxOtherFields:
@@ -24,14 +37,26 @@ Types:
     FieldList:
         A tuple of all possible fields that can be present in a record.
 
+Constants:
+    ADAPTER_REGISTRY:
+        The `AdapterRegistry` shared by all callers of `get_adapter`.
+    MODEL_TAGS:
+        The tags of fields that are validated with a specific model.
+    TAGS:
+        The set of every three-digit MARC tag, from "000" to "999".
+
 """
 
-from typing import Annotated, Union
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Annotated, Any, Dict, FrozenSet, Iterable, Tuple, Union, get_args
 
 from pydantic import Discriminator, Tag, TypeAdapter
 from pymarc import Field as MarcField
 
-from record_validator.constants import AllFields
+from record_validator.constants import AllFields, TagClass
 from record_validator.field_models import (
     AuxBibCallNo,
     BibCallNo,
@@ -52,12 +77,114 @@ from record_validator.field_models import (
 )
 
 
+class AdapterRegistry:
+    """
+    A thread-safe cache of `TypeAdapter` objects keyed by the name of the tuple of
+    field models they are built from. Building a `TypeAdapter` requires pydantic to
+    construct a core schema for every model in the union, so each adapter is built
+    exactly once per process and reused for every record that follows.
+
+    Attributes:
+        keys: the names of the field tuples that adapters can be built from.
+    """
+
+    keys = ("AuxOtherFields", "MonographFields", "OtherFields", "FieldList")
+
+    def __init__(self) -> None:
+        self._adapters: Dict[str, TypeAdapter] = {}
+        self._build_times: Dict[str, float] = {}
+        self._hits: Dict[str, int] = {key: 0 for key in self.keys}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> TypeAdapter:
+        """
+        Return the adapter for a field tuple, building it if this is the first
+        time it has been requested.
+
+        Args:
+            key: the name of a field tuple (eg. "MonographFields").
+
+        Returns:
+            the `TypeAdapter` for the field tuple.
+
+        Raises:
+            KeyError: if `key` is not the name of a field tuple.
+        """
+        with self._lock:
+            adapter = self._adapters.get(key)
+            if adapter is None:
+                adapter = self._build(key)
+            self._hits[key] += 1
+        return adapter
+
+    def warm(self, keys: Union[Iterable[str], None] = None) -> None:
+        """
+        Build adapters ahead of time so that the first record validated does not
+        pay for schema construction. All adapters are built if `keys` is None.
+        """
+        for key in self.keys if keys is None else keys:
+            if key not in self._adapters:
+                with self._lock:
+                    if key not in self._adapters:
+                        self._build(key)
+
+    def clear(self) -> None:
+        """Discard all built adapters and reset the stats."""
+        with self._lock:
+            self._adapters.clear()
+            self._build_times.clear()
+            self._hits = {key: 0 for key in self.keys}
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the build stats for the registry.
+
+        Returns:
+            a dictionary containing the names of the adapters that have been built,
+            the time in seconds spent building each adapter, the total build time
+            and the number of times each adapter has been requested.
+        """
+        with self._lock:
+            return {
+                "built": [key for key in self.keys if key in self._adapters],
+                "build_times": dict(self._build_times),
+                "total_build_time": sum(self._build_times.values()),
+                "hits": dict(self._hits),
+            }
+
+    def _build(self, key: str) -> TypeAdapter:
+        """Build an adapter and record how long it took. Caller holds the lock."""
+        fields: tuple
+        match key:
+            case "AuxOtherFields":
+                fields = AuxOtherFields
+            case "MonographFields":
+                fields = MonographFields
+            case "OtherFields":
+                fields = OtherFields
+            case "FieldList":
+                fields = FieldList
+            case _:
+                raise KeyError(key)
+        start = time.perf_counter()
+        if key == "FieldList":
+            adapter: TypeAdapter = TypeAdapter(Union[fields])
+        else:
+            adapter = TypeAdapter(
+                Annotated[Union[fields], Discriminator(tag_discriminator)]
+            )
+        self._build_times[key] = time.perf_counter() - start
+        self._adapters[key] = adapter
+        return adapter
+
+
 def get_adapter(record_type: Union[str, None]) -> TypeAdapter:
     """
     Return a `TypeAdapter` for the correct model based on the material type and
     vendor. The `TypeAdapter` will contain a union of models for valid fields in
     the specified record type. Certain fields require slightly different models
-    based on the vendor and/or material type.
+    based on the vendor and/or material type. Adapters are built once and cached
+    in `ADAPTER_REGISTRY`.
 
     Args:
         record_type: string that combines the material type and vendor of the record.
@@ -65,33 +192,128 @@ def get_adapter(record_type: Union[str, None]) -> TypeAdapter:
     Returns:
         a TypeAdapter for the correct model based on the record_type.
     """
-    fields: tuple
-    discriminator = True
+    return ADAPTER_REGISTRY.get(get_adapter_key(record_type))
+
+
+def get_adapter_key(record_type: Union[str, None]) -> str:
+    """Return the name of the field tuple used to validate a record type."""
     match record_type:
         case "auxam_other":
-            fields = AuxOtherFields
+            return "AuxOtherFields"
         case "evp_other" | "leila_other" | "other":
-            fields = OtherFields
+            return "OtherFields"
         case None:
-            fields = FieldList
-            discriminator = False
+            return "FieldList"
         case _:
-            fields = MonographFields
-    if discriminator:
-        return TypeAdapter(Annotated[Union[fields], Discriminator(tag_discriminator)])
-    else:
-        return TypeAdapter(Union[fields])
+            return "MonographFields"
 
 
 def tag_discriminator(field: Union[MarcField, dict]) -> str:
     """Get the tag of a field to use as a discriminator for the TypeAdapter."""
     tag = field.tag if isinstance(field, MarcField) else list(field.keys())[0]
-    if tag in [i.value for i in AllFields]:
+    if tag in MODEL_TAGS:
         return tag
     else:
         return "data_field"
 
 
+class TagTable:
+    """
+    The classification of every three-digit tag in a record type. A tag is a
+    control field, a field with a specific model, a data field that is validated
+    with the generic data field model or a forbidden field. Forbidden fields are
+    extra fields in the record type and fields whose tag does not match the
+    pattern of the generic data field model. Tags are looked up in a dict, so
+    the discriminator, `validators.validate_tags` and `iso2709.precheck` do not
+    build lists of tags or run the pattern of the data field model for each
+    field.
+
+    Args:
+        record_type: the record type returned by `utils.get_record_type`
+
+    Attributes:
+        record_type: the record type
+        required: the tags of fields that are required in the record type
+        extra: the tags of fields that are not allowed in the record type
+        non_repeatable: the tags of fields that must not be repeated
+        classes: a dict mapping each tag in `TAGS` to its `TagClass`
+    """
+
+    def __init__(self, record_type: str):
+        self.record_type = record_type
+        required = AllFields.required_fields()
+        extra = []
+        if record_type == "auxam_other":
+            extra.append(AllFields.ItemField.value)
+        elif "other" in record_type:
+            extra.extend(AllFields.monograph_fields())
+        else:
+            required.extend(AllFields.monograph_fields())
+        self.required: Tuple[str, ...] = tuple(required)
+        self.extra: Tuple[str, ...] = tuple(extra)
+        self.non_repeatable: Tuple[str, ...] = tuple(AllFields.non_repeatable_fields())
+        control_tags = AllFields.control_fields()
+        data_tags = get_matching_tags(_get_tag_pattern(record_type))
+        self.classes: Dict[str, TagClass] = {}
+        for tag in TAGS:
+            if tag in self.extra:
+                self.classes[tag] = TagClass.FORBIDDEN
+            elif tag in control_tags:
+                self.classes[tag] = TagClass.CONTROL
+            elif tag in MODEL_TAGS:
+                self.classes[tag] = TagClass.MODEL
+            elif tag in data_tags:
+                self.classes[tag] = TagClass.DATA
+            else:
+                self.classes[tag] = TagClass.FORBIDDEN
+
+    def classify(self, tag: str) -> TagClass:
+        """Return the `TagClass` of a tag. Tags not in `TAGS` are forbidden."""
+        return self.classes.get(tag, TagClass.FORBIDDEN)
+
+
+@lru_cache(maxsize=None)
+def get_tag_table(record_type: str) -> TagTable:
+    """
+    Return the `TagTable` for a record type. Each table is built once.
+
+    Args:
+        record_type: the record type returned by `utils.get_record_type`
+
+    Returns:
+        a `TagTable`
+    """
+    return TagTable(record_type)
+
+
+@lru_cache(maxsize=None)
+def get_matching_tags(pattern: str) -> FrozenSet[str]:
+    """
+    Return the tags in `TAGS` that match a pattern. The pattern is searched for
+    in each tag, as pydantic does for a `pattern` constraint on a string.
+
+    Args:
+        pattern: a regular expression
+
+    Returns:
+        a frozenset of three-digit tags
+    """
+    search = re.compile(pattern).search
+    return frozenset(i for i in TAGS if search(i))
+
+
+def _get_tag_pattern(record_type: str) -> str:
+    """Return the tag pattern of the generic data field model for a record type."""
+    for annotation in globals()[get_adapter_key(record_type)]:
+        model, tag = get_args(annotation)
+        if tag.tag == "data_field":
+            break
+    (pattern,) = [
+        i.pattern for i in model.model_fields["tag"].metadata if hasattr(i, "pattern")
+    ]
+    return pattern
+
+
 AuxOtherFields = (
     Annotated[ControlField001, Tag("001")],
     Annotated[ControlField003, Tag("003")],
@@ -160,3 +382,7 @@ FieldList = (
     OrderField,
     OtherDataField,
 )
+
+ADAPTER_REGISTRY = AdapterRegistry()
+MODEL_TAGS = frozenset(i.value for i in AllFields)
+TAGS = frozenset(f"{i:03d}" for i in range(1000))
@@ -20,8 +20,13 @@ Functions:
         function also subfields by parsing them into the correct `Field` of the
         `BaseModel`. Any subfields that do not correspond to a specific field as
         defined in the model are left as a dictionary.
+
+    get_subfield_plan:
+        A function that maps the subfield codes of a data field model to the
+        fields of the model. The map is built once for each model.
 """
 
+from functools import lru_cache
 from typing import Annotated, Any, Dict, List, Literal, Union
 
 from pydantic import BaseModel, ConfigDict, Field, model_serializer, model_validator
@@ -64,18 +69,42 @@ def get_data_field_input(
     ):
         return {"tag": tag, "ind1": ind1, "ind2": ind2, "subfields": subfields}
     out = {"tag": tag, "ind1": ind1, "ind2": ind2}
-    out["subfields"] = sorted([i for i in subfields], key=lambda x: list(x.keys())[0])
-    other_fields = [i for i in model.model_fields if i not in out.keys()]
-    for field in other_fields:
-        alias = model.model_config["alias_generator"](field)
-        nested_key = alias.split("subfields.")[1]
-        for subfield in out["subfields"]:
-            if nested_key in subfield:
-                out.update({field: subfield[nested_key]})
-                continue
+    out["subfields"] = sorted(subfields, key=_first_key)
+    plan = get_subfield_plan(model)
+    for subfield in out["subfields"]:
+        for code, value in subfield.items():
+            if code in plan:
+                out[plan[code]] = value
     return out
 
 
+def _first_key(subfield: Dict[str, Any]) -> str:
+    return next(iter(subfield))
+
+
+@lru_cache(maxsize=None)
+def get_subfield_plan(model: Any) -> Dict[str, str]:
+    """
+    Map each subfield code to the name of the model field that it populates. The
+    `alias_generator` of the model is only called the first time the plan for a
+    model is requested.
+
+    Args:
+        model: a data field model
+
+    Returns:
+        a dictionary mapping a subfield code (eg. "t") to the name of a model
+        field (eg. "order_location")
+    """
+    plan = {}
+    for field in model.model_fields:
+        if field in ("tag", "ind1", "ind2", "subfields"):
+            continue
+        alias = model.model_config["alias_generator"](field)
+        plan[alias.removeprefix("subfields.")] = field
+    return plan
+
+
 class BaseControlField(BaseModel):
     """A class that defines a control field in a MARC record. This is the parent
     class for all control field models. The `tag` attribute is a three-digit string
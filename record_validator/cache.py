@@ -0,0 +1,155 @@
+"""
+This module contains an optional cache of field validation results. Fields such
+as the 901, 910, 960 and 980 are often identical in every record in a vendor
+file, so the result of validating a field is stored the first time it is seen
+and reused for identical fields that follow.
+
+Classes:
+    FieldCache:
+        A thread-safe, bounded LRU cache of the errors returned when validating a
+        field with a `TypeAdapter`.
+
+Functions:
+    field_key:
+        Return a hashable representation of the contents of a field.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Sequence, Tuple, Union
+
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import ErrorDetails
+from pymarc import Field as MarcField
+
+from record_validator.rules import RuleSet
+
+
+def field_key(field: Union[MarcField, Dict[str, Any]]) -> Union[Hashable, None]:
+    """
+    Return a hashable representation of a field. Fields with the same key are
+    validated identically by an adapter, including the type of each value and
+    whether the field is a `pymarc.Field` or a dict.
+
+    Args:
+        field: a MARC field as a `pymarc.Field` object or a dict
+
+    Returns:
+        a hashable key or None if the field contains values that cannot be hashed
+    """
+    try:
+        key = _freeze(field)
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, MarcField):
+        if value.is_control_field():
+            return (MarcField, value.tag, value.data)
+        return (MarcField, value.tag, value.indicators, tuple(value.subfields))
+    elif isinstance(value, dict):
+        return (dict, tuple((k, _freeze(v)) for k, v in value.items()))
+    elif isinstance(value, list):
+        return (list, tuple(_freeze(i) for i in value))
+    return (type(value), value)
+
+
+def _copy(errors: Sequence[ErrorDetails]) -> List[ErrorDetails]:
+    return [ErrorDetails(**i) for i in errors]  # type: ignore[typeddict-item]
+
+
+class FieldCache:
+    """
+    A bounded LRU cache of field validation results keyed by the adapter used to
+    validate a field and the contents of the field. Successful validation is
+    stored as an empty tuple. Record types that are validated with the same
+    adapter (eg. "evp_monograph" and "leila_monograph") share entries.
+
+    Args:
+        maxsize: the maximum number of results to keep
+
+    Attributes:
+        maxsize: the maximum number of results to keep
+        hits: the number of fields whose result was found in the cache
+        misses: the number of fields that were validated by an adapter
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results: OrderedDict[Hashable, Tuple[ErrorDetails, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def validate(
+        self,
+        adapter_key: str,
+        adapter: Union[TypeAdapter, RuleSet],
+        field: Union[MarcField, Dict[str, Any]],
+    ) -> List[ErrorDetails]:
+        """
+        Validate a field with an adapter unless an identical field has already
+        been validated with the same adapter.
+
+        Args:
+            adapter_key: the name of the adapter returned by `get_adapter_key`
+            adapter: the `TypeAdapter` or `rules.RuleSet` used to validate the field
+            field: a MARC field as a `pymarc.Field` object or a dict
+
+        Returns:
+            a list of errors, which is empty if the field is valid
+        """
+        content = field_key(field)
+        key = (adapter_key, content)
+        if content is not None:
+            with self._lock:
+                cached = self._results.get(key)
+                if cached is not None:
+                    self._results.move_to_end(key)
+                    self.hits += 1
+                    return _copy(cached)
+        try:
+            adapter.validate_python(field, from_attributes=True)
+            errors: List[ErrorDetails] = []
+        except ValidationError as e:
+            errors = e.errors()  # type: ignore
+        with self._lock:
+            self.misses += 1
+            if content is not None:
+                self._results[key] = tuple(errors)
+                if len(self._results) > self.maxsize:
+                    self._results.popitem(last=False)
+        return _copy(errors)
+
+    def clear(self) -> None:
+        """Discard all results and reset the counters."""
+        with self._lock:
+            self._results.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """
+        Return the cache counters.
+
+        Returns:
+            a dictionary containing the number of hits and misses, the hit rate
+            and the current and maximum number of results stored
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._results),
+                "maxsize": self.maxsize,
+            }
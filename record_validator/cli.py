@@ -0,0 +1,316 @@
+"""
+This module contains the `record-validator` command line interface, which
+validates files of MARC records and writes the results as JSON lines.
+
+Functions:
+    main:
+        Parse command line arguments, validate each file and write the results.
+    get_parser:
+        Return the argument parser for the command line interface.
+    iter_paths:
+        Expand a list of files and directories into a list of files to validate.
+    validate_path:
+        Validate a single file and write a JSON line for each record.
+
+Constants:
+    FORMATS:
+        The formats of files that can be validated.
+    PATTERNS:
+        The default glob pattern used to find files of each format in directories.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, TextIO, Union
+
+from record_validator.cache import FieldCache
+from record_validator.parallel import DEFAULT_CHUNK_SIZE, validate_file_parallel
+from record_validator.rules import ENGINES
+from record_validator.streaming import (
+    DECODERS,
+    validate_file,
+    validate_marcxml,
+    validate_ndjson,
+)
+
+FORMATS = ("marc", "marcxml", "ndjson")
+PATTERNS = {"marc": "*.mrc", "marcxml": "*.xml", "ndjson": "*.ndjson"}
+
+
+def iter_paths(paths: List[str], pattern: str = "*.mrc") -> Iterator[Path]:
+    """
+    Expand a list of paths into the files to validate. Files are returned as
+    given and directories are searched recursively for files matching `pattern`.
+
+    Args:
+        paths: a list of paths to files or directories
+        pattern: a glob pattern used to find files in directories
+
+    Yields:
+        the path to each file
+    """
+    for path in [Path(i) for i in paths]:
+        if path.is_dir():
+            yield from sorted(i for i in path.rglob(pattern) if i.is_file())
+        else:
+            yield path
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Return the argument parser for the command line interface."""
+    parser = argparse.ArgumentParser(
+        prog="record-validator",
+        description=(
+            "Validate files of MARC records and write one JSON line per record."
+        ),
+    )
+    parser.add_argument(
+        "paths", nargs="+", help="MARC files or directories containing MARC files"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="file to write results to (default: stdout)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="marc",
+        help=(
+            "format of the input files (default: marc). --workers and --precheck "
+            "apply to ISO 2709 (marc) files only"
+        ),
+    )
+    parser.add_argument(
+        "--pattern",
+        help=(
+            "glob pattern used to find files in directories (default: *.mrc, "
+            "*.xml or *.ndjson, depending on --format)"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of worker processes (default: 1)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="bytes of each file sent to a worker at a time",
+    )
+    parser.add_argument(
+        "--precheck",
+        action="store_true",
+        help=(
+            "check for missing, extra and repeated fields using the record "
+            "directory and skip full validation of records that fail"
+        ),
+    )
+    parser.add_argument(
+        "--precheck-only",
+        action="store_true",
+        help="only check for missing, extra and repeated fields",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=0,
+        help=(
+            "number of field validation results to cache so that identical "
+            "fields are only validated once (default: 0, no cache)"
+        ),
+    )
+    parser.add_argument(
+        "--max-errors",
+        type=int,
+        help="stop validating a record after this many errors",
+    )
+    parser.add_argument(
+        "--max-file-errors",
+        type=int,
+        help="stop validating a file after this many errors",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="pydantic",
+        help=(
+            "validate fields with pydantic or with the equivalent compiled rules "
+            "(default: pydantic)"
+        ),
+    )
+    parser.add_argument(
+        "--decoder",
+        choices=DECODERS,
+        default="pymarc",
+        help=(
+            "decode MARC records with pymarc or straight to field dicts without "
+            "building pymarc objects (default: pymarc)"
+        ),
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="stop at the first invalid record",
+    )
+    parser.add_argument(
+        "--summary-only",
+        action="store_true",
+        help="write one summary line per file instead of one line per record",
+    )
+    return parser
+
+
+def validate_path(
+    path: Path,
+    output: TextIO,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    fail_fast: bool = False,
+    summary_only: bool = False,
+    precheck: bool = False,
+    deep: bool = True,
+    cache_size: int = 0,
+    max_errors: Union[int, None] = None,
+    max_file_errors: Union[int, None] = None,
+    engine: str = "pydantic",
+    input_format: str = "marc",
+    decoder: str = "pymarc",
+) -> Dict[str, Any]:
+    """
+    Validate a single file and write a JSON line for each record to `output`.
+
+    Args:
+        path: the path to a file of MARC records
+        output: a text stream to write results to
+        workers: the number of worker processes
+        chunk_size: bytes of the file sent to a worker at a time
+        fail_fast: whether to stop at the first invalid record
+        summary_only: whether to skip writing a line for each record
+        precheck: whether to check the record directory before full validation
+        deep: whether to parse and fully validate records
+        cache_size: the size of the field validation cache, or 0 for no cache
+        max_errors: the number of errors after which validation of a record stops
+        max_file_errors: the number of errors after which validation of the file
+            stops
+        engine: the engine used to validate each field, "pydantic" or "rules"
+        input_format: the format of the file, one of `FORMATS`
+        decoder:
+            how records in ISO 2709 format are decoded, one of
+            `streaming.DECODERS`
+
+    Returns:
+        a dictionary summarizing the results for the file
+    """
+    summary: Dict[str, Any] = {
+        "file": str(path),
+        "records": 0,
+        "valid": 0,
+        "invalid": 0,
+        "parse_errors": 0,
+        "truncated": False,
+    }
+    if input_format in ("marcxml", "ndjson"):
+        validate = validate_marcxml if input_format == "marcxml" else validate_ndjson
+        results = validate(
+            path,
+            cache=FieldCache(maxsize=cache_size) if cache_size else None,
+            max_errors=max_errors,
+            max_file_errors=max_file_errors,
+            engine=engine,
+        )
+    elif workers > 1:
+        results = validate_file_parallel(
+            path,
+            workers=workers,
+            chunk_size=chunk_size,
+            precheck=precheck,
+            deep=deep,
+            cache_size=cache_size,
+            max_errors=max_errors,
+            max_file_errors=max_file_errors,
+            engine=engine,
+            decoder=decoder,
+        )
+    else:
+        results = validate_file(
+            path,
+            precheck=precheck,
+            deep=deep,
+            cache=FieldCache(maxsize=cache_size) if cache_size else None,
+            max_errors=max_errors,
+            max_file_errors=max_file_errors,
+            engine=engine,
+            decoder=decoder,
+        )
+    for result in results:
+        summary["records"] += 1
+        if result.valid:
+            summary["valid"] += 1
+        elif result.parse_error is not None:
+            summary["parse_errors"] += 1
+        else:
+            summary["invalid"] += 1
+        summary["truncated"] = result.truncated
+        if not summary_only:
+            line = {"file": str(path), **result.to_dict()}
+            output.write(json.dumps(line, default=str) + "\n")
+        if fail_fast and not result.valid:
+            break
+    return summary
+
+
+def main(argv: Union[List[str], None] = None) -> int:
+    """
+    Run the command line interface.
+
+    Args:
+        argv: a list of command line arguments. Defaults to `sys.argv[1:]`.
+
+    Returns:
+        0 if every record is valid, otherwise 1
+
+    Raises:
+        SystemExit: if the arguments are invalid or a path does not exist
+    """
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    missing = [i for i in args.paths if not Path(i).exists()]
+    if missing:
+        parser.error(f"no such file or directory: {', '.join(missing)}")
+    output = open(args.output, "w") if args.output else sys.stdout
+    summary_output = output if args.summary_only else sys.stderr
+    exit_code = 0
+    try:
+        pattern = args.pattern or PATTERNS[args.format]
+        for path in iter_paths(args.paths, pattern=pattern):
+            summary = validate_path(
+                path,
+                output,
+                workers=args.workers,
+                chunk_size=args.chunk_size,
+                fail_fast=args.fail_fast,
+                summary_only=args.summary_only,
+                precheck=args.precheck,
+                deep=not args.precheck_only,
+                cache_size=args.cache_size,
+                max_errors=args.max_errors,
+                max_file_errors=args.max_file_errors,
+                engine=args.engine,
+                input_format=args.format,
+                decoder=args.decoder,
+            )
+            summary_output.write(json.dumps(summary) + "\n")
+            output.flush()
+            if summary["valid"] != summary["records"]:
+                exit_code = 1
+                if args.fail_fast:
+                    break
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return exit_code
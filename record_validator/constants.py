@@ -1,6 +1,124 @@
 """This module contains constants used in the record_validator package."""
 
 from enum import Enum
+from typing import Dict, FrozenSet, List, Tuple, Union
+
+OrderItem = Tuple[str, Union[str, None], Union[str, None]]
+
+ERROR_BUDGET_EXCEEDED = "error_budget_exceeded"
+
+# the characters matched by \s in the Rust regex engine used by pydantic
+_WHITESPACE = (
+    "\t\n\x0b\x0c\r \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006"
+    "\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000"
+)
+_DIGITS = "0123456789"
+
+LEADER_CHARACTERS: Tuple[FrozenSet[str], ...] = tuple(
+    frozenset(i)
+    for i in [_DIGITS] * 5
+    + ["acdnp", "acdefgijkmoprt", "abcdims", f"{_WHITESPACE}a", f"{_WHITESPACE}a"]
+    + ["2", "2"]
+    + [_DIGITS] * 5
+    + [f"{_WHITESPACE}12345678uz", f"{_WHITESPACE}acinu", f"{_WHITESPACE}abc"]
+    + ["4", "5", "0", "0"]
+)
+LEADER_BYTES: Tuple[FrozenSet[int], ...] = tuple(
+    frozenset(ord(j) for j in i if j.isascii()) for i in LEADER_CHARACTERS
+)
+
+# the characters allowed at each position of the 008 field. Positions 18-34 depend
+# on the material type, which is determined by positions 06-07 of the leader.
+_LOWERCASE = "abcdefghijklmnopqrstuvwxyz"
+_DATE = f"{_DIGITS}u |"
+_FORM_OF_ITEM = " abcdfoqrs|"
+_GOVERNMENT_PUBLICATION = " acfilmosuz|"
+_TARGET_AUDIENCE = " abcdefgj|"
+_UNDEFINED = " |"
+_FIXED_FIELD_008_START = (
+    [_DIGITS] * 6
+    + ["bcdeikmnpqrstu|"]
+    + [_DATE] * 8
+    + [f"{_LOWERCASE}|"] * 2
+    + [f"{_LOWERCASE} |"]
+)
+_FIXED_FIELD_008_END = [f"{_LOWERCASE} |"] * 3 + [" dorsx|", " cdu|"]
+_FIXED_FIELD_008_MATERIALS = {
+    "BK": [" abcdefghijklmop|"] * 4
+    + [_TARGET_AUDIENCE, _FORM_OF_ITEM]
+    + [" 256abcdefgijklmnopqrstuvwyz|"] * 4
+    + [_GOVERNMENT_PUBLICATION, "01|", "01|", "01|", _UNDEFINED]
+    + ["01defhijmpsu|", " abcd|"],
+    "CF": [_UNDEFINED] * 4
+    + [_TARGET_AUDIENCE, " oq|", _UNDEFINED, _UNDEFINED, "abcdefghijmuz|"]
+    + [_UNDEFINED, _GOVERNMENT_PUBLICATION]
+    + [_UNDEFINED] * 6,
+    "CR": [" abcdefghijkmqstuwz|", "nrux|", _UNDEFINED, " dghjlmnpstw|"]
+    + [" abcdefoqs|", _FORM_OF_ITEM]
+    + [" 56abcdefghiklmnopqrstuvwyz|"] * 4
+    + [_GOVERNMENT_PUBLICATION, "01|"]
+    + [_UNDEFINED] * 3
+    + [" abcdefghijkluz|", "012|"],
+    "MP": [" abcdefgijkmz|"] * 4
+    + [" abcdefghijklmnoprsuz|"] * 2
+    + [_UNDEFINED, "abcdefgu|", _UNDEFINED, _UNDEFINED]
+    + [_GOVERNMENT_PUBLICATION, _FORM_OF_ITEM, _UNDEFINED, "01|", _UNDEFINED]
+    + [" ejklnoprz|"] * 2,
+    "MU": [f"{_LOWERCASE}|"] * 2
+    + ["abcdeghijklmnpuz|", " defnu|", _TARGET_AUDIENCE, _FORM_OF_ITEM]
+    + [" abcdefghikrsz|"] * 6
+    + [" abcdefghijklmnoprstz|"] * 2
+    + [_UNDEFINED, " abcnu|", _UNDEFINED],
+    "VM": [f"{_DIGITS}-n|"] * 3
+    + [_UNDEFINED, _TARGET_AUDIENCE]
+    + [_UNDEFINED] * 5
+    + [_GOVERNMENT_PUBLICATION, _FORM_OF_ITEM]
+    + [_UNDEFINED] * 3
+    + ["abcdfgiklmnopqrstvwz|", "aclnuz|"],
+    "MX": [_UNDEFINED] * 5 + [_FORM_OF_ITEM] + [_UNDEFINED] * 11,
+}
+
+FIXED_FIELD_008: Dict[str, Tuple[FrozenSet[str], ...]] = {
+    material: tuple(
+        frozenset(i) for i in _FIXED_FIELD_008_START + positions + _FIXED_FIELD_008_END
+    )
+    for material, positions in _FIXED_FIELD_008_MATERIALS.items()
+}
+FIXED_FIELD_008_ANY: Tuple[FrozenSet[str], ...] = tuple(
+    frozenset().union(*i) for i in zip(*FIXED_FIELD_008.values())
+)
+
+
+def character_class(characters: FrozenSet[str]) -> str:
+    """
+    Return a regex character class matching a set of characters. If the set
+    contains every character in `_WHITESPACE`, they are written as "\\s".
+    """
+    whitespace = frozenset(_WHITESPACE) <= characters
+    if whitespace:
+        characters = characters - frozenset(_WHITESPACE)
+    ranges: List[str] = []
+    for char in sorted(characters):
+        if ranges and ord(char) == ord(ranges[-1][-1]) + 1:
+            ranges[-1] += char
+        else:
+            ranges.append(char)
+    escaped = [[f"\\{j}" if j in "\\]^-" else j for j in i] for i in ranges]
+    return "[{}{}]".format(
+        "\\s" if whitespace else "",
+        "".join(f"{i[0]}-{i[-1]}" if len(i) > 2 else "".join(i) for i in escaped),
+    )
+
+
+# the material type of the 008 field for each value of position 06 of the leader
+MATERIAL_TYPES = {
+    **dict.fromkeys("at", "BK"),
+    **dict.fromkeys("cdij", "MU"),
+    **dict.fromkeys("ef", "MP"),
+    **dict.fromkeys("gkor", "VM"),
+    "m": "CF",
+    "p": "MX",
+}
 
 
 class AllFields(Enum):
@@ -66,6 +184,19 @@ class AllFields(Enum):
         ]
 
 
+class TagClass(Enum):
+    """
+    A class to define how a MARC tag is treated in a record type. Fields with a
+    forbidden tag are either extra fields or are rejected by the generic data
+    field model for the record type.
+    """
+
+    CONTROL = "control"
+    MODEL = "model"
+    DATA = "data"
+    FORBIDDEN = "forbidden"
+
+
 class AllSubfields(Enum):
     """
     A class to translate a `Field` within a model to its corresponding
@@ -174,3 +305,43 @@ class ValidOrderItems(Enum):
     def to_list(cls):
         """Return a list of valid order items."""
         return [item.value for item in cls]
+
+    @classmethod
+    def to_set(cls) -> FrozenSet[OrderItem]:
+        """
+        Return the valid order items as a set of (order_location, item_location,
+        item_type) tuples. The set is built once when the module is imported.
+        """
+        return _VALID_ORDER_ITEM_SET
+
+    @classmethod
+    def is_valid(
+        cls,
+        order_location: Union[str, None],
+        item_location: Union[str, None],
+        item_type: Union[str, None],
+    ) -> bool:
+        """Return whether a combination of order and item values is valid."""
+        return (order_location, item_location, item_type) in _VALID_ORDER_ITEM_SET
+
+    @classmethod
+    def for_order_location(
+        cls, order_location: Union[str, None]
+    ) -> List[Dict[str, Union[str, None]]]:
+        """Return a list of valid order items for an order location."""
+        items = _VALID_ORDER_ITEMS_BY_LOCATION.get(order_location, ())
+        return [dict(i) for i in items]
+
+
+_VALID_ORDER_ITEM_SET: FrozenSet[OrderItem] = frozenset(
+    (i.value["order_location"], i.value["item_location"], i.value["item_type"])
+    for i in ValidOrderItems
+)
+_VALID_ORDER_ITEMS_BY_LOCATION: Dict[
+    Union[str, None], Tuple[Dict[str, Union[str, None]], ...]
+] = {
+    location: tuple(
+        i.value for i in ValidOrderItems if i.value["order_location"] == location
+    )
+    for location in {i.value["order_location"] for i in ValidOrderItems}
+}
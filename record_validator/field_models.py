@@ -2,9 +2,10 @@
 
 from typing import Annotated, Any, Dict, List, Literal, Optional, Union
 
-from pydantic import Field, model_validator
+from pydantic import AfterValidator, Field, model_validator
 
 from record_validator.base_fields import BaseControlField, BaseDataField
+from record_validator.fixed_fields import check_008
 
 
 class AuxBibCallNo(BaseDataField):
@@ -187,18 +188,20 @@ class ControlField008(BaseControlField):
 
     Args:
         tag: The MARC tag for the field. Must be "008".
-        value: The value of the field. Must be a string.
+        value:
+            The value of the field. Must be a string that is 40 characters long.
+            Each position is checked with `fixed_fields.check_008`.
     """
 
     tag: Annotated[Literal["008"], Field(alias="008")]
     value: Annotated[
         str,
         Field(
-            pattern=r"^[a-z0-9|\\ ]{40}$",
             min_length=40,
             max_length=40,
             examples=["210505s2021    nyu           000 0 eng d"],
         ),
+        AfterValidator(check_008),
     ]
 
 
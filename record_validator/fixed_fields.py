@@ -0,0 +1,125 @@
+"""
+This module contains functions that check each position of the 008 field against
+a table of the characters allowed at that position. The table depends on the
+material type, which is determined by positions 06-07 of the leader.
+
+Functions:
+    invalid_character_error:
+        Return the error for a character that is not allowed at a position of a
+        leader or 008 field.
+    get_008_table:
+        Return the characters allowed at each position of the 008 field for a
+        type of record and bibliographic level.
+    find_008_error:
+        Find the first position of an 008 field that contains a character that
+        is not allowed.
+    check_008:
+        Check the value of an 008 field with `find_008_error`. Used by
+        `ControlField008`.
+"""
+
+from functools import lru_cache
+from typing import FrozenSet, Tuple, Union
+
+from pydantic_core import PydanticCustomError
+from pymarc import Leader
+
+from record_validator.constants import (
+    FIXED_FIELD_008,
+    FIXED_FIELD_008_ANY,
+    MATERIAL_TYPES,
+    character_class,
+)
+
+
+def invalid_character_error(
+    position: int, characters: FrozenSet[str]
+) -> PydanticCustomError:
+    """
+    Return the error for a character that is not allowed at a position of a
+    leader or 008 field. The error has the same type as a pattern mismatch, but
+    its message and context give the position and the characters allowed there
+    instead of the pattern for the whole value.
+
+    Args:
+        position: the position of the character
+        characters: the characters allowed at the position
+
+    Returns:
+        a `PydanticCustomError` with the type "string_pattern_mismatch"
+    """
+    return PydanticCustomError(
+        "string_pattern_mismatch",
+        "Invalid character at position {position}, expected {pattern}",
+        {"pattern": character_class(characters), "position": position},
+    )
+
+
+@lru_cache(maxsize=None)
+def get_008_table(
+    type_of_record: str, bibliographic_level: str
+) -> Tuple[FrozenSet[str], ...]:
+    """
+    Return the characters allowed at each position of the 008 field for positions
+    06 and 07 of a leader. Language material and manuscript language material
+    are continuing resources if the bibliographic level is "b", "i" or "s" and
+    books otherwise. If the type of record is not known, a character is allowed
+    at positions 18-34 if it is allowed for any material type.
+
+    Args:
+        type_of_record: position 06 of the leader
+        bibliographic_level: position 07 of the leader
+
+    Returns:
+        a tuple of 40 sets of characters
+    """
+    material = MATERIAL_TYPES.get(type_of_record)
+    if material == "BK" and bibliographic_level in ("b", "i", "s"):
+        material = "CR"
+    return FIXED_FIELD_008.get(material or "", FIXED_FIELD_008_ANY)
+
+
+def find_008_error(
+    value: str, leader: Union[str, Leader, None] = None
+) -> Union[int, None]:
+    """
+    Find the first position of an 008 field that contains a character that is
+    not allowed by the table returned by `get_008_table` for the leader. Without
+    a leader, positions 18-34 are checked against the characters allowed for any
+    material type.
+
+    Args:
+        value: the value of an 008 field
+        leader: the leader of the record, if it is known
+
+    Returns:
+        the first position with a character that is not allowed, the length of
+        the value if it is not 40 characters long, or None if it is valid
+    """
+    leader = str(leader) if leader is not None else ""
+    table = get_008_table(leader[6:7], leader[7:8])
+    checks = list(map(frozenset.__contains__, table, value))
+    if not all(checks):
+        return checks.index(False)
+    return None if len(value) == 40 else min(len(value), 40)
+
+
+def check_008(value: str) -> str:
+    """
+    Check the value of an 008 field with `find_008_error`. The error is the one
+    returned by `invalid_character_error` for the first position that contains a
+    character that is not allowed for any material type.
+
+    Args:
+        value: the value of an 008 field that is 40 characters long
+
+    Returns:
+        the value
+
+    Raises:
+        PydanticCustomError: if a position contains a character that is not allowed
+    """
+    position = find_008_error(value)
+    if position is not None:
+        raise invalid_character_error(position, FIXED_FIELD_008_ANY[position])
+    return value
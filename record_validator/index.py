@@ -0,0 +1,329 @@
+"""
+This module contains an index of the records in a file of MARC records in ISO
+2709 format. The file is memory-mapped and the byte offset, length and 001 field
+of each record are stored so that single records can be validated again without
+reading the rest of the file.
+
+Classes:
+    RecordIndex:
+        An index of the records in a memory-mapped file that can be saved to and
+        loaded from a sidecar file.
+
+Constants:
+    INDEX_SUFFIX:
+        The suffix added to the path of a file to get the path of its sidecar.
+"""
+
+import json
+import mmap
+import os
+import struct
+from array import array
+from typing import Any, Dict, List, Sequence, Union
+
+from pymarc.exceptions import (
+    EndOfRecordNotFound,
+    PymarcException,
+    RecordLengthInvalid,
+    TruncatedRecord,
+)
+
+from record_validator.cache import FieldCache
+from record_validator.iso2709 import read_chunks, read_control_number
+from record_validator.streaming import RecordResult, validate_bytes
+
+INDEX_SUFFIX = ".idx"
+_MAGIC = b"RVIDX1\x00\x00"
+_HEADER = struct.Struct("<8sQQq")
+_FRAMING_ERRORS = (RecordLengthInvalid, TruncatedRecord, EndOfRecordNotFound)
+
+
+class RecordIndex:
+    """
+    An index of the records in a file of MARC records in ISO 2709 format. Records
+    are framed with `iso2709.read_chunks`, so the position of each record is the
+    same as the `index` of its `RecordResult` from `streaming.validate_file`.
+
+    The sidecar file contains a header with the number of records and the size
+    and modification time of the indexed file, followed by the offsets, lengths
+    and framing errors of the records as packed little-endian integers and the
+    control numbers as a JSON array.
+
+    The index is only valid while the file is unchanged. Use `RecordIndex.open`
+    to load a sidecar and rebuild it if the file has changed since it was saved.
+
+    Args:
+        path: the path to a file of MARC records in ISO 2709 format
+        offsets: the byte offset of each record
+        lengths: the length of each record in bytes
+        statuses:
+            for each record, 0 if the record was framed or the position of the
+            exception in `_FRAMING_ERRORS` plus one if it was not
+        control_numbers: the 001 field of each record, if present
+        stat: the result of `os.stat` for the file when it was indexed
+
+    Attributes:
+        path: the path to the indexed file
+        offsets: an `array` of the byte offset of each record
+        lengths: an `array` of the length of each record in bytes
+        control_numbers: a list of the 001 field of each record or None
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        offsets: Sequence[int],
+        lengths: Sequence[int],
+        statuses: Sequence[int],
+        control_numbers: List[Union[str, None]],
+        stat: os.stat_result,
+    ):
+        self.path = path
+        self.offsets = array("Q", offsets)
+        self.lengths = array("Q", lengths)
+        self._statuses = array("B", statuses)
+        self.control_numbers = control_numbers
+        self._positions: Dict[str, List[int]] = {}
+        for position, control_number in enumerate(control_numbers):
+            if control_number is not None:
+                self._positions.setdefault(control_number, []).append(position)
+        self._size = stat.st_size
+        self._mtime_ns = stat.st_mtime_ns
+        self._file = open(path, "rb")
+        self._mmap: Union[mmap.mmap, None] = None
+        if self._size:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __enter__(self) -> "RecordIndex":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    @classmethod
+    def build(cls, path: Union[str, os.PathLike]) -> "RecordIndex":
+        """
+        Index a file by reading the record length in positions 0-4 of the leader
+        of each record and the 001 field of each record that can be framed.
+
+        Args:
+            path: the path to a file of MARC records in ISO 2709 format
+
+        Returns:
+            a `RecordIndex`
+        """
+        offsets: List[int] = []
+        lengths: List[int] = []
+        statuses: List[int] = []
+        control_numbers: List[Union[str, None]] = []
+        with open(path, "rb") as stream:
+            stat = os.fstat(stream.fileno())
+            for offset, chunk, exception in read_chunks(stream):
+                offsets.append(offset)
+                lengths.append(len(chunk))
+                control_number = None
+                if exception is None:
+                    statuses.append(0)
+                    try:
+                        control_number = read_control_number(chunk)
+                    except PymarcException:
+                        pass
+                else:
+                    statuses.append(_FRAMING_ERRORS.index(type(exception)) + 1)
+                control_numbers.append(control_number)
+        return cls(path, offsets, lengths, statuses, control_numbers, stat)
+
+    @classmethod
+    def load(
+        cls,
+        path: Union[str, os.PathLike],
+        index_path: Union[str, os.PathLike, None] = None,
+    ) -> "RecordIndex":
+        """
+        Load the index of a file from its sidecar.
+
+        Args:
+            path: the path to the indexed file
+            index_path:
+                the path to the sidecar. Defaults to `path` with `INDEX_SUFFIX`
+                added.
+
+        Returns:
+            a `RecordIndex`
+
+        Raises:
+            ValueError:
+                if the sidecar is not a record index or the file has changed
+                since the sidecar was saved
+        """
+        if index_path is None:
+            index_path = os.fspath(path) + INDEX_SUFFIX
+        with open(index_path, "rb") as sidecar:
+            data = sidecar.read()
+        if len(data) < _HEADER.size:
+            raise ValueError(f"{os.fspath(index_path)} is not a record index")
+        magic, count, size, mtime_ns = _HEADER.unpack_from(data)
+        if magic != _MAGIC or len(data) < _HEADER.size + count * 17:
+            raise ValueError(f"{os.fspath(index_path)} is not a record index")
+        stat = os.stat(path)
+        if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+            raise ValueError(f"{os.fspath(path)} has changed since it was indexed")
+        position = _HEADER.size
+        offsets = struct.unpack_from(f"<{count}Q", data, position)
+        position += count * 8
+        lengths = struct.unpack_from(f"<{count}Q", data, position)
+        position += count * 8
+        statuses = data[position : position + count]
+        control_numbers = json.loads(data[position + count :])
+        return cls(path, offsets, lengths, statuses, control_numbers, stat)
+
+    @classmethod
+    def open(
+        cls,
+        path: Union[str, os.PathLike],
+        index_path: Union[str, os.PathLike, None] = None,
+        save: bool = True,
+    ) -> "RecordIndex":
+        """
+        Load the index of a file from its sidecar, or build it if the sidecar is
+        missing or the file has changed since the sidecar was saved.
+
+        Args:
+            path: the path to a file of MARC records in ISO 2709 format
+            index_path:
+                the path to the sidecar. Defaults to `path` with `INDEX_SUFFIX`
+                added.
+            save: whether to save the sidecar if the index is rebuilt
+
+        Returns:
+            a `RecordIndex`
+        """
+        try:
+            return cls.load(path, index_path)
+        except (OSError, ValueError):
+            index = cls.build(path)
+        if save:
+            index.save(index_path)
+        return index
+
+    def save(self, index_path: Union[str, os.PathLike, None] = None) -> None:
+        """
+        Save the index to a sidecar file.
+
+        Args:
+            index_path:
+                the path to the sidecar. Defaults to the path of the indexed file
+                with `INDEX_SUFFIX` added.
+        """
+        if index_path is None:
+            index_path = os.fspath(self.path) + INDEX_SUFFIX
+        count = len(self)
+        with open(index_path, "wb") as sidecar:
+            sidecar.write(_HEADER.pack(_MAGIC, count, self._size, self._mtime_ns))
+            sidecar.write(struct.pack(f"<{count}Q", *self.offsets))
+            sidecar.write(struct.pack(f"<{count}Q", *self.lengths))
+            sidecar.write(self._statuses.tobytes())
+            sidecar.write(json.dumps(self.control_numbers).encode())
+
+    def find(self, control_number: str) -> List[int]:
+        """
+        Find records by control number. The position of each record is looked up
+        in a dict built from `control_numbers` when the index is created.
+
+        Args:
+            control_number: the value of the 001 field
+
+        Returns:
+            the position of each record with the control number
+        """
+        return list(self._positions.get(control_number, []))
+
+    def validate_at(
+        self,
+        index: int,
+        precheck: bool = False,
+        deep: bool = True,
+        cache: Union[FieldCache, None] = None,
+        max_errors: Union[int, None] = None,
+        engine: str = "pydantic",
+        decoder: str = "pymarc",
+        **reader_kwargs: Any,
+    ) -> RecordResult:
+        """
+        Validate a single record. The bytes of the record are a slice of the
+        memory-mapped file, and only that record is read from disk.
+
+        Args:
+            index: the position of the record in the file, starting at 0
+            precheck: whether to check the record directory before full validation
+            deep:
+                whether to parse and fully validate the record. If False, only
+                the precheck is run.
+            cache: an optional `FieldCache`
+            max_errors: the number of errors after which validation stops
+            engine: the engine used to validate each field, "pydantic" or "rules"
+            decoder: how the record is decoded, one of `streaming.DECODERS`
+            reader_kwargs:
+                keyword arguments passed to `pymarc.Record` or
+                `iso2709.decode_record`
+
+        Returns:
+            a `RecordResult`
+
+        Raises:
+            IndexError: if there is no record at `index`
+            ValueError: if the index has been closed
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        offset, status = self.offsets[index], self._statuses[index]
+        exception = _FRAMING_ERRORS[status - 1]() if status else None
+        if self._mmap is None:
+            raise ValueError("I/O operation on closed index")
+        with memoryview(self._mmap)[offset : offset + self.lengths[index]] as data:
+            return validate_bytes(
+                data,
+                index=index,
+                offset=offset,
+                exception=exception,
+                precheck=precheck,
+                deep=deep,
+                cache=cache,
+                max_errors=max_errors,
+                engine=engine,
+                decoder=decoder,
+                **reader_kwargs,
+            )
+
+    def validate_by_control_number(
+        self, control_number: str, **kwargs: Any
+    ) -> List[RecordResult]:
+        """
+        Validate each record with a control number.
+
+        Args:
+            control_number: the value of the 001 field
+            kwargs: keyword arguments passed to `validate_at`
+
+        Returns:
+            a `RecordResult` for each record with the control number
+
+        Raises:
+            KeyError: if no record has the control number
+        """
+        positions = self.find(control_number)
+        if not positions:
+            raise KeyError(control_number)
+        return [self.validate_at(i, **kwargs) for i in positions]
+
+    def close(self) -> None:
+        """Close the memory-mapped file."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
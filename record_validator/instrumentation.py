@@ -0,0 +1,185 @@
+"""
+This module contains an opt-in timer that records where time is spent inside
+`validators.validate_all`. Instrumentation is disabled by default and
+`validate_all` only checks whether an `Instrument` is active, so there is no
+measurable cost unless `instrument` is used.
+
+Classes:
+    Instrument:
+        Accumulates wall time and call counts for each stage of validation and
+        for each combination of record type and field tag.
+
+Functions:
+    instrument:
+        A context manager that activates an `Instrument` for the code it wraps.
+    get_instrument:
+        Return the active `Instrument` or None if instrumentation is disabled.
+
+Constants:
+    STAGES:
+        The stages of `validate_all` that are timed.
+
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple, Union
+
+STAGES = (
+    "get_record_type",
+    "validate_fields",
+    "validate_field_models",
+    "validate_fixed_fields",
+    "validate_order_items",
+    "validate_all",
+)
+
+
+class Instrument:
+    """
+    Accumulates the cumulative wall time and number of calls for each stage of
+    `validate_all` and for each field validated by an adapter. Field timings are
+    keyed by record type and tag so that expensive vendor/field combinations can
+    be identified.
+
+    Attributes:
+        stage_times: cumulative seconds spent in each stage
+        stage_calls: number of times each stage was run
+        field_times: cumulative seconds spent validating fields, keyed by
+            (record_type, tag)
+        field_calls: number of fields validated, keyed by (record_type, tag)
+    """
+
+    def __init__(self) -> None:
+        self.stage_times: Dict[str, float] = {i: 0.0 for i in STAGES}
+        self.stage_calls: Dict[str, int] = {i: 0 for i in STAGES}
+        self.field_times: Dict[Tuple[str, str], float] = {}
+        self.field_calls: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def record_stage(self, stage: str, start: float) -> float:
+        """
+        Add the time elapsed since `start` to a stage.
+
+        Args:
+            stage: the name of the stage
+            start: the value of `time.perf_counter` when the stage started
+
+        Returns:
+            the current value of `time.perf_counter` so that it can be used as the
+            start of the next stage
+        """
+        now = time.perf_counter()
+        with self._lock:
+            self.stage_times[stage] = self.stage_times.get(stage, 0.0) + now - start
+            self.stage_calls[stage] = self.stage_calls.get(stage, 0) + 1
+        return now
+
+    def record_field(self, record_type: str, tag: str, start: float) -> float:
+        """
+        Add the time elapsed since `start` to a record type and tag.
+
+        Args:
+            record_type: the record type returned by `get_record_type`
+            tag: the MARC tag of the field
+            start: the value of `time.perf_counter` when validation started
+
+        Returns:
+            the current value of `time.perf_counter`
+        """
+        now = time.perf_counter()
+        key = (record_type, tag)
+        with self._lock:
+            self.field_times[key] = self.field_times.get(key, 0.0) + now - start
+            self.field_calls[key] = self.field_calls.get(key, 0) + 1
+        return now
+
+    def reset(self) -> None:
+        """Discard all timings."""
+        with self._lock:
+            self.stage_times = {i: 0.0 for i in STAGES}
+            self.stage_calls = {i: 0 for i in STAGES}
+            self.field_times = {}
+            self.field_calls = {}
+
+    def slowest_fields(self, n: int = 10) -> List[Dict[str, Any]]:
+        """
+        Return the combinations of record type and tag with the most cumulative
+        time spent validating them.
+
+        Args:
+            n: the number of combinations to return
+
+        Returns:
+            a list of dictionaries containing the record type, tag, number of
+            calls and seconds, sorted from slowest to fastest
+        """
+        with self._lock:
+            keys = sorted(self.field_times, key=self.field_times.__getitem__)[::-1]
+            return [
+                {
+                    "record_type": record_type,
+                    "tag": tag,
+                    "calls": self.field_calls[(record_type, tag)],
+                    "seconds": self.field_times[(record_type, tag)],
+                }
+                for record_type, tag in keys[:n]
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the timings collected so far.
+
+        Returns:
+            a dictionary with a "stages" key containing the number of calls and
+            seconds for each stage and a "fields" key containing the number of
+            calls and seconds for each tag, grouped by record type
+        """
+        with self._lock:
+            fields: Dict[str, Dict[str, Dict[str, Union[int, float]]]] = {}
+            for (record_type, tag), seconds in sorted(self.field_times.items()):
+                fields.setdefault(record_type, {})[tag] = {
+                    "calls": self.field_calls[(record_type, tag)],
+                    "seconds": seconds,
+                }
+            return {
+                "stages": {
+                    stage: {"calls": self.stage_calls[stage], "seconds": seconds}
+                    for stage, seconds in self.stage_times.items()
+                },
+                "fields": fields,
+            }
+
+
+_active: Union[Instrument, None] = None
+
+
+def get_instrument() -> Union[Instrument, None]:
+    """Return the active `Instrument` or None if instrumentation is disabled."""
+    return _active
+
+
+@contextmanager
+def instrument(
+    instrument: Union[Instrument, None] = None,
+) -> Iterator[Instrument]:
+    """
+    Activate an `Instrument` for every call to `validate_all` made inside the
+    `with` block, including calls made from other threads. The previously active
+    instrument is restored when the block exits.
+
+    Args:
+        instrument: an `Instrument` to add timings to. A new `Instrument` is
+            created if None.
+
+    Yields:
+        the active `Instrument`
+    """
+    global _active
+    previous = _active
+    _active = instrument if instrument is not None else Instrument()
+    try:
+        yield _active
+    finally:
+        _active = previous
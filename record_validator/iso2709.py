@@ -0,0 +1,339 @@
+"""
+This module contains functions for working with MARC records in ISO 2709
+transmission format without loading a whole file into memory.
+
+Functions:
+    read_chunks:
+        Read the raw bytes of each record in a stream one at a time, recording the
+        offset of each record and recovering from records with a corrupt length.
+    read_directory:
+        Read the tag, position and length of each field from the directory of a
+        record without decoding the fields.
+    decode_fields:
+        Decode selected fields of a record into the dicts used by `field2dict`.
+    decode_record:
+        Decode the leader and fields of a record without building `pymarc`
+        objects.
+    read_control_number:
+        Read the 001 field of a record.
+    read_008_error:
+        Check each position of the 008 field of a record against the table for
+        the type of record and bibliographic level in its leader.
+    precheck:
+        Identify missing, extra and repeated fields using only the record
+        directory and the few fields needed to determine the record type.
+
+Constants:
+    RECORD_TYPE_TAGS:
+        The tags of fields that `get_record_type` reads to determine the record
+        type.
+"""
+
+from typing import Any, BinaryIO, Collection, Dict, Iterator, List, Tuple, Union
+
+from pydantic_core import InitErrorDetails
+from pymarc.exceptions import (
+    BaseAddressInvalid,
+    BaseAddressNotFound,
+    EndOfRecordNotFound,
+    NoFieldsFound,
+    PymarcException,
+    RecordDirectoryInvalid,
+    RecordLeaderInvalid,
+    RecordLengthInvalid,
+    TruncatedRecord,
+)
+from pymarc.marc8 import marc8_to_unicode
+
+from record_validator.fixed_fields import find_008_error
+from record_validator.utils import get_record_type
+from record_validator.validators import validate_tags
+
+END_OF_RECORD = b"\x1d"
+SUBFIELD_DELIMITER = b"\x1f"
+LEADER_LENGTH = 24
+DIRECTORY_ENTRY_LENGTH = 12
+READ_SIZE = 65536
+RECORD_TYPE_TAGS = frozenset(
+    ["300", "852", "901", "949"] + [f"6{i:02d}" for i in range(100)]
+)
+
+
+def read_chunks(
+    stream: BinaryIO,
+) -> Iterator[Tuple[int, bytes, Union[PymarcException, None]]]:
+    """
+    Read the raw bytes of each record in a stream. Records are framed using the
+    record length in positions 0-4 of the leader in the same way as
+    `pymarc.MARCReader`. When the length is not a number or does not point to an
+    end of record terminator, including a length that runs past the end of the
+    stream, the chunk up to the next terminator is returned with an exception and
+    reading continues with the record that follows, so that one corrupt record
+    does not end the run. Only a final record without a terminator is returned
+    as a `TruncatedRecord`.
+
+    Args:
+        stream: a binary file-like object containing MARC records
+
+    Yields:
+        a tuple containing the byte offset of the record in the stream, the bytes
+        of the record and an exception if the record could not be framed
+    """
+    pending = b""
+    offset = 0
+
+    def read(size: int) -> bytes:
+        nonlocal pending
+        data, pending = pending[:size], pending[size:]
+        if len(data) < size:
+            data += stream.read(size - len(data))
+        return data
+
+    def read_to_terminator() -> bytes:
+        nonlocal pending
+        data = b""
+        while True:
+            block = read(READ_SIZE)
+            end = block.find(END_OF_RECORD)
+            if end != -1:
+                pending = block[end + 1 :] + pending
+                return data + block[: end + 1]
+            data += block
+            if len(block) < READ_SIZE:
+                return data
+
+    while True:
+        first5 = read(5)
+        if not first5:
+            return
+        elif len(first5) < 5:
+            yield offset, first5, TruncatedRecord()
+            return
+        elif not first5.isdigit():
+            chunk = first5 + read_to_terminator()
+            yield offset, chunk, RecordLengthInvalid()
+            offset += len(chunk)
+            continue
+        length = int(first5)
+        chunk = first5 + read(max(length - 5, 0))
+        if len(chunk) < length and END_OF_RECORD not in chunk:
+            yield offset, chunk, TruncatedRecord()
+            return
+        elif len(chunk) < length or not chunk.endswith(END_OF_RECORD):
+            end = chunk.find(END_OF_RECORD)
+            if end == -1:
+                chunk += read_to_terminator()
+            else:
+                pending = chunk[end + 1 :] + pending
+                chunk = chunk[: end + 1]
+            yield offset, chunk, EndOfRecordNotFound()
+            offset += len(chunk)
+            continue
+        yield offset, chunk, None
+        offset += length
+
+
+def read_directory(data: Union[bytes, memoryview]) -> List[Tuple[str, int, int]]:
+    """
+    Read the directory of a record. Only the leader and directory are read, so
+    the cost does not depend on the size of the fields.
+
+    Args:
+        data: the bytes of a single record in ISO 2709 format
+
+    Returns:
+        a list of tuples containing the tag of each field, the position of the
+        field in `data` and the length of the field, excluding its terminator
+
+    Raises:
+        PymarcException: if the leader or directory is invalid. The same
+            exceptions are raised by `pymarc.Record` for these records.
+    """
+    if len(data) < LEADER_LENGTH:
+        raise RecordLeaderInvalid()
+    base_address = bytes(data[12:17])
+    if not base_address.isdigit() or int(base_address) <= 0:
+        raise BaseAddressNotFound()
+    base = int(base_address)
+    if base >= len(data):
+        raise BaseAddressInvalid()
+    directory = bytes(data[LEADER_LENGTH : base - 1])
+    if len(directory) % DIRECTORY_ENTRY_LENGTH != 0:
+        raise RecordDirectoryInvalid()
+    entries = []
+    for start in range(0, len(directory), DIRECTORY_ENTRY_LENGTH):
+        entry = directory[start : start + DIRECTORY_ENTRY_LENGTH]
+        if not entry[3:].isdigit() or not entry[:3].isascii():
+            raise RecordDirectoryInvalid()
+        entries.append(
+            (entry[:3].decode("ascii"), base + int(entry[7:]), int(entry[3:7]) - 1)
+        )
+    return entries
+
+
+def decode_fields(
+    data: Union[bytes, memoryview],
+    tags: Union[Collection[str], None] = None,
+    entries: Union[List[Tuple[str, int, int]], None] = None,
+    force_utf8: bool = False,
+    utf8_handling: str = "replace",
+) -> List[Dict[str, Any]]:
+    """
+    Decode fields of a record into the dicts returned by `utils.field2dict`.
+    Subfield values are decoded as UTF-8 if position 9 of the leader is "a" or
+    `force_utf8` is True and as MARC-8 otherwise, and control fields that are not
+    UTF-8 are decoded as Latin-1, as `pymarc.Record` does.
+
+    Args:
+        data: the bytes of a single record in ISO 2709 format
+        tags: the tags of the fields to decode. All fields are decoded if None.
+        entries: the output of `read_directory`, if it has already been read
+        force_utf8: whether to decode the record as UTF-8 regardless of the leader
+        utf8_handling: how to handle invalid UTF-8 ("strict", "replace" or "ignore")
+
+    Returns:
+        a list of fields as dicts in the order they appear in the record
+    """
+    if entries is None:
+        entries = read_directory(data)
+    utf8 = force_utf8 or bytes(data[9:10]) == b"a"
+    fields: List[Dict[str, Any]] = []
+    for tag, start, length in entries:
+        if tags is not None and tag not in tags:
+            continue
+        field = bytes(data[start : start + length])
+        if tag < "010" and tag.isdigit():
+            if utf8:
+                fields.append({tag: field.decode("utf-8", utf8_handling)})
+            else:
+                fields.append({tag: field.decode("iso8859-1")})
+            continue
+        indicators, *subfields = field.split(SUBFIELD_DELIMITER)
+        ind = indicators.decode("ascii", "replace").ljust(2)
+        fields.append(
+            {
+                tag: {
+                    "ind1": ind[0],
+                    "ind2": ind[1],
+                    "subfields": [
+                        {
+                            i[:1].decode("ascii", "replace"): _decode(
+                                i[1:], utf8, utf8_handling
+                            )
+                        }
+                        for i in subfields
+                        if i
+                    ],
+                }
+            }
+        )
+    return fields
+
+
+def decode_record(
+    data: Union[bytes, memoryview],
+    force_utf8: bool = False,
+    utf8_handling: str = "strict",
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Decode a record into its leader and a list of fields in the format returned
+    by `utils.field2dict`, without building `pymarc.Record`, `pymarc.Field` or
+    `pymarc.Subfield` objects. The fields can be passed to `validate_all` or
+    `RecordModel` in place of the fields of a `pymarc.Record`.
+
+    Args:
+        data: the bytes of a single record in ISO 2709 format
+        force_utf8: whether to decode the record as UTF-8 regardless of the leader
+        utf8_handling: how to handle invalid UTF-8 ("strict", "replace" or "ignore")
+
+    Returns:
+        a tuple containing the leader and the list of fields
+
+    Raises:
+        PymarcException:
+            if the record cannot be read. The same exceptions are raised by
+            `pymarc.Record` for these records.
+        UnicodeDecodeError:
+            if the record contains invalid UTF-8 and `utf8_handling` is "strict"
+    """
+    leader = bytes(data[:LEADER_LENGTH]).decode("ascii")
+    if len(leader) != LEADER_LENGTH:
+        raise RecordLeaderInvalid()
+    entries = read_directory(data)
+    if len(data) < int(leader[:5]):
+        raise TruncatedRecord()
+    if not entries:
+        raise NoFieldsFound()
+    fields = decode_fields(
+        data, entries=entries, force_utf8=force_utf8, utf8_handling=utf8_handling
+    )
+    return leader, fields
+
+
+def read_control_number(data: Union[bytes, memoryview]) -> Union[str, None]:
+    """Return the value of the 001 field of a record or None if it is missing."""
+    fields = decode_fields(data, tags=["001"])
+    return fields[0]["001"] if fields else None
+
+
+def read_008_error(data: Union[bytes, memoryview]) -> Union[int, None]:
+    """
+    Check the 008 field of a record with `fixed_fields.find_008_error` without
+    decoding the rest of the record. The field is found with `read_directory`
+    and the table of allowed characters is chosen from positions 06-07 of the
+    leader, so a character is reported if `ControlField008` or
+    `validators.validate_fixed_fields` would report it.
+
+    Args:
+        data: the bytes of a single record in ISO 2709 format
+
+    Returns:
+        the first position of the 008 field with a character that is not
+        allowed, or None if the 008 field is valid or missing
+
+    Raises:
+        PymarcException: if the leader or directory is invalid
+    """
+    for tag, start, length in read_directory(data):
+        if tag == "008":
+            return find_008_error(
+                bytes(data[start : start + length]).decode("latin-1"),
+                bytes(data[:LEADER_LENGTH]).decode("latin-1"),
+            )
+    return None
+
+
+def precheck(
+    data: Union[bytes, memoryview], record_type: Union[str, None] = None
+) -> List[InitErrorDetails]:
+    """
+    Check a record for missing, extra and repeated fields without parsing it.
+    Tags are counted from the record directory and, unless `record_type` is
+    given, only the fields that `get_record_type` reads are decoded. The errors
+    returned are the same as those returned by `validators.validate_fields`.
+
+    Args:
+        data: the bytes of a single record in ISO 2709 format
+        record_type: the record type, if it is already known
+
+    Returns:
+        a list of errors for extra, repeated and missing fields
+
+    Raises:
+        PymarcException: if the leader or directory is invalid
+    """
+    entries = read_directory(data)
+    tag_counts: Dict[str, int] = {}
+    for tag, _, _ in entries:
+        tag_counts[tag] = tag_counts.get(tag, 0) + 1
+    if record_type is None:
+        record_type = get_record_type(
+            decode_fields(data, tags=RECORD_TYPE_TAGS, entries=entries)
+        )
+    return validate_tags(tag_counts, record_type)
+
+
+def _decode(data: bytes, utf8: bool, utf8_handling: str) -> str:
+    if utf8:
+        return data.decode("utf-8", utf8_handling)
+    return marc8_to_unicode(data, hide_utf8_warnings=True)
@@ -1,11 +1,40 @@
 """A module to translate errors from the validator to a more readable format"""
 
-from typing import Any, Dict, List, Tuple, Union
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, Union
 
 from pydantic_core import ErrorDetails
 
 from record_validator.adapters import get_adapter
-from record_validator.constants import AllFields, AllSubfields
+from record_validator.constants import ERROR_BUDGET_EXCEEDED, AllFields, AllSubfields
+
+_UNSET: Any = object()
+
+
+@lru_cache(maxsize=None)
+def get_examples_index(by_alias: bool) -> Dict[Tuple[str, str], List[str]]:
+    """
+    Build an index of the examples provided in the schema of each field model. The
+    schema is only generated once for each alias mode and the index is cached.
+
+    Args:
+        by_alias:
+            whether to key the index by the alias of each model field
+            (eg. "subfields.t") rather than its name (eg. "order_location")
+
+    Returns:
+        a dictionary mapping a tuple of a MARC tag and a model field to the list
+        of examples for that model field
+    """
+    adapter = get_adapter(record_type=None)
+    definitions = adapter.json_schema(by_alias=by_alias)["$defs"]
+    index = {}
+    for field in AllFields:
+        properties = definitions[field.name]["properties"]
+        for model_field, schema in properties.items():
+            if "examples" in schema:
+                index[(field.value, model_field)] = schema["examples"]
+    return index
 
 
 def get_field_examples(loc: tuple) -> Union[List[str], None]:
@@ -24,9 +53,7 @@ def get_field_examples(loc: tuple) -> Union[List[str], None]:
     model = field[0]
     if model not in [i.value for i in AllFields]:
         return None
-    else:
-        model_name = AllFields(model).name
-    if len(field) == 3 and field[1] == "subfields" and len(field[2]) == 1:
+    elif len(field) == 3 and field[1] == "subfields" and len(field[2]) == 1:
         model_field = f"subfields.{field[2]}"
         by_alias = True
     elif len(field) == 2:
@@ -35,18 +62,27 @@ def get_field_examples(loc: tuple) -> Union[List[str], None]:
     else:
         model_field = field[2]
         by_alias = False
-    adapter = get_adapter(record_type=None)
-    adapter_schema = adapter.json_schema(by_alias=by_alias)
-    return adapter_schema["$defs"][model_name]["properties"][model_field]["examples"]
+    return get_examples_index(by_alias).get((model, model_field))
 
 
 class MarcError:
     """A class to define an error identified while validating a MARC record"""
 
+    __slots__ = (
+        "original_error",
+        "type",
+        "ctx",
+        "_input",
+        "_loc",
+        "_loc_marc",
+        "_msg",
+    )
+
     def __init__(self, error: ErrorDetails):
         """
         This class adds attributes that enable the error data to be written to
-        a more readable format.
+        a more readable format. The `input`, `loc`, `loc_marc` and `msg`
+        attributes are computed the first time they are accessed.
 
         Args:
             error:
@@ -65,10 +101,34 @@ class MarcError:
         self.original_error = error
         self.type: str = error["type"]
         self.ctx: Union[dict[str, Any], None] = error.get("ctx", None)
-        self.input: Any = self._get_input()
-        self.loc: tuple = self._get_loc()
-        self.loc_marc: Union[str, tuple] = self._loc2marc()
-        self.msg: Union[str, None] = self._get_msg()
+        self._input: Any = _UNSET
+        self._loc: Any = _UNSET
+        self._loc_marc: Any = _UNSET
+        self._msg: Any = _UNSET
+
+    @property
+    def input(self) -> Any:
+        if self._input is _UNSET:
+            self._input = self._get_input()
+        return self._input
+
+    @property
+    def loc(self) -> tuple:
+        if self._loc is _UNSET:
+            self._loc = self._get_loc()
+        return self._loc
+
+    @property
+    def loc_marc(self) -> Union[str, tuple]:
+        if self._loc_marc is _UNSET:
+            self._loc_marc = self._loc2marc()
+        return self._loc_marc
+
+    @property
+    def msg(self) -> Union[str, None]:
+        if self._msg is _UNSET:
+            self._msg = self._get_msg()
+        return self._msg
 
     def _get_input(self) -> Union[str, tuple, List[str], None]:
         """Get the input that caused the error. Adds an input for ValueErrors."""
@@ -114,7 +174,9 @@ class MarcError:
             and ("pattern" in self.ctx or "string" in self.type)
         ):
             examples = get_field_examples(self.loc)
-            out_msg = msg.split(" '")[0].strip()
+            if "position" in self.ctx and not examples:
+                return msg
+            out_msg = msg if "position" in self.ctx else msg.split(" '")[0].strip()
             if examples and "852" in self.loc and "max_length" in self.ctx:
                 examples = [i[: self.ctx["max_length"]] for i in examples]
             return f"{out_msg}. Examples: {examples}"
@@ -152,11 +214,35 @@ class MarcError:
         return "".join(out_loc)
 
 
+_Categories = Tuple[
+    List[Union[str, Tuple[str, str]]],
+    List[Union[str, Tuple[str, str]]],
+    List[MarcError],
+    List[Dict[str, str]],
+]
+
+
 class MarcValidationError:
     """A class to model a list of `MarcError` objects as a single error object"""
 
+    __slots__ = (
+        "truncated",
+        "error_count",
+        "_details",
+        "_errors",
+        "_categories",
+        "_invalid_fields",
+    )
+
     def __init__(self, errors: List[ErrorDetails]):
         """
+        Only the number of errors and whether validation was truncated are found
+        when the object is created. The `MarcError` objects are built the first
+        time `errors` is accessed and are sorted into missing, extra, invalid and
+        order/item errors in a single pass the first time one of those lists is
+        accessed. The messages of invalid fields, which may include examples from
+        the schema, are only built when `invalid_fields` is accessed.
+
         Args:
             errors:
                 a list of `ErrorDetails` objects from the `errors()` method of
@@ -176,59 +262,99 @@ class MarcValidationError:
             order_item_mismatches:
                 a list of dictionaries with the order location, item location,
                 and item type that do not match valid combinations
+            truncated:
+                whether validation stopped early because an error budget was
+                used up, in which case the record may contain other errors
         """
-        self.errors = [MarcError(i) for i in errors]
-        self.error_count = len(errors)
-        self.missing_fields = self._get_missing_fields()
-        self.extra_fields = self._get_extra_fields()
-        self.invalid_fields = self._get_invalid_fields()
-        self.order_item_mismatches = self._get_order_item_mismatch_errors()
-
-    def _get_missing_fields(self) -> List[Union[str, Tuple[str, str]]]:
-        """Get MARC tags for missing fields from the list of errors"""
-        return [
-            i.loc_marc
-            for i in self.errors
-            if i.type == "missing" or i.type == "missing_required_field"
-        ]
-
-    def _get_extra_fields(self) -> List[Union[str, Tuple[str, str]]]:
-        """Get MARC tags for extra fields from the list of errors"""
-        return [i.loc_marc for i in self.errors if i.type == "extra_forbidden"]
-
-    def _get_invalid_fields(self) -> List[Dict[str, Any]]:
+        details = [i for i in errors if i["type"] != ERROR_BUDGET_EXCEEDED]
+        self.truncated = len(details) != len(errors)
+        self.error_count = len(details)
+        self._details: Sequence[ErrorDetails] = details
+        self._errors: Union[List[MarcError], None] = None
+        self._categories: Union[_Categories, None] = None
+        self._invalid_fields: Union[List[Dict[str, Any]], None] = None
+
+    @property
+    def errors(self) -> List[MarcError]:
+        if self._errors is None:
+            self._errors = [MarcError(i) for i in self._details]
+            self._details = ()
+        return self._errors
+
+    @property
+    def missing_fields(self) -> List[Union[str, Tuple[str, str]]]:
+        """MARC tags for missing fields from the list of errors"""
+        return self._categorize()[0]
+
+    @property
+    def extra_fields(self) -> List[Union[str, Tuple[str, str]]]:
+        """MARC tags for extra fields from the list of errors"""
+        return self._categorize()[1]
+
+    @property
+    def invalid_fields(self) -> List[Dict[str, Any]]:
         """
-        Get a list of dictionaries with the field, input and error type for fields
+        A list of dictionaries with the field, input and error type for fields
         with other errors (eg. string_pattern_error, literal_error).
         """
-        invalid_fields = [
-            i
-            for i in self.errors
-            if i.type
-            not in [
-                "missing",
-                "missing_required_field",
-                "extra_forbidden",
-                "order_item_mismatch",
+        if self._invalid_fields is None:
+            self._invalid_fields = [
+                {"field": i.loc_marc, "input": i.input, "error_type": i.msg}
+                for i in self._categorize()[2]
             ]
-        ]
-
-        invalid_field_list = []
-        for error in invalid_fields:
-            out = {
-                "field": error.loc_marc,
-                "input": error.input,
-                "error_type": error.msg,
-            }
-            invalid_field_list.append(out)
-        return invalid_field_list
-
-    def _get_order_item_mismatch_errors(self) -> List[Dict[str, str]]:
+        return self._invalid_fields
+
+    @property
+    def order_item_mismatches(self) -> List[Dict[str, str]]:
         """
-        Get a list of dictionaries with the order location, item location, and
-        item type that do not match valid combinations.
+        A list of dictionaries with the order location, item location, and item
+        type that do not match valid combinations.
         """
-        return [i.input for i in self.errors if i.type == "order_item_mismatch"]
+        return self._categorize()[3]
+
+    @classmethod
+    def from_iter(
+        cls, errors: Iterable[ErrorDetails]
+    ) -> Union["MarcValidationError", None]:
+        """
+        Build a `MarcValidationError` from errors as they are produced, eg. by
+        `validators.iter_errors`. Each error is converted to a `MarcError` and
+        sorted into missing, extra, invalid or order/item errors as it is
+        consumed, so the list of errors is only read once.
+
+        Args:
+            errors: an iterable of `ErrorDetails` objects
+
+        Returns:
+            a `MarcValidationError`, or None if there are no errors
+        """
+        self = cls.__new__(cls)
+        self.truncated = False
+        self._details = ()
+        self._errors = []
+        self._categories = ([], [], [], [])
+        self._invalid_fields = None
+        for detail in errors:
+            if detail["type"] == ERROR_BUDGET_EXCEEDED:
+                self.truncated = True
+                continue
+            error = MarcError(detail)
+            self._errors.append(error)
+            _add_to_category(self._categories, error)
+        self.error_count = len(self._errors)
+        return self if self._errors else None
+
+    def _categorize(self) -> _Categories:
+        """
+        Sort the errors into missing fields, extra fields, invalid fields and
+        order/item mismatches in a single pass.
+        """
+        if self._categories is None:
+            categories: _Categories = ([], [], [], [])
+            for error in self.errors:
+                _add_to_category(categories, error)
+            self._categories = categories
+        return self._categories
 
     def to_dict(self) -> Dict[str, Any]:
         """Return the error data as a dictionary"""
@@ -238,4 +364,17 @@ class MarcValidationError:
             "extra_fields": self.extra_fields,
             "invalid_fields": self.invalid_fields,
             "order_item_mismatches": self.order_item_mismatches,
+            "truncated": self.truncated,
         }
+
+
+def _add_to_category(categories: _Categories, error: MarcError) -> None:
+    """Add an error to the missing, extra, invalid or order/item category."""
+    if error.type in ("missing", "missing_required_field"):
+        categories[0].append(error.loc_marc)
+    elif error.type == "extra_forbidden":
+        categories[1].append(error.loc_marc)
+    elif error.type == "order_item_mismatch":
+        categories[3].append(error.input)
+    else:
+        categories[2].append(error)
@@ -1,12 +1,22 @@
 """This module contains pydantic models for validating vendor-provided MARC records."""
 
-from typing import Annotated, Dict, List, Union
+from typing import Annotated, Any, Dict, Iterator, List, Sequence, Union
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
+from pydantic_core import ErrorDetails
 from pydantic.functional_validators import AfterValidator, BeforeValidator
 from pymarc import Field as MarcField
+from pymarc import Leader, Record
 
-from record_validator.validators import validate_all, validate_leader
+from record_validator.cache import FieldCache
+from record_validator.validators import (
+    check_leader,
+    find_leader_error,
+    fields_are_valid,
+    iter_errors,
+    validate_leader,
+    validate_record_fields,
+)
 
 
 class RecordModel(BaseModel):
@@ -17,7 +27,11 @@ class RecordModel(BaseModel):
     or MARC data in another format. The `leader` field is a string that must be 24
     characters long. The `fields` field is a list of fields in the MARC record which
     will be validated against the appropriate field models using the `AfterValidator`
-    `validate_all` function.
+    `validate_record_fields` function, which calls `validate_all`. If the leader is
+    valid, it is passed to `validate_all` so that the 008 field is checked against
+    the material type given by the leader. A `FieldCache` and the engine used to
+    validate each field can be passed to `validate_all` with the validation context
+    `{"field_cache": cache, "engine": "rules"}`.
 
     Args:
         leader: The leader field of the MARC record.
@@ -28,17 +42,158 @@ class RecordModel(BaseModel):
 
     leader: Annotated[
         str,
-        Field(
-            min_length=24,
-            max_length=24,
-            pattern=r"^[0-9]{5}[acdnp][acdefgijkmoprt][abcdims][\sa][\sa]22[0-9]{5}[\s12345678uz][\sacinu][\sabc]4500$",  # noqa E501
-        ),
+        Field(min_length=24, max_length=24),
         BeforeValidator(validate_leader),
+        AfterValidator(check_leader),
     ]
     fields: Annotated[
         Union[
             List[MarcField],
             List[Dict[str, Union[str, Dict[str, Union[str, List[Dict[str, str]]]]]]],
         ],
-        AfterValidator(validate_all),
+        AfterValidator(validate_record_fields),
     ]
+
+
+_LEADER_ADAPTER: TypeAdapter = TypeAdapter(
+    RecordModel.model_fields["leader"].rebuild_annotation()
+)
+_FIELDS_ADAPTER: TypeAdapter = TypeAdapter(
+    RecordModel.model_fields["fields"].annotation,
+    config=ConfigDict(arbitrary_types_allowed=True),
+)
+
+
+def is_valid(
+    record: Union[Record, Dict[str, Any]],
+    cache: Union[FieldCache, None] = None,
+    engine: str = "pydantic",
+) -> bool:
+    """
+    Return whether a record would pass validation with `RecordModel`. The leader
+    and fields are checked against the same constraints as `RecordModel` and the
+    fields are checked with `fields_are_valid`, which stops at the first failure.
+    No `ValidationError`, error messages or examples are built, so this is faster
+    than `RecordModel` when only a yes/no answer is needed.
+
+    Args:
+        record: a `pymarc.Record` or a dict with "leader" and "fields" keys
+        cache: an optional `FieldCache` to store field validation results in
+        engine: the engine used to validate each field, "pydantic" or "rules"
+
+    Returns:
+        True if the record is valid, otherwise False
+    """
+    leader: Union[str, Leader, None]
+    fields: Union[List[Any], None]
+    if isinstance(record, Record):
+        leader, fields = record.leader, record.fields
+    else:
+        leader, fields = record.get("leader"), record.get("fields")
+    if not _leader_is_valid(leader):
+        return False
+    try:
+        fields = _FIELDS_ADAPTER.validate_python(fields)
+    except ValidationError:
+        return False
+    return fields_are_valid(fields, leader=leader, cache=cache, engine=engine)
+
+
+def get_record_errors(
+    leader: str,
+    fields: Sequence[Union[MarcField, Dict[str, Any]]],
+    cache: Union[FieldCache, None] = None,
+    max_errors: Union[int, None] = None,
+    engine: str = "pydantic",
+) -> List[ErrorDetails]:
+    """
+    Return the errors that `RecordModel` would report for a record whose fields
+    are already `pymarc.Field` objects or dicts in the format returned by
+    `field2dict`, such as the fields returned by `iso2709.decode_record`.
+    `RecordModel` copies every dict in a list of fields while checking its
+    shape; here the fields are passed to `validators.iter_errors` as they are and the
+    location of each error is prefixed with "leader" or "fields" as it is by
+    `RecordModel`.
+
+    Args:
+        leader: the leader of the record
+        fields: the fields of the record
+        cache: an optional `FieldCache` to store field validation results in
+        max_errors: the number of errors after which validation of the fields stops
+        engine: the engine used to validate each field, "pydantic" or "rules"
+
+    Returns:
+        a list of errors, which is empty if the record is valid
+    """
+    return list(
+        iter_record_errors(
+            leader, fields, cache=cache, max_errors=max_errors, engine=engine
+        )
+    )
+
+
+def iter_record_errors(
+    leader: str,
+    fields: Sequence[Union[MarcField, Dict[str, Any]]],
+    cache: Union[FieldCache, None] = None,
+    max_errors: Union[int, None] = None,
+    engine: str = "pydantic",
+) -> Iterator[ErrorDetails]:
+    """
+    Yield the errors that `get_record_errors` returns one at a time as the fields
+    are validated with `validators.iter_errors`, so that they can be passed to
+    `MarcValidationError.from_iter` without building a list of errors first.
+
+    Args:
+        leader: the leader of the record
+        fields: the fields of the record
+        cache: an optional `FieldCache` to store field validation results in
+        max_errors: the number of errors after which validation of the fields stops
+        engine: the engine used to validate each field, "pydantic" or "rules"
+
+    Yields:
+        each error, with its location prefixed with "leader" or "fields"
+    """
+    leader_errors = get_leader_errors(leader)
+    yield from leader_errors
+    for error in iter_errors(
+        fields,
+        leader=None if leader_errors else leader,
+        cache=cache,
+        max_errors=max_errors,
+        engine=engine,
+    ):
+        loc = ("fields", *error["loc"])
+        yield ErrorDetails(**{**error, "loc": loc})  # type: ignore
+
+
+def get_leader_errors(leader: Union[str, Leader]) -> List[ErrorDetails]:
+    """
+    Return the errors that `RecordModel` would report for a leader.
+
+    Args:
+        leader: the leader of a record
+
+    Returns:
+        a list of errors located at "leader", which is empty if the leader is valid
+    """
+    errors: List[ErrorDetails] = []
+    if not _leader_is_valid(leader):
+        try:
+            _LEADER_ADAPTER.validate_python(leader)
+        except ValidationError as e:
+            errors = _prefix_loc("leader", e.errors())
+    return errors
+
+
+def _leader_is_valid(leader: Any) -> bool:
+    """
+    Check a leader as `RecordModel` does, with `validators.find_leader_error`,
+    without building a `ValidationError`.
+    """
+    leader = validate_leader(leader)
+    return len(leader) == 24 and find_leader_error(leader) is None
+
+
+def _prefix_loc(loc: str, errors: List[ErrorDetails]) -> List[ErrorDetails]:
+    return [ErrorDetails(**{**i, "loc": (loc, *i["loc"])}) for i in errors]
@@ -0,0 +1,113 @@
+"""
+This module contains functions for reading MARC records in MARCXML format without
+loading a whole file into memory. Records are converted to the dicts used by
+`field2dict` rather than to `pymarc.Record` objects.
+
+Functions:
+    read_records:
+        Read the leader and fields of each record in a MARCXML document one at a
+        time with `xml.etree.ElementTree.iterparse`.
+    element_to_fields:
+        Convert the fields of a `<record>` element to the dicts used by
+        `field2dict`.
+
+Constants:
+    MARCXML_NAMESPACE:
+        The namespace of MARCXML elements.
+"""
+
+import os
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple, Union
+from xml.etree import ElementTree
+
+MARCXML_NAMESPACE = "http://www.loc.gov/MARC21/slim"
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def element_to_fields(
+    record: ElementTree.Element,
+) -> Tuple[Union[str, None], List[Dict[str, Any]]]:
+    """
+    Convert a `<record>` element to a leader and a list of fields in the format
+    returned by `field2dict`. Elements are matched by local name so that records
+    with or without the MARCXML namespace are read, as with `pymarc.parse_xml`.
+    Missing indicators are read as " ", also as with `pymarc.parse_xml`.
+
+    Args:
+        record: a `<record>` element
+
+    Returns:
+        a tuple containing the leader, or None if the record has no leader, and
+        the list of fields
+
+    Raises:
+        KeyError: if a field does not have a tag or a subfield does not have a code
+    """
+    leader = None
+    fields: List[Dict[str, Any]] = []
+    for element in record:
+        name = _local_name(element.tag)
+        if name == "leader":
+            leader = element.text or ""
+        elif name == "controlfield":
+            fields.append({element.attrib["tag"]: element.text or ""})
+        elif name == "datafield":
+            subfields = [
+                {subfield.attrib["code"]: subfield.text or ""}
+                for subfield in element
+                if _local_name(subfield.tag) == "subfield"
+            ]
+            fields.append(
+                {
+                    element.attrib["tag"]: {
+                        "ind1": element.get("ind1", " "),
+                        "ind2": element.get("ind2", " "),
+                        "subfields": subfields,
+                    }
+                }
+            )
+    return leader, fields
+
+
+def read_records(
+    source: Union[str, os.PathLike, BinaryIO],
+) -> Iterator[Tuple[Union[str, None], List[Dict[str, Any]], Union[Exception, None]]]:
+    """
+    Read each record in a MARCXML document. The document is parsed incrementally
+    and each `<record>` element is cleared as soon as it has been converted, so
+    memory use does not depend on the number of records in the document.
+
+    A record that cannot be converted is yielded with an empty list of fields and
+    the exception, and reading continues with the next record. If the document is
+    not well-formed XML, the `ElementTree.ParseError` is raised and no further
+    records can be read.
+
+    Args:
+        source: the path to a MARCXML file or a binary file-like object
+
+    Yields:
+        a tuple containing the leader, the fields and an exception or None
+
+    Raises:
+        ElementTree.ParseError: if the document is not well-formed
+    """
+    root: Union[ElementTree.Element, None] = None
+    for event, element in ElementTree.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = element
+            continue
+        if _local_name(element.tag) != "record":
+            continue
+        exception = None
+        try:
+            leader, fields = element_to_fields(element)
+        except KeyError as exc:
+            leader, fields, exception = None, [], exc
+        yield leader, fields, exception
+        element.clear()
+        if root is not None and root is not element:
+            root.clear()
@@ -0,0 +1,68 @@
+"""
+This module contains functions for reading and writing newline-delimited
+MARC-in-JSON, with one record per line in the format returned by
+`pymarc.Record.as_dict`. Records are decoded straight to the dicts that
+`RecordModel` accepts, without building `pymarc.Record` objects.
+
+Functions:
+    read_records:
+        Read and decode each line of a newline-delimited MARC-in-JSON stream.
+    annotate_line:
+        Add a validation result to the JSON object on a line without decoding
+        and encoding the record again.
+"""
+
+import json
+from typing import Any, BinaryIO, Dict, Iterator, Tuple, Union
+
+
+def read_records(
+    stream: BinaryIO,
+) -> Iterator[Tuple[int, bytes, Union[Dict[str, Any], None], Union[Exception, None]]]:
+    """
+    Read each line of a newline-delimited MARC-in-JSON stream. Lines are read and
+    decoded one at a time so memory use does not depend on the size of the
+    stream. Blank lines are skipped. A line that is not valid JSON, or is not a
+    JSON object, is yielded with the exception and reading continues with the
+    next line.
+
+    Args:
+        stream: a binary file-like object
+
+    Yields:
+        a tuple containing the byte offset of the line, the line, the decoded
+        record or None and an exception or None
+    """
+    offset = 0
+    for line in stream:
+        start, offset = offset, offset + len(line)
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield start, line, None, exc
+            continue
+        if not isinstance(record, dict):
+            yield start, line, None, ValueError("Expected a JSON object")
+            continue
+        yield start, line, record, None
+
+
+def annotate_line(line: bytes, key: str, value: Any) -> bytes:
+    """
+    Add a key to the JSON object on a line. The record is not decoded again;
+    the closing brace is replaced with the encoded key and value.
+
+    Args:
+        line: a line containing a JSON object, with or without a line ending
+        key: the key to add
+        value: a value that can be encoded with `json.dumps`
+
+    Returns:
+        the line with the key added, ending with a newline
+    """
+    body = line.rstrip()[:-1].rstrip()
+    separator = b"," if not body.endswith(b"{") else b""
+    member = json.dumps({key: value}, default=str)[1:-1].encode()
+    return body + separator + member + b"}\n"
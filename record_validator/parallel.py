@@ -0,0 +1,185 @@
+"""
+This module contains functions to validate large files of MARC records across
+multiple processes.
+
+Functions:
+    split_file:
+        Split a file of MARC records into byte ranges that begin and end on
+        record boundaries.
+    validate_file_parallel:
+        Validate a file of MARC records in a pool of worker processes and yield a
+        `RecordResult` for each record in the order the records appear in the file.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from io import BytesIO
+from typing import Any, Deque, Iterator, List, Tuple, Union
+
+from record_validator.adapters import ADAPTER_REGISTRY
+from record_validator.cache import FieldCache
+from record_validator.iso2709 import END_OF_RECORD, READ_SIZE
+from record_validator.marc_errors import get_examples_index
+from record_validator.streaming import RecordResult, validate_file
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def split_file(
+    path: Union[str, os.PathLike], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> List[Tuple[int, int]]:
+    """
+    Split a file into byte ranges of roughly `chunk_size` bytes. Each range is
+    extended to the next end of record terminator so that no record is split
+    between two ranges. Only the bytes around each boundary are read.
+
+    Args:
+        path: the path to a file of MARC records in ISO 2709 format
+        chunk_size: the target size of each range in bytes
+
+    Returns:
+        a list of tuples containing the start and end offset of each range
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, "rb") as stream:
+        while start < size:
+            end = min(start + chunk_size, size)
+            stream.seek(end - 1)
+            while end < size:
+                block = stream.read(READ_SIZE)
+                boundary = block.find(END_OF_RECORD)
+                if boundary != -1:
+                    end += boundary
+                    break
+                end += len(block)
+            end = min(end, size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def validate_file_parallel(
+    path: Union[str, os.PathLike],
+    workers: Union[int, None] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    precheck: bool = False,
+    deep: bool = True,
+    cache_size: int = 0,
+    max_errors: Union[int, None] = None,
+    max_file_errors: Union[int, None] = None,
+    engine: str = "pydantic",
+    decoder: str = "pymarc",
+    **reader_kwargs: Any,
+) -> Iterator[RecordResult]:
+    """
+    Validate a file of MARC records in a `ProcessPoolExecutor`. The file is split
+    into record-aligned byte ranges with `split_file` and each range is validated
+    by a worker with `validate_file`. Workers build all adapters when they start
+    so that no range pays for schema construction. Results are yielded in the
+    order the records appear in the file and only a few ranges are in flight at
+    a time, so memory use depends on `chunk_size` and `workers` rather than the
+    size of the file.
+
+    Args:
+        path: the path to a file of MARC records in ISO 2709 format
+        workers:
+            the number of worker processes. Defaults to the number of CPUs. If 1,
+            the file is validated in the current process.
+        chunk_size: the target size in bytes of the range sent to each worker
+        precheck: whether to check the record directory before full validation
+        deep: whether to parse and fully validate records
+        cache_size:
+            the size of the `FieldCache` used for each range. No cache is used if
+            0.
+        max_errors: the number of errors after which validation of a record stops
+        max_file_errors: the number of errors after which validation of the file
+            stops. Ranges that have not started are cancelled.
+        engine: the engine used to validate each field, "pydantic" or "rules"
+        decoder: how each record is decoded, one of `streaming.DECODERS`
+        reader_kwargs:
+            keyword arguments passed to `pymarc.Record` or
+            `iso2709.decode_record`
+
+    Yields:
+        a `RecordResult` for each record in the file
+    """
+    ranges = split_file(path, chunk_size=chunk_size)
+    kwargs = {
+        **reader_kwargs,
+        "precheck": precheck,
+        "deep": deep,
+        "cache_size": cache_size,
+        "max_errors": max_errors,
+        "max_file_errors": max_file_errors,
+        "engine": engine,
+        "decoder": decoder,
+    }
+    workers = workers or os.cpu_count() or 1
+    index = 0
+    file_errors = 0
+    if workers == 1:
+        _warm_worker()
+        for start, end in ranges:
+            for result in _validate_range(path, start, end, kwargs):
+                result.index = index
+                index += 1
+                file_errors += result.error_count
+                result.truncated = _budget_used(file_errors, max_file_errors)
+                yield result
+                if result.truncated:
+                    return
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker) as pool:
+        window = 2 * workers
+        pending: Deque[Future] = deque()
+        queued = iter(ranges)
+        while True:
+            for start, end in queued:
+                pending.append(pool.submit(_validate_range, path, start, end, kwargs))
+                if len(pending) >= window:
+                    break
+            if not pending:
+                return
+            for result in pending.popleft().result():
+                result.index = index
+                index += 1
+                file_errors += result.error_count
+                result.truncated = _budget_used(file_errors, max_file_errors)
+                yield result
+                if result.truncated:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    return
+
+
+def _budget_used(file_errors: int, max_file_errors: Union[int, None]) -> bool:
+    """Return whether the error budget for a file has been used up."""
+    return max_file_errors is not None and file_errors >= max_file_errors
+
+
+def _validate_range(
+    path: Union[str, os.PathLike], start: int, end: int, kwargs: dict
+) -> List[RecordResult]:
+    """Validate the records in a byte range of a file with `validate_file`."""
+    with open(path, "rb") as stream:
+        stream.seek(start)
+        data = stream.read(end - start)
+    options = dict(kwargs)
+    cache_size = options.pop("cache_size", 0)
+    cache = FieldCache(maxsize=cache_size) if cache_size else None
+    results = list(validate_file(BytesIO(data), cache=cache, **options))
+    for result in results:
+        assert result.offset is not None
+        result.offset += start
+    return results
+
+
+def _warm_worker() -> None:
+    """Build the adapters and examples index used during validation."""
+    ADAPTER_REGISTRY.warm()
+    get_examples_index(by_alias=True)
+    get_examples_index(by_alias=False)
@@ -0,0 +1,582 @@
+"""
+This module contains an optional rule engine that validates fields without
+pydantic. The constraints declared on the models in `field_models` (literal values,
+string lengths and patterns, the "after" validators in `AFTER_VALIDATORS`,
+required and optional subfields and "after" model validators) are compiled once
+into a flat table of checks that are run directly against `pymarc.Field` objects
+and dicts. The errors have the same types, locations, inputs and context as the
+errors returned by the `TypeAdapter` for the same record type.
+
+Only fields whose tag, indicators, subfield codes and values are all strings are
+checked by the engine. Any other field, and any model containing a constraint that
+cannot be compiled, is passed to the `TypeAdapter` so that the result is always
+the same as validating with pydantic.
+
+Classes:
+    FieldRule:
+        The compiled checks for a single attribute of a field model.
+    CompiledModel:
+        The compiled checks for a field model.
+    RuleSet:
+        The compiled models for a tuple of field models from `adapters`. A
+        `RuleSet` can be used in place of the `TypeAdapter` for the same tuple.
+
+Functions:
+    compile_model:
+        Compile the constraints of a field model into a `CompiledModel`.
+    get_rule_set:
+        Return the `RuleSet` for a record type.
+    get_validator:
+        Return the `TypeAdapter` or `RuleSet` used to validate the fields of a
+        record type with an engine.
+
+Constants:
+    ENGINES:
+        The names of the engines that can be used to validate fields.
+    AFTER_VALIDATORS:
+        The "after" validators of string attributes that can be compiled. Each
+        raises a `PydanticCustomError` for an invalid value.
+"""
+
+import re
+import threading
+from types import SimpleNamespace
+from typing import (
+    Annotated,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Tuple,
+    Union,
+    get_args,
+    get_origin,
+)
+
+from annotated_types import MaxLen, MinLen
+from pydantic import AfterValidator, BaseModel, TypeAdapter, ValidationError
+from pydantic.fields import FieldInfo
+from pydantic_core import ErrorDetails, InitErrorDetails, PydanticCustomError
+from pymarc import Field as MarcField
+
+from record_validator import adapters
+from record_validator.adapters import (
+    MODEL_TAGS,
+    TAGS,
+    get_adapter,
+    get_adapter_key,
+    get_matching_tags,
+)
+from record_validator.base_fields import BaseControlField, BaseDataField
+from record_validator.fixed_fields import check_008
+
+ENGINES = ("pydantic", "rules")
+AFTER_VALIDATORS = frozenset([check_008])
+
+Check = Tuple[Tuple[str, Callable[[str], Any], Dict[str, Any]], ...]
+
+
+class FieldRule:
+    """
+    The compiled checks for a single attribute of a field model. Each check is a
+    tuple containing an error type, a test and the context of the error. The
+    checks in a branch are run in order and stop at the first failure, in the
+    same way as pydantic's string and literal validators. A value is valid if it
+    passes every check in any branch.
+
+    Args:
+        name: the name of the attribute
+        source: the subfield code the value is read from, or None for the tag,
+            indicators and control field value
+        required: whether the attribute must be present
+        branches: a tuple of (label, checks). The label is added to the location
+            of an error if the attribute is a union and is None otherwise.
+
+    Attributes:
+        name: the name of the attribute
+        source: the subfield code the value is read from
+        required: whether the attribute must be present
+        branches: the compiled checks for each member of the attribute's type
+    """
+
+    __slots__ = ("name", "source", "required", "branches")
+
+    def __init__(
+        self,
+        name: str,
+        source: Union[str, None],
+        required: bool,
+        branches: Tuple[Tuple[Union[str, None], Check], ...],
+    ):
+        self.name = name
+        self.source = source
+        self.required = required
+        self.branches = branches
+
+    def errors(self, value: str, loc: Tuple[str, ...]) -> List[InitErrorDetails]:
+        """Return the errors for a value of the attribute."""
+        errors = []
+        for label, checks in self.branches:
+            for error_type, test, ctx in checks:
+                error: Union[str, PydanticCustomError] = error_type
+                try:
+                    valid = test(value)
+                except PydanticCustomError as exc:
+                    valid, error, ctx = False, exc, exc.context or {}
+                if not valid:
+                    errors.append(
+                        InitErrorDetails(
+                            type=error,  # type: ignore[typeddict-item]
+                            loc=loc + (self.name,) + ((label,) if label else ()),
+                            input=value,
+                            ctx=ctx,
+                        )
+                    )
+                    break
+            else:
+                return []
+        return errors
+
+
+class CompiledModel:
+    """
+    The compiled checks for a field model.
+
+    Args:
+        model: the field model
+        rules: a `FieldRule` for each attribute in the order pydantic validates them
+        validators: the "after" model validators of the model
+
+    Attributes:
+        model: the field model
+        control: whether the model is a control field
+        rules: the `FieldRule` for each attribute
+        validators: the "after" model validators of the model
+        defaults: the default value of each optional attribute
+    """
+
+    def __init__(
+        self,
+        model: type[BaseModel],
+        rules: Tuple[FieldRule, ...],
+        validators: Tuple[Callable[[Any], Any], ...],
+    ):
+        self.model = model
+        self.control = issubclass(model, BaseControlField)
+        self.rules = rules
+        self.validators = validators
+        self.defaults = {
+            name: info.default
+            for name, info in model.model_fields.items()
+            if not info.is_required()
+        }
+
+    def errors(
+        self, loc: str, field: Union[MarcField, Dict[str, Any]]
+    ) -> Union[List[InitErrorDetails], None]:
+        """
+        Check a field against the model.
+
+        Args:
+            loc: the discriminator of the field, used as the start of each location
+            field: a MARC field as a `pymarc.Field` object or a dict
+
+        Returns:
+            a list of errors, or None if the field cannot be checked by the engine
+        """
+        data = _control_input(field) if self.control else _data_input(field)
+        if data is None:
+            return None
+        values, subfields = data
+        found = {}
+        for rule in self.rules:
+            if rule.source is None:
+                value = values.get(rule.name)
+            else:
+                value = subfields.get(rule.source)
+            if value is not None:
+                found[rule.name] = value
+        errors: List[InitErrorDetails] = []
+        for rule in self.rules:
+            value = found.get(rule.name)
+            if value is not None:
+                errors.extend(rule.errors(value, (loc,)))
+            elif rule.required:
+                errors.append(
+                    InitErrorDetails(
+                        type="missing",  # type: ignore[typeddict-item]
+                        loc=(loc, rule.name),
+                        input=self._missing_input(values, found),
+                    )
+                )
+        if errors or not self.validators:
+            return errors
+        instance = SimpleNamespace(**{**self.defaults, **found})
+        for validator in self.validators:
+            try:
+                validator(instance)
+            except ValueError as exc:
+                return [
+                    InitErrorDetails(
+                        type="value_error",  # type: ignore[typeddict-item]
+                        loc=(loc,),
+                        input=field,
+                        ctx={"error": exc},
+                    )
+                ]
+        return []
+
+    def _missing_input(
+        self, values: Dict[str, Any], found: Dict[str, str]
+    ) -> Dict[str, Any]:
+        # the input that `get_data_field_input` passes to the model
+        out = {i: values[i] for i in ("tag", "ind1", "ind2")}
+        subfields = [
+            i if isinstance(i, dict) else {i[0]: i[1]} for i in values["subfields"]
+        ]
+        out["subfields"] = sorted(subfields, key=lambda x: next(iter(x)))
+        out.update(
+            {i.name: found[i.name] for i in self.rules if i.source and i.name in found}
+        )
+        return out
+
+
+class RuleSet:
+    """
+    The compiled models for a tuple of field models from `adapters`. Fields are
+    matched to a model by tag with the same rules as `tag_discriminator`, using
+    `adapters.MODEL_TAGS`. Fields that the engine cannot check are validated by
+    the `TypeAdapter` built from the tuple.
+
+    Args:
+        adapter_key: the name of the field tuple (eg. "MonographFields")
+
+    Attributes:
+        adapter_key: the name of the field tuple
+        models: the `CompiledModel` for each discriminator value. This is empty
+            for "FieldList", which is not a discriminated union.
+    """
+
+    def __init__(self, adapter_key: str):
+        self.adapter_key = adapter_key
+        self.models: Dict[str, CompiledModel] = {}
+        if adapter_key != "FieldList":
+            for annotation in getattr(adapters, adapter_key):
+                model, tag = get_args(annotation)
+                compiled = compile_model(model)
+                if compiled is not None:
+                    self.models[tag.tag] = compiled
+
+    @property
+    def adapter(self) -> TypeAdapter:
+        """The `TypeAdapter` used for fields that the engine cannot check."""
+        return adapters.ADAPTER_REGISTRY.get(self.adapter_key)
+
+    def errors(self, field: Union[MarcField, Dict[str, Any]]) -> List[ErrorDetails]:
+        """
+        Validate a field and return the errors in the format of
+        `ValidationError.errors`.
+
+        Args:
+            field: a MARC field as a `pymarc.Field` object or a dict
+
+        Returns:
+            a list of errors, which is empty if the field is valid
+        """
+        try:
+            self.validate_python(field)
+        except ValidationError as e:
+            return e.errors()  # type: ignore[return-value]
+        return []
+
+    def validate_python(
+        self, field: Union[MarcField, Dict[str, Any]], from_attributes: bool = True
+    ) -> Union[MarcField, Dict[str, Any]]:
+        """
+        Validate a field. This has the same signature as
+        `TypeAdapter.validate_python` so that a `RuleSet` can be used wherever an
+        adapter is used.
+
+        Args:
+            field: a MARC field as a `pymarc.Field` object or a dict
+            from_attributes: passed to the `TypeAdapter` for fallback validation
+
+        Returns:
+            the field
+
+        Raises:
+            ValidationError: if the field is invalid
+        """
+        errors = None
+        if isinstance(field, MarcField) or (isinstance(field, dict) and field):
+            tag = field.tag if isinstance(field, MarcField) else next(iter(field))
+            loc = tag if tag in MODEL_TAGS else "data_field"
+            model = self.models.get(loc)
+            if model is not None:
+                errors = model.errors(loc, field)
+        if errors is None:
+            self.adapter.validate_python(field, from_attributes=from_attributes)
+        elif errors:
+            raise ValidationError.from_exception_data(
+                title="tagged-union", line_errors=errors
+            )
+        return field
+
+
+def _control_input(
+    field: Union[MarcField, Dict[str, Any]],
+) -> Union[Tuple[Dict[str, Any], Dict[str, str]], None]:
+    if isinstance(field, MarcField):
+        if not field.is_control_field():
+            return None
+        tag, value = field.tag, field.data
+    elif len(field) == 1:
+        ((tag, value),) = field.items()
+    else:
+        return None
+    if not isinstance(tag, str) or not isinstance(value, str):
+        return None
+    return {"tag": tag, "value": value}, {}
+
+
+def _data_input(
+    field: Union[MarcField, Dict[str, Any]],
+) -> Union[Tuple[Dict[str, Any], Dict[str, str]], None]:
+    if isinstance(field, MarcField):
+        if field.is_control_field():
+            return None
+        tag, ind1, ind2 = field.tag, field.indicator1, field.indicator2
+        subfields: Any = field.subfields
+        pairs = subfields
+    elif len(field) == 1 and "tag" not in field:
+        ((tag, data),) = field.items()
+        if not isinstance(data, dict) or any(
+            i not in data for i in ("ind1", "ind2", "subfields")
+        ):
+            return None
+        ind1, ind2, subfields = data["ind1"], data["ind2"], data["subfields"]
+        if not isinstance(subfields, list) or not all(
+            isinstance(i, dict) and len(i) == 1 for i in subfields
+        ):
+            return None
+        pairs = [next(iter(i.items())) for i in subfields]
+    else:
+        return None
+    if not (isinstance(tag, str) and isinstance(ind1, str) and isinstance(ind2, str)):
+        return None
+    values: Dict[str, str] = {}
+    for code, value in pairs:
+        if not (isinstance(code, str) and isinstance(value, str)):
+            return None
+        values[code] = value
+    return {"tag": tag, "ind1": ind1, "ind2": ind2, "subfields": subfields}, values
+
+
+def _compile_type(
+    annotation: Any, metadata: List[Any], tag: bool = False
+) -> Union[Check, None]:
+    """
+    Compile a literal or constrained string type into a tuple of checks. The
+    validators in `AFTER_VALIDATORS` are run after the other checks, as they are
+    by pydantic. If `tag` is True, a pattern is checked by looking three-digit
+    values up in the set of tags that match it, and only other values are
+    searched with the pattern.
+    """
+    if get_origin(annotation) is Annotated:
+        annotation, *extra = get_args(annotation)
+        for i in extra:
+            if not isinstance(i, FieldInfo):
+                return None
+            metadata = metadata + i.metadata
+    if get_origin(annotation) is Literal:
+        values = get_args(annotation)
+        if metadata or not all(isinstance(i, str) for i in values):
+            return None
+        expected = [repr(i) for i in values]
+        if len(expected) > 1:
+            expected = [", ".join(expected[:-1]), expected[-1]]
+        return (
+            (
+                "literal_error",
+                frozenset(values).__contains__,
+                {"expected": " or ".join(expected)},
+            ),
+        )
+    elif annotation is not str:
+        return None
+    min_length = max_length = pattern = None
+    after: List[Callable[[str], Any]] = []
+    for i in metadata:
+        if isinstance(i, MinLen):
+            min_length = i.min_length
+        elif isinstance(i, MaxLen):
+            max_length = i.max_length
+        elif set(getattr(i, "__dict__", ())) == {"pattern"}:
+            pattern = i.pattern
+        elif isinstance(i, AfterValidator) and i.func in AFTER_VALIDATORS:
+            after.append(i.func)
+        else:
+            return None
+    checks: List[Tuple[str, Callable[[str], Any], Dict[str, Any]]] = []
+    if min_length is not None:
+        n = min_length
+        checks.append(
+            ("string_too_short", lambda v: len(v) >= n, {"min_length": min_length})
+        )
+    if max_length is not None:
+        m = max_length
+        checks.append(
+            ("string_too_long", lambda v: len(v) <= m, {"max_length": max_length})
+        )
+    if pattern is not None:
+        search = _search_tag(pattern) if tag else re.compile(pattern).search
+        checks.append(("string_pattern_mismatch", search, {"pattern": pattern}))
+    for func in after:
+        checks.append(("", _after_test(func), {}))
+    return tuple(checks)
+
+
+def _after_test(func: Callable[[str], Any]) -> Callable[[str], bool]:
+    """
+    Return a test that runs an "after" validator. The validator raises a
+    `PydanticCustomError` that `FieldRule.errors` turns into an error.
+    """
+
+    def test(value: str) -> bool:
+        func(value)
+        return True
+
+    return test
+
+
+def _search_tag(pattern: str) -> Callable[[str], bool]:
+    """Return a test for a pattern that looks up three-digit tags in a set."""
+    search = re.compile(pattern).search
+    matching = get_matching_tags(pattern)
+
+    def test(value: str) -> bool:
+        if value in TAGS:
+            return value in matching
+        return search(value) is not None
+
+    return test
+
+
+def _union_label(annotation: Any) -> Union[str, None]:
+    """Return the label pydantic adds to the location of errors in a union member."""
+    while get_origin(annotation) is Annotated:
+        args = get_args(annotation)
+        if any(i.metadata for i in args[1:] if isinstance(i, FieldInfo)):
+            return "constrained-str"
+        annotation = args[0]
+    if get_origin(annotation) is Literal:
+        return f"literal[{','.join(repr(i) for i in get_args(annotation))}]"
+    return "str" if annotation is str else None
+
+
+def _compile_rule(name: str, info: FieldInfo, source: Union[str, None]) -> Any:
+    annotation = info.annotation
+    members = get_args(annotation) if get_origin(annotation) is Union else ()
+    if members and type(None) in members:
+        members = tuple(i for i in members if i is not type(None))
+        if len(members) == 1:
+            annotation, members = members[0], ()
+    branches: List[Tuple[Union[str, None], Check]] = []
+    for member in members or (annotation,):
+        metadata = [] if members else list(info.metadata)
+        checks = _compile_type(member, metadata, tag=name == "tag")
+        label = _union_label(member) if members else None
+        if checks is None or (members and (label is None or info.metadata)):
+            return None
+        branches.append((label, checks))
+    return FieldRule(name, source, info.is_required(), tuple(branches))
+
+
+def compile_model(model: type[BaseModel]) -> Union[CompiledModel, None]:
+    """
+    Compile the constraints of a field model into a `CompiledModel`. The
+    `subfields` attribute of a data field is not checked because the engine only
+    checks fields in which every subfield code and value is a string.
+
+    Args:
+        model: a subclass of `BaseControlField` or `BaseDataField`
+
+    Returns:
+        a `CompiledModel` or None if the model contains a constraint that cannot
+        be compiled
+    """
+    if not issubclass(model, (BaseControlField, BaseDataField)):
+        return None
+    alias_generator = model.model_config.get("alias_generator")
+    rules = []
+    for name, info in model.model_fields.items():
+        if name == "subfields":
+            continue
+        source = None
+        if name not in ("tag", "ind1", "ind2", "value"):
+            alias = alias_generator(name) if callable(alias_generator) else name
+            if not alias.startswith("subfields."):
+                return None
+            source = alias.split("subfields.")[1]
+        rule = _compile_rule(name, info, source)
+        if rule is None:
+            return None
+        rules.append(rule)
+    validators = []
+    for decorator in model.__pydantic_decorators__.model_validators.values():
+        if decorator.info.mode == "after":
+            validators.append(decorator.func)
+        elif decorator.cls_var_name != "parse_input":
+            return None
+    if model.__pydantic_decorators__.field_validators:
+        return None
+    return CompiledModel(model, tuple(rules), tuple(validators))
+
+
+_rule_sets: Dict[str, RuleSet] = {}
+_lock = threading.Lock()
+
+
+def get_rule_set(record_type: Union[str, None]) -> RuleSet:
+    """
+    Return the `RuleSet` for a record type. Rule sets are compiled once and
+    shared by every caller.
+
+    Args:
+        record_type: string that combines the material type and vendor of the record.
+
+    Returns:
+        the `RuleSet` for the field tuple returned by `get_adapter_key`
+    """
+    key = get_adapter_key(record_type)
+    rule_set = _rule_sets.get(key)
+    if rule_set is None:
+        with _lock:
+            rule_set = _rule_sets.get(key)
+            if rule_set is None:
+                rule_set = _rule_sets[key] = RuleSet(key)
+    return rule_set
+
+
+def get_validator(
+    record_type: Union[str, None], engine: str = "pydantic"
+) -> Union[TypeAdapter, RuleSet]:
+    """
+    Return the object used to validate the fields of a record type.
+
+    Args:
+        record_type: string that combines the material type and vendor of the record.
+        engine: "pydantic" to use the `TypeAdapter` or "rules" to use the `RuleSet`
+
+    Returns:
+        a `TypeAdapter` or a `RuleSet`
+
+    Raises:
+        ValueError: if `engine` is not in `ENGINES`
+    """
+    if engine == "pydantic":
+        return get_adapter(record_type)
+    elif engine == "rules":
+        return get_rule_set(record_type)
+    raise ValueError(f"Unknown engine: {engine}. Expected one of {ENGINES}")
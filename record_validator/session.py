@@ -0,0 +1,315 @@
+"""
+This module contains a class to validate a MARC record again as it is edited one
+field at a time without validating the whole record after each edit.
+
+Classes:
+    RecordValidationSession:
+        A record and the validation results for each of its fields, which are
+        updated as fields are added, removed and replaced.
+"""
+
+from typing import Any, Dict, Iterable, List, Union
+
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import ErrorDetails, InitErrorDetails
+from pymarc import Field as MarcField
+from pymarc import Leader, Record
+
+from record_validator.adapters import get_adapter_key, get_tag_table
+from record_validator.cache import FieldCache
+from record_validator.iso2709 import RECORD_TYPE_TAGS
+from record_validator.marc_errors import MarcValidationError
+from record_validator.marc_models import get_leader_errors
+from record_validator.rules import RuleSet, get_validator
+from record_validator.utils import field2dict, get_record_type
+from record_validator.validators import (
+    as_line_error,
+    validate_fixed_fields,
+    validate_order_items,
+    validate_tags,
+)
+
+ORDER_ITEM_TAGS = frozenset(["949", "960"])
+
+
+class RecordValidationSession:
+    """
+    A record whose validation results are kept up to date as it is edited. The
+    errors for each field are stored along with the record type and the number
+    of times each tag appears. When a field is added, removed or replaced, only
+    that field is validated. The record type is only determined again if the
+    field is one of `iso2709.RECORD_TYPE_TAGS`, and every field is only
+    validated again if the new record type is validated with a different
+    adapter. The combination of order and item locations is only checked again
+    if an order or item field, or a field that must not be repeated, changes.
+
+    The errors returned are the same as those returned by validating the whole
+    record with `RecordModel`, in the same order. Fields must not be changed in
+    place once they have been added; use `replace_field` instead.
+
+    Args:
+        leader: the leader of the record
+        fields:
+            the fields of the record as `pymarc.Field` objects or dicts in the
+            format returned by `field2dict`
+        cache: an optional `FieldCache` to store field validation results in
+        engine: the engine used to validate each field, "pydantic" or "rules"
+
+    Attributes:
+        cache: the `FieldCache` used to validate fields, if any
+        engine: the engine used to validate each field
+        record_type: the record type returned by `get_record_type`
+    """
+
+    def __init__(
+        self,
+        leader: Union[str, Leader],
+        fields: Iterable[Union[MarcField, Dict[str, Any]]],
+        cache: Union[FieldCache, None] = None,
+        engine: str = "pydantic",
+    ):
+        self.cache = cache
+        self.engine = engine
+        self.record_type = ""
+        self._leader = leader
+        self._leader_errors = get_leader_errors(leader)
+        self._fields: List[Union[MarcField, Dict[str, Any]]] = []
+        self._tags: List[str] = []
+        self._tag_counts: Dict[str, int] = {}
+        self._field_errors: List[List[ErrorDetails]] = []
+        self._adapter_key: Union[str, None] = None
+        self._adapter: Union[TypeAdapter, RuleSet, None] = None
+        self._order_errors: Union[List[InitErrorDetails], None] = None
+        for field in fields:
+            self._insert(len(self._fields), field)
+        self._update_record_type()
+
+    @classmethod
+    def from_record(
+        cls,
+        record: Record,
+        cache: Union[FieldCache, None] = None,
+        engine: str = "pydantic",
+    ) -> "RecordValidationSession":
+        """
+        Start a session with the leader and fields of a `pymarc.Record`.
+
+        Args:
+            record: the record to validate
+            cache: an optional `FieldCache` to store field validation results in
+            engine: the engine used to validate each field, "pydantic" or "rules"
+
+        Returns:
+            a `RecordValidationSession`
+        """
+        return cls(record.leader, record.fields, cache=cache, engine=engine)
+
+    @property
+    def leader(self) -> Union[str, Leader]:
+        """The leader of the record."""
+        return self._leader
+
+    @property
+    def fields(self) -> List[Union[MarcField, Dict[str, Any]]]:
+        """A copy of the list of fields in the record."""
+        return list(self._fields)
+
+    @property
+    def error(self) -> Union[MarcValidationError, None]:
+        """A `MarcValidationError` if the record is invalid, otherwise None."""
+        line_errors: List[Any] = validate_tags(self._tag_counts, self.record_type)
+        for errors in self._field_errors:
+            line_errors.extend(as_line_error(i) for i in errors)
+        line_errors.extend(self._get_fixed_field_errors())
+        line_errors.extend(self._get_order_errors())
+        errors = list(self._leader_errors)
+        if line_errors:
+            fields_errors = ValidationError.from_exception_data(
+                title="list", line_errors=line_errors
+            ).errors()
+            errors.extend(
+                ErrorDetails(**{**i, "loc": ("fields", *i["loc"])})  # type: ignore
+                for i in fields_errors
+            )
+        return MarcValidationError(errors) if errors else None
+
+    def set_leader(
+        self, leader: Union[str, Leader]
+    ) -> Union[MarcValidationError, None]:
+        """
+        Replace the leader of the record. No fields are validated again.
+
+        Args:
+            leader: the new leader
+
+        Returns:
+            a `MarcValidationError` if the record is invalid, otherwise None
+        """
+        self._leader = leader
+        self._leader_errors = get_leader_errors(leader)
+        return self.error
+
+    def add_field(
+        self,
+        field: Union[MarcField, Dict[str, Any]],
+        index: Union[int, None] = None,
+    ) -> Union[MarcValidationError, None]:
+        """
+        Add a field to the record and validate it.
+
+        Args:
+            field: the field to add
+            index: the position to insert the field at. Defaults to the end.
+
+        Returns:
+            a `MarcValidationError` if the record is invalid, otherwise None
+        """
+        position = len(self._fields) if index is None else index
+        position = self._insert(position, field)
+        self._after_edit([self._tags[position]], [position])
+        return self.error
+
+    def remove_field(self, index: int) -> Union[MarcValidationError, None]:
+        """
+        Remove a field from the record.
+
+        Args:
+            index: the position of the field to remove
+
+        Returns:
+            a `MarcValidationError` if the record is invalid, otherwise None
+
+        Raises:
+            IndexError: if there is no field at `index`
+        """
+        tag = self._remove(index)
+        self._after_edit([tag], [])
+        return self.error
+
+    def replace_field(
+        self, index: int, field: Union[MarcField, Dict[str, Any]]
+    ) -> Union[MarcValidationError, None]:
+        """
+        Replace a field in the record and validate the new field.
+
+        Args:
+            index: the position of the field to replace
+            field: the new field
+
+        Returns:
+            a `MarcValidationError` if the record is invalid, otherwise None
+
+        Raises:
+            IndexError: if there is no field at `index`
+        """
+        position = range(len(self._fields))[index]
+        old_tag = self._remove(position)
+        position = self._insert(position, field)
+        self._after_edit([old_tag, self._tags[position]], [position])
+        return self.error
+
+    def _insert(self, index: int, field: Union[MarcField, Dict[str, Any]]) -> int:
+        """Insert a field without validating it and return its position."""
+        if index < 0:
+            index = max(index + len(self._fields), 0)
+        index = min(index, len(self._fields))
+        tag = next(iter(field2dict(field)))
+        self._fields.insert(index, field)
+        self._tags.insert(index, tag)
+        self._field_errors.insert(index, [])
+        self._tag_counts[tag] = self._tag_counts.get(tag, 0) + 1
+        return index
+
+    def _remove(self, index: int) -> str:
+        """Remove a field and return its tag."""
+        del self._fields[index]
+        del self._field_errors[index]
+        tag = self._tags.pop(index)
+        self._tag_counts[tag] -= 1
+        if not self._tag_counts[tag]:
+            del self._tag_counts[tag]
+        return tag
+
+    def _after_edit(self, tags: List[str], positions: List[int]) -> None:
+        """Update the results that depend on the fields that were edited."""
+        non_repeatable = get_tag_table(self.record_type).non_repeatable
+        if any(i in ORDER_ITEM_TAGS or i in non_repeatable for i in tags):
+            self._order_errors = None
+        if any(i in RECORD_TYPE_TAGS for i in tags) and self._update_record_type():
+            return
+        for position in positions:
+            self._field_errors[position] = self._validate_field(self._fields[position])
+
+    def _update_record_type(self) -> bool:
+        """
+        Determine the record type from the fields it depends on. If the new record
+        type uses a different adapter, every field is validated again.
+
+        Returns:
+            whether every field was validated again
+        """
+        record_type = get_record_type(
+            [i for i, j in zip(self._fields, self._tags) if j in RECORD_TYPE_TAGS]
+        )
+        if record_type != self.record_type:
+            self.record_type = record_type
+            self._order_errors = None
+        adapter_key = get_adapter_key(record_type)
+        if adapter_key == self._adapter_key:
+            return False
+        self._adapter_key = adapter_key
+        self._adapter = get_validator(record_type, self.engine)
+        self._field_errors = [self._validate_field(i) for i in self._fields]
+        return True
+
+    def _validate_field(
+        self, field: Union[MarcField, Dict[str, Any]]
+    ) -> List[ErrorDetails]:
+        """Validate a field with the adapter for the record type."""
+        assert self._adapter is not None and self._adapter_key is not None
+        if self.cache is not None:
+            return self.cache.validate(self._adapter_key, self._adapter, field)
+        try:
+            self._adapter.validate_python(field, from_attributes=True)
+        except ValidationError as e:
+            return e.errors()  # type: ignore
+        return []
+
+    def _get_fixed_field_errors(self) -> List[InitErrorDetails]:
+        """
+        Check the 008 field against the leader as `validate_all` does. The check
+        is skipped if the leader is invalid, as it is by `RecordModel`.
+        """
+        if self._leader_errors:
+            return []
+        fields = [i for i, j in zip(self._fields, self._tags) if j == "008"]
+        return validate_fixed_fields(fields, self._leader)
+
+    def _get_order_errors(self) -> List[InitErrorDetails]:
+        """
+        Check the combination of order and item locations as `validate_all` does.
+        Only the order and item fields are passed to `validate_order_items`, and
+        the result is kept until one of them changes.
+        """
+        if "monograph" not in self.record_type:
+            return []
+        error_locs = [
+            str(i["loc"][-1])
+            for errors in self._field_errors
+            for i in errors
+            if "loc" in i
+        ]
+        if any(
+            i in error_locs for i in ["item_location", "item_type", "order_location"]
+        ):
+            return []
+        if self._order_errors is None:
+            table = get_tag_table(self.record_type)
+            if any(self._tag_counts.get(i, 0) > 1 for i in table.non_repeatable):
+                self._order_errors = []
+            else:
+                fields = [
+                    i for i, j in zip(self._fields, self._tags) if j in ORDER_ITEM_TAGS
+                ]
+                self._order_errors = validate_order_items(fields, error_locs)
+        return self._order_errors
@@ -0,0 +1,570 @@
+"""
+This module contains functions to validate files of MARC records one record at a
+time so that memory use does not depend on the size of the file.
+
+Classes:
+    RecordResult:
+        The result of validating a single record from a file.
+
+Functions:
+    validate_file:
+        Read MARC records from a file lazily and yield a `RecordResult` for each.
+    validate_marcxml:
+        Read MARC records from a MARCXML document lazily and yield a
+        `RecordResult` for each.
+    validate_ndjson:
+        Read MARC records from a newline-delimited MARC-in-JSON file lazily and
+        yield a `RecordResult` for each.
+    write_ndjson:
+        Copy a newline-delimited MARC-in-JSON file, adding the result of
+        validating each record to the record.
+    validate_bytes:
+        Validate the bytes of a single record in ISO 2709 format.
+    validate_record:
+        Validate a leader and list of fields and return a `MarcValidationError`
+        if the record is invalid.
+
+Constants:
+    DECODERS:
+        The ways a record in ISO 2709 format can be decoded before validation.
+"""
+
+import json
+import os
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple, Union
+from xml.etree import ElementTree
+
+from pydantic import ValidationError
+from pydantic_core import InitErrorDetails
+from pymarc import Field as MarcField
+from pymarc import Leader, Record
+
+from record_validator.cache import FieldCache
+from record_validator.iso2709 import precheck as precheck_record
+from record_validator.iso2709 import decode_record, read_chunks, read_control_number
+from record_validator.marc_errors import MarcValidationError
+from record_validator.marc_models import RecordModel, get_record_errors
+from record_validator.marcxml import read_records as read_marcxml_records
+from record_validator.ndjson import annotate_line
+from record_validator.ndjson import read_records as read_ndjson_records
+from record_validator.validators import apply_error_budget
+
+DECODERS = ("pymarc", "raw")
+
+
+class RecordResult:
+    """A class to define the result of validating a single record from a file"""
+
+    def __init__(
+        self,
+        index: int,
+        offset: Union[int, None],
+        length: Union[int, None],
+        control_number: Union[str, None] = None,
+        error: Union[MarcValidationError, None] = None,
+        parse_error: Union[str, None] = None,
+        truncated: bool = False,
+    ):
+        """
+        Args:
+            index: the position of the record in the file, starting at 0
+            offset:
+                the byte offset of the record in the file, or None if the file is
+                not in ISO 2709 format
+            length:
+                the length of the record in bytes, or None if the file is not in
+                ISO 2709 format
+            control_number: the value of the record's 001 field, if present
+            error: a `MarcValidationError` if the record is invalid
+            parse_error: a description of the error if the record could not be read
+            truncated:
+                whether the file error budget was used up by this record, in
+                which case no further records in the file were validated
+
+        Attributes:
+            valid: whether the record was read and passed validation
+            error_count:
+                the number of errors found in the record. A parse error counts
+                as one error.
+        """
+        self.index = index
+        self.offset = offset
+        self.length = length
+        self.control_number = control_number
+        self.error = error
+        self.parse_error = parse_error
+        self.truncated = truncated
+
+    @property
+    def valid(self) -> bool:
+        return self.error is None and self.parse_error is None
+
+    @property
+    def error_count(self) -> int:
+        if self.parse_error is not None:
+            return 1
+        return self.error.error_count if self.error is not None else 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the result as a dictionary"""
+        return {
+            "index": self.index,
+            "offset": self.offset,
+            "length": self.length,
+            "control_number": self.control_number,
+            "valid": self.valid,
+            "parse_error": self.parse_error,
+            "errors": self.error.to_dict() if self.error is not None else None,
+            "truncated": self.truncated,
+        }
+
+
+def validate_record(
+    leader: Union[str, Leader],
+    fields: Union[List[MarcField], List[Dict[str, Any]]],
+    cache: Union[FieldCache, None] = None,
+    max_errors: Union[int, None] = None,
+    engine: str = "pydantic",
+) -> Union[MarcValidationError, None]:
+    """
+    Validate a record with `RecordModel`.
+
+    Args:
+        leader: the leader of the record
+        fields: the fields of the record as `pymarc.Field` objects or dicts
+        cache: an optional `FieldCache` shared by the records in a file
+        max_errors: the number of errors after which validation of the record stops
+        engine: the engine used to validate each field, "pydantic" or "rules"
+
+    Returns:
+        a `MarcValidationError` if the record is invalid, otherwise None
+    """
+    try:
+        RecordModel.model_validate(
+            {"leader": leader, "fields": fields},
+            context={"field_cache": cache, "max_errors": max_errors, "engine": engine},
+        )
+    except ValidationError as e:
+        return MarcValidationError(e.errors())
+    return None
+
+
+def validate_file(
+    path_or_stream: Union[str, os.PathLike, BinaryIO],
+    precheck: bool = False,
+    deep: bool = True,
+    cache: Union[FieldCache, None] = None,
+    max_errors: Union[int, None] = None,
+    max_file_errors: Union[int, None] = None,
+    engine: str = "pydantic",
+    decoder: str = "pymarc",
+    **reader_kwargs: Any,
+) -> Iterator[RecordResult]:
+    """
+    Validate a file of MARC records in ISO 2709 format. Records are read and
+    validated one at a time, so memory use stays constant regardless of the size
+    of the file. Records that pymarc cannot parse are reported with a
+    `parse_error` and validation continues with the next record.
+
+    If `precheck` is True, each record is first checked for missing, extra and
+    repeated fields with `iso2709.precheck`, which reads only the record
+    directory. Records that fail the precheck are reported without being parsed
+    or validated against `RecordModel`.
+
+    Validation of a record stops after `max_errors` errors and validation of the
+    file stops after the record that brings the total number of errors in the
+    file to `max_file_errors`. That record's result is marked as truncated.
+
+    Args:
+        path_or_stream: the path to a file or a binary file-like object
+        precheck: whether to check the record directory before full validation
+        deep:
+            whether to parse and fully validate records. If False, only the
+            precheck is run.
+        cache:
+            an optional `FieldCache` used to skip validating fields that are
+            identical to a field in an earlier record
+        max_errors: the number of errors after which validation of a record stops
+        max_file_errors: the number of errors after which validation of the file
+            stops
+        engine: the engine used to validate each field, "pydantic" or "rules"
+        decoder:
+            how each record is decoded, one of `DECODERS`. With "raw", records
+            are decoded with `iso2709.decode_record` instead of `pymarc.Record`.
+        reader_kwargs:
+            keyword arguments passed to `pymarc.Record` or
+            `iso2709.decode_record` when parsing each record (eg. `force_utf8`,
+            `utf8_handling`)
+
+    Yields:
+        a `RecordResult` for each record in the file
+    """
+    if isinstance(path_or_stream, (str, os.PathLike)):
+        with open(path_or_stream, "rb") as stream:
+            yield from validate_file(
+                stream,
+                precheck=precheck,
+                deep=deep,
+                cache=cache,
+                max_errors=max_errors,
+                max_file_errors=max_file_errors,
+                engine=engine,
+                decoder=decoder,
+                **reader_kwargs,
+            )
+        return
+    results = _validate_chunks(
+        path_or_stream,
+        precheck,
+        deep,
+        cache,
+        max_errors,
+        engine,
+        decoder,
+        reader_kwargs,
+    )
+    yield from _limit_file_errors(results, max_file_errors)
+
+
+def validate_marcxml(
+    path_or_stream: Union[str, os.PathLike, BinaryIO],
+    cache: Union[FieldCache, None] = None,
+    max_errors: Union[int, None] = None,
+    max_file_errors: Union[int, None] = None,
+    engine: str = "pydantic",
+) -> Iterator[RecordResult]:
+    """
+    Validate a MARCXML document. Records are parsed incrementally with
+    `marcxml.read_records` and validated as dicts as soon as each `<record>`
+    element is complete, without building `pymarc.Record` objects, so memory use
+    stays constant regardless of the size of the document. Records with a field
+    that has no tag or a subfield that has no code are reported with a
+    `parse_error`. A record without a `<leader>` element is validated with an
+    empty leader. If the document is not well-formed, a final result with a
+    `parse_error` is yielded for the position where parsing failed.
+
+    Args:
+        path_or_stream: the path to a MARCXML file or a binary file-like object
+        cache:
+            an optional `FieldCache` used to skip validating fields that are
+            identical to a field in an earlier record
+        max_errors: the number of errors after which validation of a record stops
+        max_file_errors: the number of errors after which validation of the file
+            stops
+        engine: the engine used to validate each field, "pydantic" or "rules"
+
+    Yields:
+        a `RecordResult` for each record in the document
+    """
+    if isinstance(path_or_stream, (str, os.PathLike)):
+        with open(path_or_stream, "rb") as stream:
+            yield from validate_marcxml(
+                stream,
+                cache=cache,
+                max_errors=max_errors,
+                max_file_errors=max_file_errors,
+                engine=engine,
+            )
+        return
+    results = _validate_elements(path_or_stream, cache, max_errors, engine)
+    yield from _limit_file_errors(results, max_file_errors)
+
+
+def _validate_elements(
+    stream: BinaryIO,
+    cache: Union[FieldCache, None],
+    max_errors: Union[int, None],
+    engine: str,
+) -> Iterator[RecordResult]:
+    """Validate each record read by `marcxml.read_records`."""
+    index = 0
+    records = read_marcxml_records(stream)
+    while True:
+        result = RecordResult(index=index, offset=None, length=None)
+        try:
+            leader, fields, exception = next(records)
+        except StopIteration:
+            return
+        except ElementTree.ParseError as exc:
+            result.parse_error = f"{exc.__class__.__name__}: {exc}"
+            yield result
+            return
+        if exception is not None:
+            result.parse_error = f"{exception.__class__.__name__}: {exception}"
+        else:
+            result.control_number = _control_number(fields)
+            result.error = validate_record(
+                leader if leader is not None else "",
+                fields,
+                cache=cache,
+                max_errors=max_errors,
+                engine=engine,
+            )
+        yield result
+        index += 1
+
+
+def validate_ndjson(
+    path_or_stream: Union[str, os.PathLike, BinaryIO],
+    cache: Union[FieldCache, None] = None,
+    max_errors: Union[int, None] = None,
+    max_file_errors: Union[int, None] = None,
+    engine: str = "pydantic",
+) -> Iterator[RecordResult]:
+    """
+    Validate a file of newline-delimited MARC-in-JSON. Each line is decoded with
+    `ndjson.read_records` and the record is validated as dicts as soon as it is
+    read, without building `pymarc.Record` objects. A missing or null leader is
+    validated as an empty leader and missing or null fields as an empty list of
+    fields. Lines that are not JSON objects are reported with a `parse_error`
+    and validation continues with the next line.
+
+    Args:
+        path_or_stream: the path to a file or a binary file-like object
+        cache:
+            an optional `FieldCache` used to skip validating fields that are
+            identical to a field in an earlier record
+        max_errors: the number of errors after which validation of a record stops
+        max_file_errors: the number of errors after which validation of the file
+            stops
+        engine: the engine used to validate each field, "pydantic" or "rules"
+
+    Yields:
+        a `RecordResult` for each record in the file. The offset and length are
+        those of the line containing the record.
+    """
+    if isinstance(path_or_stream, (str, os.PathLike)):
+        with open(path_or_stream, "rb") as stream:
+            yield from validate_ndjson(
+                stream,
+                cache=cache,
+                max_errors=max_errors,
+                max_file_errors=max_file_errors,
+                engine=engine,
+            )
+        return
+    results = (i for _, i in _validate_lines(path_or_stream, cache, max_errors, engine))
+    yield from _limit_file_errors(results, max_file_errors)
+
+
+def write_ndjson(
+    path_or_stream: Union[str, os.PathLike, BinaryIO],
+    output: BinaryIO,
+    cache: Union[FieldCache, None] = None,
+    max_errors: Union[int, None] = None,
+    engine: str = "pydantic",
+) -> None:
+    """
+    Validate a file of newline-delimited MARC-in-JSON and write each record to
+    `output` with a "validation" key added. The value contains whether the record
+    is valid, the parse error, if any, and the output of
+    `MarcValidationError.to_dict` if the record is invalid. Records are copied
+    from the input line rather than encoded again. A line that is not a JSON
+    object is written as an object containing only the "validation" key.
+
+    Args:
+        path_or_stream: the path to a file or a binary file-like object
+        output: a binary file-like object to write the records to
+        cache:
+            an optional `FieldCache` used to skip validating fields that are
+            identical to a field in an earlier record
+        max_errors: the number of errors after which validation of a record stops
+        engine: the engine used to validate each field, "pydantic" or "rules"
+    """
+    if isinstance(path_or_stream, (str, os.PathLike)):
+        with open(path_or_stream, "rb") as stream:
+            write_ndjson(
+                stream, output, cache=cache, max_errors=max_errors, engine=engine
+            )
+        return
+    for line, result in _validate_lines(path_or_stream, cache, max_errors, engine):
+        validation = {
+            "valid": result.valid,
+            "parse_error": result.parse_error,
+            "errors": result.error.to_dict() if result.error is not None else None,
+        }
+        if result.parse_error is None:
+            output.write(annotate_line(line, "validation", validation))
+        else:
+            output.write(json.dumps({"validation": validation}).encode() + b"\n")
+
+
+def _validate_lines(
+    stream: BinaryIO,
+    cache: Union[FieldCache, None],
+    max_errors: Union[int, None],
+    engine: str,
+) -> Iterator[Tuple[bytes, RecordResult]]:
+    """Validate each record read by `ndjson.read_records`."""
+    for index, (offset, line, record, exception) in enumerate(
+        read_ndjson_records(stream)
+    ):
+        result = RecordResult(index=index, offset=offset, length=len(line))
+        if record is None:
+            result.parse_error = f"{exception.__class__.__name__}: {exception}"
+        else:
+            leader = record.get("leader")
+            fields = record.get("fields")
+            result.control_number = _control_number(fields)
+            result.error = validate_record(
+                leader if leader is not None else "",
+                fields if fields is not None else [],
+                cache=cache,
+                max_errors=max_errors,
+                engine=engine,
+            )
+        yield line, result
+
+
+def _control_number(fields: Any) -> Union[str, None]:
+    """Return the value of the 001 field from a list of field dicts."""
+    if not isinstance(fields, list):
+        return None
+    return next((i["001"] for i in fields if isinstance(i, dict) and "001" in i), None)
+
+
+def _limit_file_errors(
+    results: Iterator[RecordResult], max_file_errors: Union[int, None]
+) -> Iterator[RecordResult]:
+    """
+    Stop after the result that brings the total number of errors to
+    `max_file_errors` and mark that result as truncated.
+    """
+    file_errors = 0
+    for result in results:
+        file_errors += result.error_count
+        if max_file_errors is not None and file_errors >= max_file_errors:
+            result.truncated = True
+            yield result
+            return
+        yield result
+
+
+def _validate_chunks(
+    stream: BinaryIO,
+    precheck: bool,
+    deep: bool,
+    cache: Union[FieldCache, None],
+    max_errors: Union[int, None],
+    engine: str,
+    decoder: str,
+    reader_kwargs: Dict[str, Any],
+) -> Iterator[RecordResult]:
+    """Validate each record read by `iso2709.read_chunks`."""
+    for index, (offset, chunk, exception) in enumerate(read_chunks(stream)):
+        yield validate_bytes(
+            chunk,
+            index=index,
+            offset=offset,
+            exception=exception,
+            precheck=precheck,
+            deep=deep,
+            cache=cache,
+            max_errors=max_errors,
+            engine=engine,
+            decoder=decoder,
+            **reader_kwargs,
+        )
+
+
+def validate_bytes(
+    data: Union[bytes, memoryview],
+    index: int = 0,
+    offset: int = 0,
+    exception: Union[Exception, None] = None,
+    precheck: bool = False,
+    deep: bool = True,
+    cache: Union[FieldCache, None] = None,
+    max_errors: Union[int, None] = None,
+    engine: str = "pydantic",
+    decoder: str = "pymarc",
+    **reader_kwargs: Any,
+) -> RecordResult:
+    """
+    Validate the bytes of a single record in ISO 2709 format. The precheck and
+    the 001 field are read from `data` directly, so a `memoryview` of a larger
+    buffer is only copied if the record is parsed with `pymarc.Record`.
+
+    With `decoder="raw"`, the record is decoded with `iso2709.decode_record`
+    straight to the field dicts that `validate_all` accepts instead of being
+    parsed into a `pymarc.Record`, and the fields are validated with
+    `marc_models.get_record_errors`. The same errors are reported.
+
+    Args:
+        data: the bytes of a single record
+        index: the position of the record in its file
+        offset: the byte offset of the record in its file
+        exception:
+            the exception raised when the record was framed, if any, in which
+            case the record is reported with a `parse_error`
+        precheck: whether to check the record directory before full validation
+        deep:
+            whether to parse and fully validate the record. If False, only the
+            precheck is run.
+        cache: an optional `FieldCache`
+        max_errors: the number of errors after which validation stops
+        engine: the engine used to validate each field, "pydantic" or "rules"
+        decoder: how the record is decoded, one of `DECODERS`
+        reader_kwargs:
+            keyword arguments passed to `pymarc.Record` or, with the "raw"
+            decoder, to `iso2709.decode_record`
+
+    Returns:
+        a `RecordResult`
+
+    Raises:
+        ValueError: if `decoder` is unknown
+    """
+    if decoder not in DECODERS:
+        raise ValueError(f"Unknown decoder: {decoder}")
+    result = RecordResult(index=index, offset=offset, length=len(data))
+    if exception is None and (precheck or not deep):
+        try:
+            precheck_errors = precheck_record(data)
+            if precheck_errors or not deep:
+                result.control_number = read_control_number(data)
+                result.error = _to_marc_error(
+                    apply_error_budget(precheck_errors, max_errors)
+                )
+                return result
+        except Exception as exc:
+            exception = exc
+    if exception is None:
+        try:
+            if decoder == "raw":
+                leader, fields = decode_record(data, **reader_kwargs)
+            else:
+                # pymarc annotates `data` as str but decodes records from bytes
+                record = Record(bytes(data), **reader_kwargs)  # type: ignore[arg-type]
+        except Exception as exc:
+            exception = exc
+    if exception is not None:
+        result.parse_error = f"{exception.__class__.__name__}: {exception}"
+        return result
+    if decoder == "raw":
+        result.control_number = _control_number(fields)
+        record_errors = get_record_errors(
+            leader, fields, cache=cache, max_errors=max_errors, engine=engine
+        )
+        result.error = MarcValidationError(record_errors) if record_errors else None
+        return result
+    control_number = record.get("001")
+    result.control_number = control_number.data if control_number else None
+    result.error = validate_record(
+        record.leader,
+        record.fields,
+        cache=cache,
+        max_errors=max_errors,
+        engine=engine,
+    )
+    return result
+
+
+def _to_marc_error(
+    errors: List[InitErrorDetails],
+) -> Union[MarcValidationError, None]:
+    """Convert errors from `iso2709.precheck` to a `MarcValidationError`."""
+    if not errors:
+        return None
+    error = ValidationError.from_exception_data(title="list", line_errors=errors)
+    return MarcValidationError(error.errors())
@@ -2,10 +2,12 @@
 
 import re
 from itertools import chain
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Sequence, Tuple, Union
 
 from pymarc import Field as MarcField
 
+_DATA_FIELD_KEYS = frozenset(["ind1", "ind2", "subfields"])
+
 
 def dict2subfield(field: Dict[str, Any], code: str) -> List[Union[str, None]]:
     """Extract subfield values from a MARC represented as a dict."""
@@ -20,13 +22,16 @@ def dict2subfield(field: Dict[str, Any], code: str) -> List[Union[str, None]]:
 
 
 def field2dict(field: Union[MarcField, Dict[str, Any]]) -> Dict[str, Any]:
-    """Convert a MARC field to a dict."""
+    """
+    Convert a MARC field to a dict. Dicts that are already in this format are
+    returned as they are rather than copied.
+    """
     if isinstance(field, MarcField) and field.tag.startswith("00"):
         return {field.tag: field.data}
     elif isinstance(field, dict) and "tag" in field and "subfields" not in field:
         return {field["tag"]: field["value"]}
     elif isinstance(field, dict) and all(isinstance(i, str) for i in field.values()):
-        return {tag: value for tag, value in field.items()}
+        return field
     elif isinstance(field, MarcField):
         tag, ind1, ind2 = field.tag, field.indicator1, field.indicator2
         subfields = [{i[0]: i[1]} for i in field.subfields]
@@ -35,33 +40,117 @@ def field2dict(field: Union[MarcField, Dict[str, Any]]) -> Dict[str, Any]:
         subfields = field["subfields"]
     else:
         ((tag, data),) = field.items()
+        if data.keys() == _DATA_FIELD_KEYS:
+            return field
         ind1, ind2, subfields = data["ind1"], data["ind2"], data["subfields"]
     return {tag: {"ind1": ind1, "ind2": ind2, "subfields": subfields}}
 
 
-def get_record_type(fields: List[Union[MarcField, Dict[str, Any]]]) -> str:
+class NormalizedRecord:
+    """
+    A view of the fields in a MARC record that is built in a single pass and
+    shared by every stage of validation. Each field is converted to a dict once
+    and its tag and subfields are indexed so that record typing, checks for
+    missing and extra fields and order/item validation do not have to convert
+    and scan the fields again.
+
+    Args:
+        fields: A list of MARC fields as `pymarc.Field` objects or dicts.
+
+    Attributes:
+        fields: the list of fields passed to the class.
+        field_dicts: each field converted to a dict with `field2dict`.
+        tags: the tag of each field in the order the fields appear.
+        tag_counts: a dict with the number of times each tag appears.
+        tag_positions: a dict with the index of each field with a given tag.
+        subfield_index:
+            a dict mapping a tag and subfield code to the values of that subfield
+            in all fields with the tag. Entries are added the first time they are
+            requested with `get_subfields`.
+    """
+
+    def __init__(self, fields: Sequence[Union[MarcField, Dict[str, Any]]]):
+        self.fields = fields
+        self.field_dicts: List[Dict[str, Any]] = []
+        self.tags: List[str] = []
+        self.tag_counts: Dict[str, int] = {}
+        self.tag_positions: Dict[str, List[int]] = {}
+        self.subfield_index: Dict[Tuple[str, str], List[Union[str, None]]] = {}
+        self._subfields: List[Dict[str, List[str]]] = []
+        for position, field in enumerate(fields):
+            field_dict = field2dict(field)
+            tag = next(iter(field_dict))
+            data = field_dict[tag]
+            codes: Dict[str, List[str]] = {}
+            if isinstance(data, dict) and isinstance(data.get("subfields"), list):
+                for subfield in data["subfields"]:
+                    if isinstance(subfield, dict):
+                        for code, value in subfield.items():
+                            codes.setdefault(code, []).append(value)
+            self.field_dicts.append(field_dict)
+            self.tags.append(tag)
+            self.tag_counts[tag] = self.tag_counts.get(tag, 0) + 1
+            self.tag_positions.setdefault(tag, []).append(position)
+            self._subfields.append(codes)
+
+    def get_subfields(self, tag: str, code: str) -> List[Union[str, None]]:
+        """
+        Get the values of a subfield from every field with a given tag. Fields
+        that do not contain the subfield contribute a `None`, which matches the
+        output of calling `dict2subfield` on each field and chaining the results.
+
+        Args:
+            tag: the MARC tag of the fields (eg. "949")
+            code: the subfield code (eg. "l")
+
+        Returns:
+            a list of subfield values
+        """
+        key = (tag, code)
+        if key not in self.subfield_index:
+            values: List[Union[str, None]] = []
+            for position in self.tag_positions.get(tag, []):
+                codes = self._subfields[position]
+                if code in codes:
+                    values.extend(codes[code])
+                else:
+                    values.append(None)
+            self.subfield_index[key] = values
+        return self.subfield_index[key]
+
+
+def normalize_record(
+    fields: Union[NormalizedRecord, Sequence[Union[MarcField, Dict[str, Any]]]],
+) -> NormalizedRecord:
+    """Return a `NormalizedRecord` for a list of fields unless it is already one."""
+    if isinstance(fields, NormalizedRecord):
+        return fields
+    return NormalizedRecord(fields)
+
+
+def get_record_type(
+    fields: Union[NormalizedRecord, Sequence[Union[MarcField, Dict[str, Any]]]],
+) -> str:
     """Determine the record type based on the fields present in a MARC record."""
-    if not isinstance(fields, list) or not all(
-        isinstance(i, (MarcField, dict)) for i in fields
+    if not isinstance(fields, NormalizedRecord) and (
+        not isinstance(fields, list)
+        or not all(isinstance(i, (MarcField, dict)) for i in fields)
     ):
         return "other"
-    field_list = [field2dict(i) for i in fields]
+    record = normalize_record(fields)
 
-    item_vendor = [dict2subfield(i, "v") for i in field_list if "949" in i]
-    bib_vendor = [dict2subfield(i, "a") for i in field_list if "901" in i]
-    deduped_vendor = list(set(chain(*item_vendor + bib_vendor)))
+    deduped_vendor = list(
+        set(record.get_subfields("949", "v") + record.get_subfields("901", "a"))
+    )
     if len(deduped_vendor) == 1 and isinstance(deduped_vendor[0], str):
         vendor_code = deduped_vendor[0].lower()
     else:
         vendor_code = None
-    aux_call_no_fields = [
-        i for i in field_list if "852" in i and vendor_code == "auxam"
-    ]
-    subject_fields = [i for i in field_list if next(iter(i)).startswith("6")]
-
-    aux_call_nos = list(chain(*[dict2subfield(i, "h") for i in aux_call_no_fields]))
-    phys_desc = list(chain(*[dict2subfield(i, "a") for i in field_list if "300" in i]))
-    subjects = list(chain(*[dict2subfield(i, "v") for i in subject_fields]))
+    subject_tags = [i for i in record.tag_positions if i.startswith("6")]
+
+    aux_call_nos = record.get_subfields("852", "h") if vendor_code == "auxam" else []
+    phys_desc = record.get_subfields("300", "a")
+    subjects = list(chain(*[record.get_subfields(i, "v") for i in subject_tags]))
 
     aux_pattern = re.compile(r"^ReCAP 2[345]-$")
     catalogue = re.compile(r"^[cC]atalogue(s?) [rR]aisonn[eé](s?)")
@@ -1,79 +1,332 @@
 """This module contains functions that are used in the record_validator package to
 validate data"""
 
-from itertools import chain
-from typing import Any, Dict, List, Union
+import time
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Mapping, Sequence, Tuple, Union
 
-from pydantic import ValidationError
-from pydantic_core import InitErrorDetails, PydanticCustomError
+from pydantic import ValidationError, ValidationInfo
+from pydantic_core import ErrorDetails, InitErrorDetails, PydanticCustomError
 from pymarc import Field as MarcField
 from pymarc import Leader
 
-from record_validator.adapters import get_adapter
-from record_validator.constants import AllFields, ValidOrderItems
-from record_validator.utils import dict2subfield, field2dict, get_record_type
+from record_validator.adapters import get_adapter_key, get_tag_table
+from record_validator.cache import FieldCache
+from record_validator.constants import (
+    ERROR_BUDGET_EXCEEDED,
+    FIXED_FIELD_008_ANY,
+    LEADER_BYTES,
+    LEADER_CHARACTERS,
+    AllFields,
+    TagClass,
+    ValidOrderItems,
+)
+from record_validator.fixed_fields import (
+    find_008_error,
+    get_008_table,
+    invalid_character_error,
+)
+from record_validator.instrumentation import get_instrument
+from record_validator.rules import ENGINES, get_validator
+from record_validator.utils import NormalizedRecord, get_record_type, normalize_record
 
 
 def validate_all(
-    fields: List[Union[MarcField, Dict[str, Any]]],
-) -> List[Union[MarcField, Dict[str, Any]]]:
+    fields: Union[NormalizedRecord, Sequence[Union[MarcField, Dict[str, Any]]]],
+    *,
+    leader: Union[str, Leader, None] = None,
+    cache: Union[FieldCache, None] = None,
+    max_errors: Union[int, None] = None,
+    engine: str = "pydantic",
+) -> Sequence[Union[MarcField, Dict[str, Any]]]:
     """
     Validate MARC record fields. This function validates validates the fields of a
     MARC record based on the record type. It first validates the existence of all
     required fields and identifies extra fields. It then validates the fields with
     an adapter that will identify the correct model for the field based on the
-    record type. Finally, if the record is for a monograph, it validates the
-    combination of order location, item location and item type. If any errors are
-    found, a `ValidationError` is raised.
+    record type. If a leader is passed, the 008 field is then checked against the
+    characters allowed for the material type given by the leader with
+    `validate_fixed_fields`. Finally, if the record is for a monograph, it
+    validates the combination of order location, item location and item type. If
+    any errors are found, a `ValidationError` is raised. The fields are normalized
+    once into a `NormalizedRecord` which is shared by each of these stages. If an
+    `instrumentation.Instrument` is active, the time spent in each stage and on
+    each field is added to it. If a `FieldCache` is passed, fields that are
+    identical to a field that has already been validated are not validated again.
+
+    If `max_errors` is set, validation stops as soon as more than that many errors
+    have been found. Only the first `max_errors` errors are reported and the
+    `ValidationError` ends with an "error_budget_exceeded" error to show that the
+    record contains other errors. A record with exactly `max_errors` errors is
+    reported without it.
+
+    Fields are validated with pydantic by default. Pass `engine="rules"` to
+    validate them with the compiled checks in `rules`, which return the same
+    errors without the overhead of building a model for each field.
 
     Args:
-        fields: A list of MARC fields to validate.
+        fields: A list of MARC fields or a `NormalizedRecord` to validate.
+        leader:
+            The leader of the record, if the 008 field should be checked against
+            the material type it gives.
+        cache: An optional `FieldCache` to store field validation results in.
+        max_errors: The number of errors to stop after. Use 1 to fail fast.
+        engine: The engine used to validate each field, "pydantic" or "rules".
 
     Returns:
-        a list containing the validated fields
+        the validated fields
 
     Raises:
         ValidationError: If any errors are found during validation.
+        ValueError: If `max_errors` is less than 1 or `engine` is unknown.
 
     """
-    errors = []
-    record_type = get_record_type(fields)
-    errors.extend(validate_fields(fields, record_type=record_type))
-    adapter = get_adapter(record_type)
-    for field in fields:
-        try:
-            adapter.validate_python(field, from_attributes=True)
-        except ValidationError as e:
-            errors.extend(e.errors())  # type: ignore
-    error_locs = [str(i["loc"][-1]) for i in errors if "loc" in i]
-    if "monograph" in record_type:
-        errors.extend(validate_order_items(fields, error_locs))
+    if max_errors is not None and max_errors < 1:
+        raise ValueError("max_errors must be at least 1")
+    record = normalize_record(fields)
+    errors = list(
+        _iter_line_errors(
+            record, leader=leader, cache=cache, max_errors=max_errors, engine=engine
+        )
+    )
     if len(errors) > 0:
         raise ValidationError.from_exception_data(
-            title=fields.__class__.__name__, line_errors=errors
+            title=record.fields.__class__.__name__,
+            line_errors=[as_line_error(i) for i in errors],
         )
     else:
-        return fields
+        return record.fields
+
+
+def iter_errors(
+    fields: Union[NormalizedRecord, Sequence[Union[MarcField, Dict[str, Any]]]],
+    *,
+    leader: Union[str, Leader, None] = None,
+    cache: Union[FieldCache, None] = None,
+    max_errors: Union[int, None] = None,
+    engine: str = "pydantic",
+) -> Iterator[ErrorDetails]:
+    """
+    Validate MARC record fields as `validate_all` does, but yield each error as
+    soon as it is found instead of raising a `ValidationError` once every field
+    has been validated. The errors are the same, in the same order, as those
+    returned by the `errors()` method of the `ValidationError` raised by
+    `validate_all`, so they can be passed to `MarcValidationError.from_iter`.
+
+    Args:
+        fields: A list of MARC fields or a `NormalizedRecord` to validate.
+        leader:
+            The leader of the record, if the 008 field should be checked against
+            the material type it gives.
+        cache: An optional `FieldCache` to store field validation results in.
+        max_errors: The number of errors to stop after. Use 1 to fail fast.
+        engine: The engine used to validate each field, "pydantic" or "rules".
+
+    Returns:
+        an iterator of `ErrorDetails`, which is empty if the fields are valid
+
+    Raises:
+        ValueError: If `max_errors` is less than 1 or `engine` is unknown.
+    """
+    if max_errors is not None and max_errors < 1:
+        raise ValueError("max_errors must be at least 1")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}. Expected one of {ENGINES}")
+    return (
+        i if "msg" in i else _to_error_details(i)
+        for i in _iter_line_errors(
+            fields, leader=leader, cache=cache, max_errors=max_errors, engine=engine
+        )
+    )
+
+
+def _iter_line_errors(
+    fields: Union[NormalizedRecord, Sequence[Union[MarcField, Dict[str, Any]]]],
+    leader: Union[str, Leader, None],
+    cache: Union[FieldCache, None],
+    max_errors: Union[int, None],
+    engine: str,
+) -> Iterator[Any]:
+    """
+    Yield the errors found by each stage of `validate_all`. Errors from field
+    models are `ErrorDetails` and other errors are `InitErrorDetails`. If
+    `max_errors` is set, no more than that many errors are yielded, followed by
+    an "error_budget_exceeded" error if validation stopped early.
+    """
+    instrument = get_instrument()
+    if instrument is not None:
+        begin = start = time.perf_counter()
+    count = 0
+    record = normalize_record(fields)
+    record_type = get_record_type(record)
+    if instrument is not None:
+        start = instrument.record_stage("get_record_type", start)
+    errors: List[Any] = validate_fields(record, record_type=record_type)
+    error_locs = [str(i["loc"][-1]) for i in errors if "loc" in i]
+    yield from _within_budget(errors, count, max_errors)
+    count += len(errors)
+    if instrument is not None:
+        start = instrument.record_stage("validate_fields", start)
+    truncated = max_errors is not None and count > max_errors
+    adapter_key = get_adapter_key(record_type)
+    adapter = get_validator(record_type, engine)
+    for field, tag in zip(record.fields, record.tags):
+        if truncated:
+            break
+        if instrument is not None:
+            field_start = time.perf_counter()
+        errors = []
+        if cache is not None:
+            errors = cache.validate(adapter_key, adapter, field)
+        else:
+            try:
+                adapter.validate_python(field, from_attributes=True)
+            except ValidationError as e:
+                errors = e.errors()  # type: ignore
+        if instrument is not None:
+            instrument.record_field(record_type, tag, field_start)
+        error_locs.extend(str(i["loc"][-1]) for i in errors if "loc" in i)
+        yield from _within_budget(errors, count, max_errors)
+        count += len(errors)
+        truncated = max_errors is not None and count > max_errors
+    if instrument is not None:
+        start = instrument.record_stage("validate_field_models", start)
+    if leader is not None and not truncated:
+        errors = validate_fixed_fields(record, leader)
+        yield from _within_budget(errors, count, max_errors)
+        count += len(errors)
+        truncated = max_errors is not None and count > max_errors
+        if instrument is not None:
+            start = instrument.record_stage("validate_fixed_fields", start)
+    if "monograph" in record_type and not truncated:
+        remaining = None if max_errors is None else max_errors - count + 1
+        errors = validate_order_items(record, error_locs, max_errors=remaining)
+        yield from _within_budget(errors, count, max_errors)
+        count += len(errors)
+        truncated = max_errors is not None and count > max_errors
+        if instrument is not None:
+            instrument.record_stage("validate_order_items", start)
+    if instrument is not None:
+        instrument.record_stage("validate_all", begin)
+    if truncated and max_errors is not None:
+        yield _budget_error(max_errors)
+
+
+def _within_budget(
+    errors: List[Any], count: int, max_errors: Union[int, None]
+) -> List[Any]:
+    """Return the errors that fit in an error budget after `count` errors."""
+    if max_errors is None:
+        return errors
+    return errors[: max(max_errors - count, 0)]
+
+
+def _to_error_details(error: InitErrorDetails) -> ErrorDetails:
+    """Convert an `InitErrorDetails` to the `ErrorDetails` pydantic reports."""
+    return ValidationError.from_exception_data(
+        title="list", line_errors=[error]
+    ).errors()[0]
+
+
+def as_line_error(error: Any) -> Any:
+    """
+    Prepare an error for `ValidationError.from_exception_data`. pydantic gives
+    an `ErrorDetails` the default message for its type, so an error whose
+    context has a "position", such as the errors raised by `check_leader` and
+    `fixed_fields.check_008`, is converted to an `InitErrorDetails` that keeps
+    its message. Other errors are returned as they are.
+    """
+    ctx = error.get("ctx")
+    if "msg" not in error or not ctx or "position" not in ctx:
+        return error
+    return InitErrorDetails(
+        type=PydanticCustomError(error["type"], error["msg"], ctx),
+        loc=error["loc"],
+        input=error["input"],
+    )
+
+
+def apply_error_budget(
+    errors: List[Any], max_errors: Union[int, None], truncated: bool = False
+) -> List[Any]:
+    """
+    Limit a list of errors to an error budget. If the list is longer than
+    `max_errors` or `truncated` is True, the list is cut to `max_errors` errors
+    and an "error_budget_exceeded" error is added to the end.
+
+    Args:
+        errors: a list of `InitErrorDetails` or `ErrorDetails`
+        max_errors: the maximum number of errors to keep or None for no limit
+        truncated: whether validation has already stopped early
+
+    Returns:
+        the list of errors
+    """
+    if max_errors is None or (len(errors) <= max_errors and not truncated):
+        return errors
+    return errors[:max_errors] + [_budget_error(max_errors)]
+
+
+def _budget_error(max_errors: int) -> InitErrorDetails:
+    """Return the error added when validation stops after `max_errors` errors."""
+    return InitErrorDetails(
+        type=PydanticCustomError(
+            ERROR_BUDGET_EXCEEDED,
+            "Validation stopped after {max_errors} errors",
+            {"max_errors": max_errors},
+        ),
+        input=max_errors,
+    )
+
+
+def validate_record_fields(
+    fields: List[Union[MarcField, Dict[str, Any]]], info: ValidationInfo
+) -> List[Union[MarcField, Dict[str, Any]]]:
+    """
+    Validate the fields of a `RecordModel` with `validate_all`. A `FieldCache`, an
+    error budget and an engine can be passed in the validation context with the
+    keys "field_cache", "max_errors" and "engine". If the leader is valid, the
+    008 field is also checked against the material type it gives.
+    """
+    context = info.context or {}
+    validate_all(
+        fields,
+        leader=info.data.get("leader"),
+        cache=context.get("field_cache"),
+        max_errors=context.get("max_errors"),
+        engine=context.get("engine") or "pydantic",
+    )
+    return fields
 
 
 def validate_fields(
-    fields: List[Union[MarcField, Dict[str, Any]]], record_type: str
+    fields: Union[NormalizedRecord, List[Union[MarcField, Dict[str, Any]]]],
+    record_type: str,
 ) -> List[InitErrorDetails]:
     """Validate the existence of all required fields and identify extra fields."""
-    tag_list = [next(iter(field2dict(i))) for i in fields]
-    required_tags = AllFields.required_fields()
-    extra_tags = []
-    if record_type == "auxam_other":
-        extra_tags.append("949")
-    elif "other" in record_type:
-        extra_tags.extend(AllFields.monograph_fields())
-    else:
-        required_tags.extend(AllFields.monograph_fields())
-    extra_fields = [i for i in extra_tags if i in tag_list]
-    missing_fields = [i for i in required_tags if i not in tag_list]
-    repeated_fields = [
-        i for i in AllFields.non_repeatable_fields() if tag_list.count(i) > 1
-    ]
+    return validate_tags(normalize_record(fields).tag_counts, record_type)
+
+
+def validate_tags(
+    tag_counts: Mapping[str, int], record_type: str
+) -> List[InitErrorDetails]:
+    """
+    Identify missing, extra and repeated fields using only the number of times each
+    tag appears in a record. This is shared by `validate_fields` and by
+    `iso2709.precheck`, which counts tags in the record directory without decoding
+    the fields.
+
+    Args:
+        tag_counts: a dict with the number of times each tag appears in the record
+        record_type: the record type returned by `get_record_type`
+
+    Returns:
+        a list of errors for extra, repeated and missing fields
+    """
+    table = get_tag_table(record_type)
+    extra_fields = [i for i in table.extra if i in tag_counts]
+    missing_fields = [i for i in table.required if i not in tag_counts]
+    repeated_fields = [i for i in table.non_repeatable if tag_counts.get(i, 0) > 1]
     extra_field_errors = [
         InitErrorDetails(
             type=PydanticCustomError("extra_forbidden", f"Extra field: {tag}"),
@@ -90,65 +343,232 @@ def validate_fields(
     return extra_field_errors + missing_field_errors
 
 
+def tags_are_valid(tag_counts: Mapping[str, int], record_type: str) -> bool:
+    """
+    Return whether a record has no missing, extra or repeated fields. This
+    applies the same rules as `validate_tags` without building any errors.
+    """
+    table = get_tag_table(record_type)
+    return (
+        all(i in tag_counts for i in table.required)
+        and not any(i in tag_counts for i in table.extra)
+        and not any(tag_counts.get(i, 0) > 1 for i in table.non_repeatable)
+    )
+
+
 def validate_leader(input: Union[str, Leader]) -> str:
     """Validate the leader"""
     return str(input)
 
 
+def check_leader(leader: str) -> str:
+    """
+    Check each position of a leader against `LEADER_CHARACTERS` and raise a
+    "string_pattern_mismatch" error that gives the position of the first
+    character that is not allowed and the characters allowed there.
+
+    Args:
+        leader: a leader that is 24 characters long
+
+    Returns:
+        the leader
+
+    Raises:
+        PydanticCustomError: if a position contains a character that is not allowed
+    """
+    position = find_leader_error(leader)
+    if position is not None:
+        raise invalid_character_error(position, LEADER_CHARACTERS[position])
+    return leader
+
+
+def find_leader_error(
+    leader: Union[str, bytes, bytearray, memoryview],
+) -> Union[int, None]:
+    """
+    Find the first position of a leader that holds a character that is not
+    allowed. Each position is looked up in `LEADER_CHARACTERS`, or in
+    `LEADER_BYTES` if the leader is bytes, so the bytes of a record in ISO 2709
+    format can be checked without decoding them. Only the first 24 positions
+    are checked.
+
+    Args:
+        leader: a leader, or the bytes of a record in ISO 2709 format
+
+    Returns:
+        the first position with a character that is not allowed, the length of
+        the leader if it is shorter than 24 characters, or None if it is valid
+    """
+    table = LEADER_CHARACTERS if isinstance(leader, str) else LEADER_BYTES
+    checks = list(map(frozenset.__contains__, table, leader))
+    if all(checks):
+        return None if len(checks) == 24 else len(checks)
+    return checks.index(False)
+
+
+def validate_fixed_fields(
+    fields: Union[NormalizedRecord, Sequence[Union[MarcField, Dict[str, Any]]]],
+    leader: Union[str, Leader],
+) -> List[InitErrorDetails]:
+    """
+    Check each 008 field against the characters allowed for the material type
+    given by positions 06-07 of the leader. `ControlField008` only checks that
+    each character is allowed for some material type, so this reports the
+    characters it accepts that are not allowed for this one. The check depends
+    on the leader, so it is run once the fields have been validated and its
+    results are not stored in a `FieldCache`.
+
+    Args:
+        fields: A list of MARC fields or a `NormalizedRecord` to check.
+        leader: The leader of the record.
+
+    Returns:
+        a list of errors, located at the value of the 008 field
+    """
+    leader = str(leader)
+    table = get_008_table(leader[6:7], leader[7:8])
+    if table is FIXED_FIELD_008_ANY:
+        return []
+    record = normalize_record(fields)
+    errors = []
+    for position in record.tag_positions.get("008", []):
+        value = record.field_dicts[position]["008"]
+        if not isinstance(value, str) or find_008_error(value) is not None:
+            continue
+        index = find_008_error(value, leader)
+        if index is not None:
+            errors.append(
+                InitErrorDetails(
+                    type=invalid_character_error(index, table[index]),
+                    loc=("008", "value"),
+                    input=value,
+                )
+            )
+    return errors
+
+
 def validate_order_items(
-    fields: List[Union[MarcField, Dict[str, Any]]], error_locs: List[str]
+    fields: Union[NormalizedRecord, List[Union[MarcField, Dict[str, Any]]]],
+    error_locs: List[str],
+    max_errors: Union[int, None] = None,
 ) -> List[InitErrorDetails]:
-    """Validate the combination of values in order and item records."""
-    field_list = [field2dict(i) for i in fields]
-    tag_list = [next(iter(i)) for i in field_list]
-    if (
-        any(i not in tag_list for i in ["960", "949"])
-        or any(tag_list.count(i) > 1 for i in AllFields.non_repeatable_fields())
-        or any(
-            i in error_locs for i in ["item_location", "item_type", "order_location"]
-        )
-    ):
+    """
+    Validate the combination of values in order and item records. If
+    `max_errors` is set, no more than that many errors are returned.
+    """
+    if any(i in error_locs for i in ["item_location", "item_type", "order_location"]):
         return []
     errors = []
-    order_locs = [dict2subfield(i, "t") for i in field_list if "960" in i]
-    item_locs = [dict2subfield(i, "l") for i in field_list if "949" in i]
-    item_types = [dict2subfield(i, "t") for i in field_list if "949" in i]
-    item_agency = [dict2subfield(i, "h") for i in field_list if "949" in i]
-    assert len(order_locs) == 1, f"Expected 1 order location, got {len(order_locs)}"
-    order_loc = list(chain(*order_locs))[0]
-    order_items = [
-        {
-            "order_location": order_loc,
-            "item_location": il,
-            "item_type": it,
-        }
-        for il, it in zip(list(chain(*item_locs)), list(chain(*item_types)))
-    ]
-    invalid_combos = [i for i in order_items if i not in ValidOrderItems.to_list()]
     error_msg = "Invalid combination of item_type, order_location and item_location"
-
-    for order_item in invalid_combos:
-        errors.append(
-            InitErrorDetails(
-                type=PydanticCustomError(
-                    "order_item_mismatch", f"{error_msg}: {order_item}"
-                ),
-                input=order_item,
-            )
-        )
     item_agency_msg = "Invalid Item Agency for order location:"
+    for kind, value in islice(iter_order_item_violations(fields), max_errors):
+        if kind == "order_item_mismatch":
+            errors.append(
+                InitErrorDetails(
+                    type=PydanticCustomError(
+                        "order_item_mismatch", f"{error_msg}: {value}"
+                    ),
+                    input=value,
+                )
+            )
+        else:
+            errors.append(
+                InitErrorDetails(
+                    type=PydanticCustomError(
+                        "value_error", f"{item_agency_msg} {value}"
+                    ),
+                    input=None,
+                    loc=("949",),
+                )
+            )
+    return errors
+
+
+def iter_order_item_violations(
+    fields: Union[NormalizedRecord, List[Union[MarcField, Dict[str, Any]]]],
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Find invalid combinations of order location, item location and item type and
+    missing item agencies in a record. Violations are found lazily so that
+    `fields_are_valid` can stop at the first one.
+
+    Args:
+        fields: A list of MARC fields or a `NormalizedRecord`.
+
+    Yields:
+        a tuple containing "order_item_mismatch" and the invalid combination as a
+        dict, or "item_agency" and the order location
+    """
+    record = normalize_record(fields)
+    tag_counts = record.tag_counts
+    if any(i not in tag_counts for i in ["960", "949"]) or any(
+        tag_counts.get(i, 0) > 1 for i in AllFields.non_repeatable_fields()
+    ):
+        return
+    order_count = tag_counts["960"]
+    assert order_count == 1, f"Expected 1 order location, got {order_count}"
+    order_loc = record.get_subfields("960", "t")[0]
+    item_locs = record.get_subfields("949", "l")
+    item_types = record.get_subfields("949", "t")
+    item_agency = record.get_subfields("949", "h")
+    for il, it in zip(item_locs, item_types):
+        if not ValidOrderItems.is_valid(order_loc, il, it):
+            yield "order_item_mismatch", {
+                "order_location": order_loc,
+                "item_location": il,
+                "item_type": it,
+            }
     if (
-        any(i is None for i in list(chain(*item_agency)))
-        and any((i == "rc2ma" or i is None) for i in list(chain(*item_locs)))
+        any(i is None for i in item_agency)
+        and any((i == "rc2ma" or i is None) for i in item_locs)
         and order_loc != "MAL"
     ):
-        errors.append(
-            InitErrorDetails(
-                type=PydanticCustomError(
-                    "value_error", f"{item_agency_msg} {order_loc}"
-                ),
-                input=None,
-                loc=("949",),
-            )
-        )
-    return errors
+        yield "item_agency", order_loc
+
+
+def fields_are_valid(
+    fields: Union[NormalizedRecord, List[Union[MarcField, Dict[str, Any]]]],
+    *,
+    leader: Union[str, Leader, None] = None,
+    cache: Union[FieldCache, None] = None,
+    engine: str = "pydantic",
+) -> bool:
+    """
+    Return whether `validate_all` would accept a list of fields. The same rules
+    are applied in the same order, but validation stops at the first failure and
+    no error objects are built.
+
+    Args:
+        fields: A list of MARC fields or a `NormalizedRecord` to validate.
+        leader:
+            The leader of the record, if the 008 field should be checked against
+            the material type it gives.
+        cache: An optional `FieldCache` to store field validation results in.
+        engine: The engine used to validate each field, "pydantic" or "rules".
+
+    Returns:
+        True if the fields are valid, otherwise False
+    """
+    record = normalize_record(fields)
+    record_type = get_record_type(record)
+    if not tags_are_valid(record.tag_counts, record_type):
+        return False
+    table = get_tag_table(record_type)
+    if any(table.classify(i) is TagClass.FORBIDDEN for i in record.tag_counts):
+        return False
+    adapter_key = get_adapter_key(record_type)
+    adapter = get_validator(record_type, engine)
+    for field in record.fields:
+        if cache is not None:
+            if cache.validate(adapter_key, adapter, field):
+                return False
+            continue
+        try:
+            adapter.validate_python(field, from_attributes=True)
+        except ValidationError:
+            return False
+    if leader is not None and validate_fixed_fields(record, leader):
+        return False
+    if "monograph" in record_type:
+        return next(iter_order_item_violations(record), None) is None
+    return True
@@ -1,6 +1,17 @@
+import copy
+
 import pytest
 from pymarc import Field as MarcField
-from pymarc import Record, Subfield
+from pymarc import Record, Subfield, record_to_xml
+
+
+def marcxml_collection(*records):
+    return (
+        b'<?xml version="1.0" encoding="UTF-8"?>'
+        b'<collection xmlns="http://www.loc.gov/MARC21/slim">'
+        + b"".join(record_to_xml(i) for i in records)
+        + b"</collection>"
+    )
 
 
 @pytest.fixture
@@ -183,6 +194,23 @@ def stub_record():
     return bib
 
 
+@pytest.fixture
+def stub_marc21(stub_record):
+    valid = stub_record.as_marc21()
+    invalid_record = copy.deepcopy(stub_record)
+    invalid_record.remove_fields("980")
+    invalid_record["001"].data = "ocm00000001"
+    return valid, invalid_record.as_marc21()
+
+
+@pytest.fixture
+def stub_file(stub_marc21, tmp_path):
+    valid, invalid = stub_marc21
+    path = tmp_path / "records.mrc"
+    path.write_bytes(valid + invalid + b"abcde" + valid[5:])
+    return path
+
+
 @pytest.fixture
 def stub_record_multiple_items(stub_record):
     dupe_record = stub_record
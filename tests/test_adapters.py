@@ -1,17 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import get_args
 
 import pytest
-from pydantic import Tag, TypeAdapter
+from pydantic import Tag, TypeAdapter, ValidationError
 from pymarc import Field as MarcField
 
 from record_validator.adapters import (
+    ADAPTER_REGISTRY,
+    AdapterRegistry,
     AuxOtherFields,
     FieldList,
     MonographFields,
     OtherFields,
     get_adapter,
+    MODEL_TAGS,
+    TAGS,
+    TagTable,
+    get_adapter_key,
+    get_matching_tags,
+    get_tag_table,
     tag_discriminator,
 )
+from record_validator.constants import TagClass
 from record_validator.field_models import (
     AuxBibCallNo,
     MonographDataField,
@@ -64,6 +74,90 @@ def test_get_adapter(record_type, additional_fields):
     )
 
 
+@pytest.mark.parametrize(
+    "record_type, key",
+    [
+        ("auxam_monograph", "MonographFields"),
+        ("evp_monograph", "MonographFields"),
+        ("monograph", "MonographFields"),
+        ("auxam_other", "AuxOtherFields"),
+        ("evp_other", "OtherFields"),
+        ("leila_other", "OtherFields"),
+        ("other", "OtherFields"),
+        (None, "FieldList"),
+    ],
+)
+def test_get_adapter_key(record_type, key):
+    assert get_adapter_key(record_type) == key
+
+
+def test_get_adapter_cached():
+    assert get_adapter("evp_monograph") is get_adapter("leila_monograph")
+    assert get_adapter("evp_other") is get_adapter("other")
+    assert get_adapter("auxam_other") is not get_adapter("other")
+    assert ADAPTER_REGISTRY.get("MonographFields") is get_adapter("monograph")
+
+
+class TestAdapterRegistry:
+    def test_lazy(self):
+        registry = AdapterRegistry()
+        assert registry.stats()["built"] == []
+        adapter = registry.get("OtherFields")
+        stats = registry.stats()
+        assert isinstance(adapter, TypeAdapter)
+        assert stats["built"] == ["OtherFields"]
+        assert list(stats["build_times"].keys()) == ["OtherFields"]
+        assert stats["hits"]["OtherFields"] == 1
+        assert stats["hits"]["MonographFields"] == 0
+
+    def test_warm(self):
+        registry = AdapterRegistry()
+        registry.warm()
+        stats = registry.stats()
+        assert stats["built"] == [
+            "AuxOtherFields",
+            "MonographFields",
+            "OtherFields",
+            "FieldList",
+        ]
+        assert stats["total_build_time"] == sum(stats["build_times"].values())
+        assert all(i == 0 for i in stats["hits"].values())
+
+    def test_warm_keys(self):
+        registry = AdapterRegistry()
+        registry.warm(["FieldList"])
+        registry.warm(["FieldList"])
+        assert registry.stats()["built"] == ["FieldList"]
+
+    def test_clear(self):
+        registry = AdapterRegistry()
+        adapter = registry.get("AuxOtherFields")
+        registry.clear()
+        assert registry.stats()["built"] == []
+        assert registry.get("AuxOtherFields") is not adapter
+
+    def test_invalid_key(self):
+        registry = AdapterRegistry()
+        with pytest.raises(KeyError):
+            registry.get("foo")
+
+    def test_threads(self):
+        registry = AdapterRegistry()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            adapters = list(
+                executor.map(lambda _: registry.get("MonographFields"), range(32))
+            )
+        assert all(i is adapters[0] for i in adapters)
+        assert len(registry.stats()["build_times"]) == 1
+
+    def test_threads_hits(self):
+        registry = AdapterRegistry()
+        registry.warm(["OtherFields"])
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda _: registry.get("OtherFields"), range(4000)))
+        assert registry.stats()["hits"]["OtherFields"] == 4000
+
+
 @pytest.mark.parametrize(
     "tag, expected",
     [
@@ -196,3 +290,50 @@ def test_OtherFields():
             "data_field",
         ]
     ]
+
+
+@pytest.mark.parametrize(
+    "record_type, tag, expected",
+    [
+        ("evp_monograph", "001", TagClass.CONTROL),
+        ("evp_monograph", "960", TagClass.MODEL),
+        ("evp_monograph", "852", TagClass.MODEL),
+        ("evp_monograph", "245", TagClass.DATA),
+        ("evp_monograph", "002", TagClass.FORBIDDEN),
+        ("evp_monograph", "2450", TagClass.FORBIDDEN),
+        ("evp_other", "852", TagClass.FORBIDDEN),
+        ("evp_other", "949", TagClass.FORBIDDEN),
+        ("evp_other", "950", TagClass.DATA),
+        ("auxam_other", "852", TagClass.MODEL),
+        ("auxam_other", "949", TagClass.FORBIDDEN),
+    ],
+)
+def test_TagTable_classify(record_type, tag, expected):
+    assert TagTable(record_type).classify(tag) is expected
+
+
+@pytest.mark.parametrize("record_type", ["evp_monograph", "evp_other"])
+def test_TagTable_matches_data_field_model(record_type):
+    table = get_tag_table(record_type)
+    model = MonographDataField if record_type == "evp_monograph" else OtherDataField
+    for tag in TAGS - MODEL_TAGS - set(table.extra):
+        try:
+            model(tag=tag, ind1=" ", ind2=" ", subfields=[])
+            expected = TagClass.DATA
+        except ValidationError:
+            expected = TagClass.FORBIDDEN
+        assert table.classify(tag) is expected
+
+
+def test_get_tag_table_cached():
+    table = get_tag_table("evp_monograph")
+    assert table is get_tag_table("evp_monograph")
+    assert table.record_type == "evp_monograph"
+    assert table.required == ("050", "901", "910", "960", "980", "852", "949")
+    assert table.extra == ()
+    assert len(table.classes) == 1000
+
+
+def test_get_matching_tags():
+    assert get_matching_tags(r"^0[1-4]0") == {"010", "020", "030", "040"}
+    assert get_matching_tags(r"[1-4]0$") >= {"010", "110", "940"}
@@ -7,8 +7,9 @@ from record_validator.base_fields import (
     BaseDataField,
     get_control_field_input,
     get_data_field_input,
+    get_subfield_plan,
 )
-from record_validator.field_models import BibCallNo
+from record_validator.field_models import BibCallNo, OrderField
 
 
 def test_get_control_field_input_marc(stub_record):
@@ -79,6 +80,28 @@ def test_get_data_field_input_dict(stub_record):
     ]
 
 
+def test_get_data_field_input_repeated_subfields():
+    field = {
+        "852": {
+            "ind1": "8",
+            "ind2": " ",
+            "subfields": [{"h": "foo"}, {"a": "bar"}, {"h": "baz"}],
+        }
+    }
+    parsed_field = get_data_field_input(field, BibCallNo)
+    assert parsed_field["call_no"] == "baz"
+    assert parsed_field["subfields"] == [{"a": "bar"}, {"h": "foo"}, {"h": "baz"}]
+
+
+def test_get_subfield_plan():
+    assert get_subfield_plan(BaseDataField) == {}
+    assert get_subfield_plan(BibCallNo) == {"h": "call_no"}
+    plan = get_subfield_plan(OrderField)
+    assert plan["t"] == "order_location"
+    assert "tag" not in plan.values() and "subfields" not in plan.values()
+    assert get_subfield_plan(OrderField) is plan
+
+
 @pytest.mark.parametrize(
     "data",
     [[], (960, "", ""), "960", {"960": "foo"}],
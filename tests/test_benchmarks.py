@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from benchmarks.generator import RECORD_TYPES, generate_record, generate_records
+from benchmarks.run import STAGES, format_results, main, run_benchmarks
+from record_validator.streaming import validate_record
+from record_validator.utils import get_record_type
+
+
+@pytest.mark.parametrize("record_type", RECORD_TYPES)
+def test_generate_records_valid(record_type):
+    records = generate_records(record_type, 5, size=40, items=3)
+    assert len(records) == 5
+    assert all(len(i.fields) >= 40 for i in records)
+    assert all(get_record_type(i.fields) == record_type for i in records)
+    assert all(validate_record(i.leader, i.fields) is None for i in records)
+    if "monograph" in record_type:
+        assert all(len(i.get_fields("949")) == 3 for i in records)
+
+
+@pytest.mark.parametrize("record_type", RECORD_TYPES)
+def test_generate_records_errors(record_type):
+    records = generate_records(record_type, 20, error_rate=1.0)
+    assert all(validate_record(i.leader, i.fields) is not None for i in records)
+
+
+def test_generate_records_seed():
+    first = [i.as_marc21() for i in generate_records("evp_monograph", 3, seed=1)]
+    second = [i.as_marc21() for i in generate_records("evp_monograph", 3, seed=1)]
+    assert first == second
+
+
+def test_generate_record_invalid_type():
+    with pytest.raises(ValueError):
+        generate_record("foo_monograph", rng=random.Random(0))
+
+
+def test_run_benchmarks():
+    results = run_benchmarks(record_types=["evp_monograph"], count=5, error_rate=0.0)
+    assert [i["stage"] for i in results] == list(STAGES)
+    assert results[0]["records"] == 5
+    assert results[0]["records_per_sec"] > 0
+    assert results[-1]["records"] == 0
+    assert "records_per_sec" not in results[-1]
+    assert "evp_monograph" in format_results(results)
+
+
+def test_main(capsys):
+    main(["--types", "auxam_other", "--count", "3", "--error-rate", "1", "--json"])
+    out, _ = capsys.readouterr()
+    assert '"stage": "MarcValidationError"' in out
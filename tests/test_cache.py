@@ -0,0 +1,114 @@
+import pytest
+from pymarc import Field as MarcField
+
+from record_validator.adapters import get_adapter
+from record_validator.cache import FieldCache, field_key
+from record_validator.validators import validate_all
+
+
+def test_field_key(stub_record):
+    field = stub_record["960"]
+    same_field = MarcField(
+        tag="960", indicators=[" ", " "], subfields=list(field.subfields)
+    )
+    assert field_key(field) == field_key(same_field)
+    assert field_key(stub_record["001"]) == field_key(
+        MarcField("001", data="on1381158740")
+    )
+    assert field_key(field) != field_key(stub_record["980"])
+    assert field_key(field) != field_key(stub_record.as_dict()["fields"][-2])
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        ({"960": {"ind1": " "}}, {"960": {"ind1": " ", "ind2": " "}}),
+        ({"001": "1"}, {"001": 1}),
+        ({"001": 1}, {"001": True}),
+        ({"001": ["a"]}, {"001": ("a",)}),
+    ],
+)
+def test_field_key_differs(first, second):
+    assert field_key(first) != field_key(second)
+
+
+def test_field_key_unhashable():
+    assert field_key({"001": {"a": {"b"}}}) is None
+
+
+class TestFieldCache:
+    def test_validate(self, stub_record):
+        cache = FieldCache()
+        adapter = get_adapter("evp_monograph")
+        assert cache.validate("MonographFields", adapter, stub_record["960"]) == []
+        assert cache.validate("MonographFields", adapter, stub_record["960"]) == []
+        assert cache.stats() == {
+            "hits": 1,
+            "misses": 1,
+            "hit_rate": 0.5,
+            "size": 1,
+            "maxsize": 4096,
+        }
+
+    def test_validate_errors(self, stub_record):
+        cache = FieldCache()
+        adapter = get_adapter("evp_monograph")
+        stub_record["960"].delete_subfield("t")
+        stub_record["960"].add_subfield("t", "foo")
+        first = cache.validate("MonographFields", adapter, stub_record["960"])
+        first[0]["msg"] = "foo"
+        second = cache.validate("MonographFields", adapter, stub_record["960"])
+        assert len(second) == 1
+        assert second[0]["type"] == "literal_error"
+        assert second[0]["msg"] != "foo"
+
+    def test_validate_adapter_key(self, stub_record):
+        cache = FieldCache()
+        cache.validate(
+            "MonographFields", get_adapter("evp_monograph"), stub_record["949"]
+        )
+        cache.validate("AuxOtherFields", get_adapter("auxam_other"), stub_record["949"])
+        assert cache.stats()["misses"] == 2
+
+    def test_validate_unhashable(self):
+        cache = FieldCache()
+        adapter = get_adapter("evp_monograph")
+        field = {"960": {"ind1": " ", "ind2": " ", "subfields": [{"t": {"a"}}]}}
+        assert cache.validate("MonographFields", adapter, field) != []
+        assert cache.validate("MonographFields", adapter, field) != []
+        assert cache.stats()["misses"] == 2
+        assert len(cache) == 0
+
+    def test_maxsize(self, stub_record):
+        cache = FieldCache(maxsize=2)
+        adapter = get_adapter("evp_monograph")
+        for tag in ["960", "980", "960", "901"]:
+            cache.validate("MonographFields", adapter, stub_record[tag])
+        assert len(cache) == 2
+        cache.validate("MonographFields", adapter, stub_record["960"])
+        cache.validate("MonographFields", adapter, stub_record["980"])
+        assert cache.hits == 2
+        assert cache.misses == 4
+
+    def test_invalid_maxsize(self):
+        with pytest.raises(ValueError):
+            FieldCache(maxsize=0)
+
+    def test_clear(self, stub_record):
+        cache = FieldCache()
+        cache.validate("MonographFields", get_adapter(None), stub_record["960"])
+        cache.clear()
+        assert cache.stats() == {
+            "hits": 0,
+            "misses": 0,
+            "hit_rate": 0.0,
+            "size": 0,
+            "maxsize": 4096,
+        }
+
+
+def test_validate_all_cache(stub_record):
+    cache = FieldCache()
+    validate_all(stub_record.fields, cache=cache)
+    validate_all(stub_record.fields, cache=cache)
+    assert cache.hits == cache.misses == len(stub_record.fields)
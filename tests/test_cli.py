@@ -0,0 +1,190 @@
+import json
+
+import pytest
+
+from record_validator.cli import iter_paths, main
+from tests.conftest import marcxml_collection
+
+
+@pytest.fixture
+def stub_dir(stub_marc21, tmp_path):
+    valid, invalid = stub_marc21
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "valid.mrc").write_bytes(valid * 2)
+    (tmp_path / "sub" / "invalid.mrc").write_bytes(valid + invalid + valid)
+    (tmp_path / "notes.txt").write_text("foo")
+    return tmp_path
+
+
+def test_iter_paths(stub_dir):
+    paths = list(iter_paths([str(stub_dir), str(stub_dir / "notes.txt")]))
+    assert paths == [
+        stub_dir / "sub" / "invalid.mrc",
+        stub_dir / "valid.mrc",
+        stub_dir / "notes.txt",
+    ]
+
+
+def test_main_missing_path(stub_dir, capsys):
+    with pytest.raises(SystemExit) as exc:
+        main([str(stub_dir / "valid.mrc"), str(stub_dir / "foo.mrc")])
+    assert exc.value.code == 2
+    _, err = capsys.readouterr()
+    assert f"no such file or directory: {stub_dir / 'foo.mrc'}" in err
+
+
+def test_main_valid(stub_dir, capsys):
+    assert main([str(stub_dir / "valid.mrc")]) == 0
+    out, err = capsys.readouterr()
+    lines = [json.loads(i) for i in out.splitlines()]
+    assert len(lines) == 2
+    assert [i["index"] for i in lines] == [0, 1]
+    assert all(i["valid"] for i in lines)
+    assert all(i["file"] == str(stub_dir / "valid.mrc") for i in lines)
+    assert json.loads(err) == {
+        "file": str(stub_dir / "valid.mrc"),
+        "records": 2,
+        "valid": 2,
+        "invalid": 0,
+        "parse_errors": 0,
+        "truncated": False,
+    }
+
+
+def test_main_invalid(stub_dir, capsys):
+    assert main([str(stub_dir)]) == 1
+    out, err = capsys.readouterr()
+    lines = [json.loads(i) for i in out.splitlines()]
+    assert len(lines) == 5
+    assert lines[1]["valid"] is False
+    assert lines[1]["errors"]["missing_fields"] == ["980"]
+    summaries = [json.loads(i) for i in err.splitlines()]
+    assert [i["invalid"] for i in summaries] == [1, 0]
+
+
+def test_main_fail_fast(stub_dir, capsys):
+    assert main([str(stub_dir), "--fail-fast"]) == 1
+    out, err = capsys.readouterr()
+    assert len(out.splitlines()) == 2
+    assert len(err.splitlines()) == 1
+
+
+def test_main_summary_only_output_file(stub_dir, capsys):
+    output = stub_dir / "out.jsonl"
+    assert main([str(stub_dir), "--summary-only", "-o", str(output)]) == 1
+    out, err = capsys.readouterr()
+    assert out == err == ""
+    summaries = [json.loads(i) for i in output.read_text().splitlines()]
+    assert [i["records"] for i in summaries] == [3, 2]
+
+
+def test_main_workers(stub_dir, capsys):
+    assert main([str(stub_dir / "valid.mrc"), "--workers", "2"]) == 0
+    out, _ = capsys.readouterr()
+    assert len(out.splitlines()) == 2
+
+
+def test_main_parse_error(tmp_path, capsys):
+    path = tmp_path / "bad.mrc"
+    path.write_bytes(b"abcdefghij\x1d")
+    assert main([str(path)]) == 1
+    out, err = capsys.readouterr()
+    assert json.loads(out)["parse_error"].startswith("RecordLengthInvalid")
+    assert json.loads(err)["parse_errors"] == 1
+
+
+@pytest.mark.parametrize("flag", ["--precheck", "--precheck-only"])
+def test_main_precheck(stub_dir, capsys, flag):
+    assert main([str(stub_dir), flag]) == 1
+    out, _ = capsys.readouterr()
+    lines = [json.loads(i) for i in out.splitlines()]
+    assert [i["valid"] for i in lines] == [True, False, True, True, True]
+    assert lines[1]["errors"]["missing_fields"] == ["980"]
+
+
+def test_main_precheck_workers(stub_dir, capsys):
+    assert main([str(stub_dir / "valid.mrc"), "--precheck", "--workers", "2"]) == 0
+    out, _ = capsys.readouterr()
+    assert len(out.splitlines()) == 2
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_main_cache_size(stub_dir, capsys, workers):
+    args = [str(stub_dir), "--cache-size", "100", "--workers", workers]
+    assert main(args) == 1
+    out, _ = capsys.readouterr()
+    lines = [json.loads(i) for i in out.splitlines()]
+    assert [i["valid"] for i in lines] == [True, False, True, True, True]
+
+
+def test_main_max_errors(stub_dir, capsys):
+    args = [str(stub_dir), "--max-errors", "1", "--max-file-errors", "1"]
+    assert main(args) == 1
+    out, err = capsys.readouterr()
+    lines = [json.loads(i) for i in out.splitlines()]
+    assert [i["truncated"] for i in lines] == [False, True, False, False]
+    summaries = [json.loads(i) for i in err.splitlines()]
+    assert [i["truncated"] for i in summaries] == [True, False]
+    assert [i["records"] for i in summaries] == [2, 2]
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_main_engine(stub_dir, capsys, workers):
+    expected = main([str(stub_dir)])
+    expected_out, _ = capsys.readouterr()
+    args = [str(stub_dir), "--engine", "rules", "--workers", workers]
+    assert main(args) == expected
+    out, _ = capsys.readouterr()
+    assert out == expected_out
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_main_decoder(stub_dir, capsys, workers):
+    expected = main([str(stub_dir)])
+    expected_out, _ = capsys.readouterr()
+    args = [str(stub_dir), "--decoder", "raw", "--workers", workers]
+    assert main(args) == expected
+    out, _ = capsys.readouterr()
+    assert out == expected_out
+
+
+def test_main_marcxml(stub_record, tmp_path, capsys):
+    valid = stub_record.as_marc21()
+    (tmp_path / "records.mrc").write_bytes(valid)
+    stub_record.remove_fields("980")
+    (tmp_path / "records.xml").write_bytes(marcxml_collection(stub_record))
+    args = [str(tmp_path), "--format", "marcxml"]
+    assert main(args) == 1
+    out, err = capsys.readouterr()
+    lines = [json.loads(i) for i in out.splitlines()]
+    assert [i["file"] for i in lines] == [str(tmp_path / "records.xml")]
+    assert lines[0]["errors"]["missing_fields"] == ["980"]
+    assert lines[0]["offset"] is None
+
+
+def test_main_ndjson(stub_record, tmp_path, capsys):
+    stub_record.remove_fields("980")
+    line = json.dumps(stub_record.as_dict()) + "\n"
+    (tmp_path / "records.json").write_text(line * 2)
+    args = [str(tmp_path), "--format", "ndjson", "--pattern", "*.json"]
+    assert main(args + ["--max-file-errors", "1"]) == 1
+    out, err = capsys.readouterr()
+    lines = [json.loads(i) for i in out.splitlines()]
+    assert [i["offset"] for i in lines] == [0]
+    assert lines[0]["errors"]["missing_fields"] == ["980"]
+    assert json.loads(err)["truncated"] is True
+
+
+@pytest.mark.parametrize(
+    "input_format, expected",
+    [("marc", "records.mrc"), ("marcxml", "records.xml"), ("ndjson", "records.ndjson")],
+)
+def test_main_default_pattern(stub_record, tmp_path, capsys, input_format, expected):
+    (tmp_path / "records.mrc").write_bytes(stub_record.as_marc21())
+    (tmp_path / "records.xml").write_bytes(marcxml_collection(stub_record))
+    (tmp_path / "records.ndjson").write_text(json.dumps(stub_record.as_dict()))
+    assert main([str(tmp_path), "--format", input_format]) == 0
+    out, _ = capsys.readouterr()
+    assert [json.loads(i)["file"] for i in out.splitlines()] == [
+        str(tmp_path / expected)
+    ]
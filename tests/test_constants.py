@@ -1,6 +1,12 @@
 import pytest
 
-from record_validator.constants import AllFields, AllSubfields, ValidOrderItems
+from record_validator.constants import (
+    LEADER_CHARACTERS,
+    AllFields,
+    AllSubfields,
+    ValidOrderItems,
+    character_class,
+)
 
 
 @pytest.mark.parametrize(
@@ -136,3 +142,57 @@ def test_ValidOrderItems_to_list():
         {"order_location": "SC", "item_location": "rc2cf", "item_type": "55"},
         {"order_location": "SC", "item_location": "rc2cf", "item_type": None},
     ]
+
+
+def test_ValidOrderItems_to_set():
+    valid_set = ValidOrderItems.to_set()
+    assert isinstance(valid_set, frozenset)
+    assert len(valid_set) == len(ValidOrderItems.to_list())
+    assert ("MAF", "rcmf2", None) in valid_set
+    assert ValidOrderItems.to_set() is valid_set
+
+
+@pytest.mark.parametrize(
+    "order_location, item_location, item_type, expected",
+    [
+        ("MAF", "rcmf2", "55", True),
+        ("MAF", "rcmf2", None, True),
+        ("MAL", None, None, True),
+        ("MAF", "rcmf2", "2", False),
+        ("MAB", "rcmf2", "55", False),
+        (None, None, None, False),
+    ],
+)
+def test_ValidOrderItems_is_valid(order_location, item_location, item_type, expected):
+    assert (
+        ValidOrderItems.is_valid(order_location, item_location, item_type) is expected
+    )
+
+
+def test_ValidOrderItems_is_valid_matches_to_list():
+    for item in ValidOrderItems.to_list():
+        assert ValidOrderItems.is_valid(
+            item["order_location"], item["item_location"], item["item_type"]
+        )
+
+
+def test_ValidOrderItems_for_order_location():
+    assert ValidOrderItems.for_order_location("MAB") == [
+        {"order_location": "MAB", "item_location": "rcmb2", "item_type": "2"}
+    ]
+    assert len(ValidOrderItems.for_order_location("MAL")) == 4
+    assert ValidOrderItems.for_order_location("foo") == []
+    assert ValidOrderItems.for_order_location(None) == []
+
+
+@pytest.mark.parametrize(
+    "characters, char_class",
+    [
+        (frozenset("abcdims"), "[a-dims]"),
+        (frozenset(" -0123|"), "[ \\-0-3|]"),
+        (LEADER_CHARACTERS[8], "[\\sa]"),
+        (LEADER_CHARACTERS[17], "[\\s1-8uz]"),
+    ],
+)
+def test_character_class(characters, char_class):
+    assert character_class(characters) == char_class
@@ -538,6 +538,23 @@ def test_ControlField008_invalid_code_value(field_value, error_type):
     assert len(e.value.errors()) == 1
 
 
+@pytest.mark.parametrize(
+    "field_value, position",
+    [
+        ("210505s2021    nyu           000 0 eng !", 39),
+        ("2105a5s2021    nyu           000 0 eng d", 4),
+        ("210505x2021    nyu           000 0 eng d", 6),
+        ("210505s2021    NYu           000 0 eng d", 15),
+        ("210505s2021    nyu           000 0 en1 d", 37),
+    ],
+)
+def test_ControlField008_invalid_position(field_value, position):
+    with pytest.raises(ValidationError) as e:
+        ControlField008(tag="008", value=field_value)
+    assert e.value.errors()[0]["type"] == "string_pattern_mismatch"
+    assert e.value.errors()[0]["ctx"]["position"] == position
+
+
 def test_ControlField008_invalid_code_literal():
     with pytest.raises(ValidationError) as e:
         ControlField008(tag="020", value="foo")
@@ -0,0 +1,90 @@
+import pytest
+from pydantic_core import PydanticCustomError
+from pymarc import Leader
+
+from record_validator.constants import (
+    FIXED_FIELD_008,
+    FIXED_FIELD_008_ANY,
+)
+from record_validator.fixed_fields import check_008, find_008_error, get_008_table
+
+BOOK = "210505s2021    nyu           000 0 eng d"
+
+
+@pytest.mark.parametrize(
+    "type_of_record, bibliographic_level, material",
+    [
+        ("a", "m", "BK"),
+        ("t", "a", "BK"),
+        ("a", "s", "CR"),
+        ("a", "i", "CR"),
+        ("c", "m", "MU"),
+        ("e", "m", "MP"),
+        ("g", "m", "VM"),
+        ("m", "m", "CF"),
+        ("p", "c", "MX"),
+    ],
+)
+def test_get_008_table(type_of_record, bibliographic_level, material):
+    table = get_008_table(type_of_record, bibliographic_level)
+    assert table is FIXED_FIELD_008[material]
+    assert len(table) == 40
+
+
+@pytest.mark.parametrize("type_of_record", ["", "x", "|"])
+def test_get_008_table_unknown(type_of_record):
+    assert get_008_table(type_of_record, "m") is FIXED_FIELD_008_ANY
+
+
+def test_get_008_table_is_cached():
+    get_008_table.cache_clear()
+    get_008_table("a", "m")
+    get_008_table("a", "m")
+    assert get_008_table.cache_info().hits == 1
+
+
+@pytest.mark.parametrize(
+    "value, leader, position",
+    [
+        (BOOK, None, None),
+        (BOOK, "00454cam a22001575i 4500", None),
+        (BOOK, Leader("00454cam a22001575i 4500"), None),
+        (BOOK, "00454cgm a22001575i 4500", 18),
+        (BOOK, "00454cas a22001575i 4500", 19),
+        (BOOK[:20], None, 20),
+        (f"{BOOK}d", None, 40),
+        ("", None, 0),
+        ("210505s2021    nyu     a     000 0 eng d", None, None),
+        ("210505s2021    nyu     a     000 0 eng d", "00454cmm a22001575i 4500", 23),
+    ],
+)
+def test_find_008_error(value, leader, position):
+    assert find_008_error(value, leader) == position
+
+
+def test_fixed_field_008_any():
+    assert all(len(i) == 40 for i in FIXED_FIELD_008.values())
+    assert len(FIXED_FIELD_008_ANY) == 40
+    for position, allowed in enumerate(FIXED_FIELD_008_ANY):
+        assert allowed == frozenset().union(
+            *(i[position] for i in FIXED_FIELD_008.values())
+        )
+
+
+def test_find_008_error_each_position():
+    characters = "0123456789abcdefghijklmnopqrstuvwxyzABC |-!\\"
+    for position, allowed in enumerate(FIXED_FIELD_008_ANY):
+        for char in characters:
+            value = list(BOOK)
+            value[position] = char
+            expected = None if char in allowed else position
+            assert find_008_error("".join(value)) == expected
+
+
+def test_check_008():
+    assert check_008(BOOK) == BOOK
+    with pytest.raises(PydanticCustomError) as e:
+        check_008(f"{BOOK[:-1]}!")
+    assert e.value.type == "string_pattern_mismatch"
+    assert e.value.context == {"pattern": "[ cdu|]", "position": 39}
+    assert e.value.message() == "Invalid character at position 39, expected [ cdu|]"
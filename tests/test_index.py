@@ -0,0 +1,148 @@
+import os
+
+import pytest
+
+from record_validator.index import INDEX_SUFFIX, RecordIndex
+from record_validator.streaming import validate_file
+
+
+@pytest.fixture
+def stub_file(stub_file, stub_marc21, stub_pamphlet_record):
+    with open(stub_file, "ab") as stream:
+        stream.write(stub_pamphlet_record.as_marc21() + stub_marc21[0])
+    return stub_file
+
+
+def test_build(stub_file):
+    with RecordIndex.build(stub_file) as index:
+        assert len(index) == 5
+        results = list(validate_file(stub_file))
+        assert list(index.offsets) == [i.offset for i in results]
+        assert list(index.lengths) == [i.length for i in results]
+        assert index.control_numbers == [
+            "on1381158740",
+            "ocm00000001",
+            None,
+            results[3].control_number,
+            "on1381158740",
+        ]
+
+
+@pytest.mark.parametrize("precheck", [True, False])
+def test_validate_at(stub_file, precheck):
+    expected = [i.to_dict() for i in validate_file(stub_file, precheck=precheck)]
+    with RecordIndex.build(stub_file) as index:
+        results = [
+            index.validate_at(i, precheck=precheck).to_dict() for i in range(len(index))
+        ]
+        assert results == expected
+        assert index.validate_at(-4).to_dict() == expected[1]
+        assert "RecordLengthInvalid" in index.validate_at(2).parse_error
+
+
+def test_validate_at_out_of_range(stub_file):
+    with RecordIndex.build(stub_file) as index:
+        with pytest.raises(IndexError):
+            index.validate_at(5)
+        with pytest.raises(IndexError):
+            index.validate_at(-6)
+
+
+def test_validate_at_closed(stub_file):
+    index = RecordIndex.build(stub_file)
+    index.validate_at(0)
+    index.close()
+    with pytest.raises(ValueError) as exc:
+        index.validate_at(0)
+    assert "closed index" in str(exc.value)
+
+
+def test_validate_by_control_number(stub_file):
+    with RecordIndex.build(stub_file) as index:
+        assert index.find("on1381158740") == [0, 3, 4]
+        assert index.find("foo") == []
+        results = index.validate_by_control_number("on1381158740")
+        assert [(i.index, i.valid) for i in results] == [
+            (0, True),
+            (3, True),
+            (4, True),
+        ]
+        result = index.validate_by_control_number("ocm00000001", max_errors=1)[0]
+        assert result.index == 1
+        assert result.error.to_dict()["missing_fields"] == ["980"]
+        with pytest.raises(KeyError):
+            index.validate_by_control_number("foo")
+
+
+def test_build_unreadable_directory(tmp_path, stub_record):
+    data = stub_record.as_marc21()
+    path = tmp_path / "records.mrc"
+    path.write_bytes(data[:12] + b"abcde" + data[17:])
+    with RecordIndex.build(path) as index:
+        assert index.control_numbers == [None]
+        assert index.validate_at(0).parse_error is not None
+
+
+def test_build_empty_file(tmp_path):
+    path = tmp_path / "empty.mrc"
+    path.write_bytes(b"")
+    with RecordIndex.open(path) as index:
+        assert len(index) == 0
+    with RecordIndex.load(path) as index:
+        assert len(index) == 0
+
+
+def test_save_and_load(stub_file):
+    with RecordIndex.build(stub_file) as index:
+        index.save()
+    assert os.path.exists(f"{stub_file}{INDEX_SUFFIX}")
+    with RecordIndex.load(stub_file) as loaded:
+        assert loaded.offsets == index.offsets
+        assert loaded.lengths == index.lengths
+        assert loaded.control_numbers == index.control_numbers
+        assert loaded.find("ocm00000001") == [1]
+        assert "RecordLengthInvalid" in loaded.validate_at(2).parse_error
+
+
+def test_save_and_load_path(stub_file, tmp_path):
+    index_path = tmp_path / "sidecar"
+    with RecordIndex.build(stub_file) as index:
+        index.save(index_path)
+    with RecordIndex.load(stub_file, index_path) as loaded:
+        assert len(loaded) == 5
+
+
+@pytest.mark.parametrize("data", [b"", b"foo" * 20, b"RVIDX1\x00\x00" + b"\x01" * 24])
+def test_load_invalid_sidecar(stub_file, data):
+    with open(f"{stub_file}{INDEX_SUFFIX}", "wb") as sidecar:
+        sidecar.write(data)
+    with pytest.raises(ValueError) as exc:
+        RecordIndex.load(stub_file)
+    assert "is not a record index" in str(exc.value)
+
+
+def test_load_changed_file(stub_file, stub_record):
+    RecordIndex.build(stub_file).save()
+    with open(stub_file, "ab") as stream:
+        stream.write(stub_record.as_marc21())
+    with pytest.raises(ValueError) as exc:
+        RecordIndex.load(stub_file)
+    assert "has changed since it was indexed" in str(exc.value)
+
+
+def test_open(stub_file, stub_record):
+    with RecordIndex.open(stub_file) as index:
+        assert len(index) == 5
+    assert os.path.exists(f"{stub_file}{INDEX_SUFFIX}")
+    with open(stub_file, "ab") as stream:
+        stream.write(stub_record.as_marc21())
+    with RecordIndex.open(stub_file) as index:
+        assert len(index) == 6
+    with RecordIndex.load(stub_file) as index:
+        assert len(index) == 6
+
+
+def test_open_no_save(stub_file):
+    with RecordIndex.open(stub_file, save=False) as index:
+        assert len(index) == 5
+    assert not os.path.exists(f"{stub_file}{INDEX_SUFFIX}")
@@ -0,0 +1,96 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pydantic import ValidationError
+
+from record_validator.instrumentation import (
+    STAGES,
+    Instrument,
+    get_instrument,
+    instrument,
+)
+from record_validator.marc_models import RecordModel
+from record_validator.validators import validate_all
+
+
+def test_disabled_by_default(stub_record):
+    assert get_instrument() is None
+    validate_all(stub_record.fields)
+    assert get_instrument() is None
+
+
+def test_instrument_monograph(stub_record):
+    with instrument() as timer:
+        assert get_instrument() is timer
+        validate_all(stub_record.fields, leader=stub_record.leader)
+        validate_all(stub_record.fields, leader=stub_record.leader)
+    assert get_instrument() is None
+    stats = timer.stats()
+    assert list(stats["stages"].keys()) == list(STAGES)
+    assert all(i["calls"] == 2 for i in stats["stages"].values())
+    assert all(i["seconds"] > 0 for i in stats["stages"].values())
+    assert list(stats["fields"].keys()) == ["evp_monograph"]
+    assert stats["fields"]["evp_monograph"]["960"]["calls"] == 2
+    assert sum(i["calls"] for i in stats["fields"]["evp_monograph"].values()) == (
+        2 * len(stub_record.fields)
+    )
+
+
+def test_instrument_other(stub_record):
+    stub_record.remove_fields("949", "852")
+    stub_record["300"].delete_subfield("a")
+    stub_record["300"].add_subfield("a", "5 pages")
+    stub_record["960"].delete_subfield("t")
+    with instrument() as timer:
+        with pytest.raises(ValidationError):
+            RecordModel(leader=stub_record.leader, fields=stub_record.fields)
+    stats = timer.stats()
+    assert stats["stages"]["validate_fixed_fields"]["calls"] == 1
+    assert stats["stages"]["validate_order_items"]["calls"] == 0
+    assert stats["stages"]["validate_all"]["calls"] == 1
+    assert "949" not in stats["fields"]["evp_other"]
+
+
+def test_instrument_nested(stub_record):
+    outer_timer = Instrument()
+    with instrument(outer_timer):
+        with instrument() as inner_timer:
+            validate_all(stub_record.fields)
+        assert get_instrument() is outer_timer
+        validate_all(stub_record.fields)
+    assert inner_timer.stage_calls["validate_all"] == 1
+    assert outer_timer.stage_calls["validate_all"] == 1
+
+
+def test_instrument_threads(stub_record):
+    with instrument() as timer:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: validate_all(stub_record.fields), range(8)))
+    assert timer.stage_calls["validate_all"] == 8
+
+
+def test_slowest_fields():
+    timer = Instrument()
+    now = time.perf_counter()
+    timer.record_field("evp_monograph", "960", now - 2)
+    timer.record_field("foo", "001", now - 1)
+    timer.record_field("evp_monograph", "949", time.perf_counter())
+    slowest = timer.slowest_fields(n=2)
+    assert [(i["record_type"], i["tag"]) for i in slowest] == [
+        ("evp_monograph", "960"),
+        ("foo", "001"),
+    ]
+    assert slowest[0]["calls"] == 1
+    assert slowest[0]["seconds"] > slowest[1]["seconds"]
+
+
+def test_reset():
+    timer = Instrument()
+    timer.record_stage("validate_all", 0.0)
+    timer.record_field("evp_monograph", "960", 0.0)
+    timer.reset()
+    assert timer.stats() == {
+        "stages": {i: {"calls": 0, "seconds": 0.0} for i in STAGES},
+        "fields": {},
+    }
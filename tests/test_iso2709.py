@@ -0,0 +1,260 @@
+import io
+
+import pytest
+from pymarc import Field as MarcField
+from pymarc import Record, Subfield
+from pymarc.exceptions import (
+    BaseAddressInvalid,
+    BaseAddressNotFound,
+    EndOfRecordNotFound,
+    NoFieldsFound,
+    RecordDirectoryInvalid,
+    RecordLeaderInvalid,
+    RecordLengthInvalid,
+    TruncatedRecord,
+)
+
+from record_validator.iso2709 import (
+    decode_fields,
+    decode_record,
+    precheck,
+    read_008_error,
+    read_chunks,
+    read_control_number,
+    read_directory,
+)
+from record_validator.utils import field2dict, get_record_type
+from record_validator.validators import validate_fields
+
+
+def test_read_chunks(stub_record, stub_pamphlet_record):
+    first = stub_record.as_marc21()
+    second = stub_pamphlet_record.as_marc21()
+    chunks = list(read_chunks(io.BytesIO(first + second)))
+    assert chunks == [(0, first, None), (len(first), second, None)]
+
+
+def test_read_chunks_empty():
+    assert list(read_chunks(io.BytesIO(b""))) == []
+
+
+def test_read_chunks_invalid_length(stub_record):
+    record = stub_record.as_marc21()
+    bad = b"abcde" + record[5:]
+    chunks = list(read_chunks(io.BytesIO(bad + record)))
+    assert len(chunks) == 2
+    assert chunks[0][:2] == (0, bad)
+    assert isinstance(chunks[0][2], RecordLengthInvalid)
+    assert chunks[1] == (len(bad), record, None)
+
+
+def test_read_chunks_invalid_length_no_terminator():
+    chunks = list(read_chunks(io.BytesIO(b"abcdefghij")))
+    assert len(chunks) == 1
+    assert chunks[0][1] == b"abcdefghij"
+    assert isinstance(chunks[0][2], RecordLengthInvalid)
+
+
+@pytest.mark.parametrize("delta", [-10, 10, 1000, 99999 - 452])
+def test_read_chunks_wrong_length(stub_record, delta):
+    record = stub_record.as_marc21()
+    assert len(record) == 452
+    bad = str(len(record) + delta).zfill(5).encode() + record[5:]
+    chunks = list(read_chunks(io.BytesIO(bad + record + record)))
+    assert len(chunks) == 3
+    assert chunks[0][:2] == (0, bad)
+    assert isinstance(chunks[0][2], EndOfRecordNotFound)
+    assert chunks[1] == (len(bad), record, None)
+    assert chunks[2] == (len(bad) + len(record), record, None)
+
+
+def test_read_chunks_truncated(stub_record):
+    record = stub_record.as_marc21()
+    chunks = list(read_chunks(io.BytesIO(record + record[:100])))
+    assert len(chunks) == 2
+    assert chunks[0] == (0, record, None)
+    assert chunks[1][:2] == (len(record), record[:100])
+    assert isinstance(chunks[1][2], TruncatedRecord)
+
+
+def test_read_chunks_trailing_bytes(stub_record):
+    record = stub_record.as_marc21()
+    chunks = list(read_chunks(io.BytesIO(record + b"\n")))
+    assert len(chunks) == 2
+    assert isinstance(chunks[1][2], TruncatedRecord)
+
+
+def test_read_directory(stub_record):
+    data = stub_record.as_marc21()
+    entries = read_directory(data)
+    assert [i[0] for i in entries] == [i.tag for i in stub_record.fields]
+    tag, start, length = entries[0]
+    assert data[start : start + length] == b"on1381158740"
+    assert read_directory(memoryview(data)) == entries
+
+
+@pytest.mark.parametrize(
+    "start, end, replacement, exception",
+    [
+        (0, None, b"", RecordLeaderInvalid),
+        (12, 17, b"abcde", BaseAddressNotFound),
+        (12, 17, b"99999", BaseAddressInvalid),
+        (27, 28, b"x", RecordDirectoryInvalid),
+        (24, 25, b"\xff", RecordDirectoryInvalid),
+    ],
+)
+def test_read_directory_invalid(stub_record, start, end, replacement, exception):
+    data = stub_record.as_marc21()
+    data = data[:start] + replacement + (data[end:] if end is not None else b"")
+    with pytest.raises(exception):
+        read_directory(data)
+
+
+def test_read_directory_invalid_length(stub_record):
+    data = stub_record.as_marc21()
+    base_address = b"%05d" % (int(data[12:17]) + 1)
+    with pytest.raises(RecordDirectoryInvalid):
+        read_directory(data[:12] + base_address + data[17:])
+
+
+def test_decode_fields(stub_record):
+    data = stub_record.as_marc21()
+    assert decode_fields(data) == [field2dict(i) for i in stub_record.fields]
+    assert decode_fields(data, tags=["960", "001"]) == [
+        {"001": "on1381158740"},
+        field2dict(stub_record["960"]),
+    ]
+
+
+def test_decode_fields_marc8(stub_record):
+    stub_record.add_ordered_field(
+        MarcField(
+            tag="650",
+            indicators=[" ", "0"],
+            subfields=[Subfield(code="v", value="Catalogues raisonnes")],
+        )
+    )
+    data = stub_record.as_marc21()
+    data = data[:9] + b" " + data[10:]
+    assert decode_fields(data, tags=["650"]) == [
+        {
+            "650": {
+                "ind1": " ",
+                "ind2": "0",
+                "subfields": [{"v": "Catalogues raisonnes"}],
+            }
+        }
+    ]
+
+
+def test_decode_fields_missing_indicators(stub_record):
+    data = stub_record.as_marc21().replace(b"\x1e 4\x1faF00", b"\x1e\x1fx\x1faF00")
+    assert decode_fields(data, tags=["050"]) == [
+        {"050": {"ind1": " ", "ind2": " ", "subfields": [{"x": ""}, {"a": "F00"}]}}
+    ]
+
+
+def test_decode_fields_marc8_control_field(stub_record):
+    stub_record["001"].data = "on1381158740\u00e9"
+    data = stub_record.as_marc21()
+    data = data[:9] + b" " + data[10:]
+    assert decode_fields(data, tags=["001"]) == [{"001": "on1381158740\u00c3\u00a9"}]
+    assert decode_fields(data, tags=["001"], force_utf8=True) == [
+        {"001": "on1381158740\u00e9"}
+    ]
+
+
+def test_decode_record(stub_record):
+    data = stub_record.as_marc21()
+    leader, fields = decode_record(memoryview(data))
+    record = Record(data)
+    assert leader == str(record.leader)
+    assert fields == [field2dict(i) for i in record.fields]
+
+
+def test_decode_record_utf8_handling(stub_record):
+    data = stub_record.as_marc21().replace(b"\x1faF00", b"\x1faF0\xff")
+    with pytest.raises(UnicodeDecodeError):
+        decode_record(data)
+    _, fields = decode_record(data, utf8_handling="replace")
+    assert {
+        "050": {"ind1": " ", "ind2": "4", "subfields": [{"a": "F0\ufffd"}]}
+    } in fields
+
+
+@pytest.mark.parametrize(
+    "data, exception",
+    [
+        (b"00024", RecordLeaderInvalid),
+        (b"00100cam a2200025 a 4500\x1e\x1d", TruncatedRecord),
+        (b"00026cam a2200025 a 4500\x1e\x1d", NoFieldsFound),
+        (b"00026cam a2200000 a 4500\x1e\x1d", BaseAddressNotFound),
+    ],
+)
+def test_decode_record_invalid(data, exception):
+    with pytest.raises(exception):
+        Record(data)
+    with pytest.raises(exception):
+        decode_record(data)
+
+
+def test_read_control_number(stub_record):
+    assert read_control_number(stub_record.as_marc21()) == "on1381158740"
+    stub_record.remove_fields("001")
+    assert read_control_number(stub_record.as_marc21()) is None
+
+
+def test_read_008_error(stub_record):
+    assert read_008_error(stub_record.as_marc21()) is None
+    data = b"abc" + stub_record.as_marc21()
+    with memoryview(data) as view:
+        assert read_008_error(view[3:]) is None
+    stub_record.leader = stub_record.leader[:6] + "g" + stub_record.leader[7:]
+    assert read_008_error(stub_record.as_marc21()) == 18
+    stub_record["008"].data = stub_record["008"].data[:-1] + "!"
+    assert read_008_error(stub_record.as_marc21()) == 18
+    stub_record.leader = stub_record.leader[:6] + "a" + stub_record.leader[7:]
+    assert read_008_error(stub_record.as_marc21()) == 39
+    stub_record["008"].data = stub_record["008"].data[:20]
+    assert read_008_error(stub_record.as_marc21()) == 20
+    stub_record.remove_fields("008")
+    assert read_008_error(stub_record.as_marc21()) is None
+    with pytest.raises(RecordLeaderInvalid):
+        read_008_error(b"foo")
+
+
+class TestPrecheck:
+    def test_precheck_valid(self, stub_record):
+        assert precheck(stub_record.as_marc21()) == []
+
+    def test_precheck_pamphlet(self, stub_pamphlet_record):
+        assert precheck(stub_pamphlet_record.as_marc21()) == []
+
+    @pytest.mark.parametrize(
+        "record_type, expected",
+        [
+            ("evp_monograph", ["Field required: 852", "Field required: 949"]),
+            ("evp_other", []),
+        ],
+    )
+    def test_precheck_record_type(self, stub_pamphlet_record, record_type, expected):
+        errors = precheck(stub_pamphlet_record.as_marc21(), record_type=record_type)
+        assert [str(i["type"]) for i in errors] == expected
+
+    def test_precheck_errors(self, stub_record):
+        stub_record.remove_fields("980")
+        stub_record.add_field(stub_record["960"])
+        errors = precheck(stub_record.as_marc21())
+        assert [(i["type"].type, i["input"]) for i in errors] == [
+            ("extra_forbidden", "960"),
+            ("missing", "980"),
+        ]
+
+    @pytest.mark.parametrize("tags", [["980"], ["949"], ["852", "001"], ["901"]])
+    def test_precheck_matches_validate_fields(self, stub_record, tags):
+        stub_record.remove_fields(*tags)
+        record_type = get_record_type(stub_record.fields)
+        expected = validate_fields(stub_record.fields, record_type=record_type)
+        errors = precheck(stub_record.as_marc21())
+        assert [str(i["type"]) for i in errors] == [str(i["type"]) for i in expected]
+        assert [i["input"] for i in errors] == [i["input"] for i in expected]
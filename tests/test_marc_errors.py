@@ -1,9 +1,13 @@
+import pickle
+
 import pytest
 from pydantic import ValidationError
 
 from record_validator.marc_errors import (
+    _UNSET,
     MarcError,
     MarcValidationError,
+    get_examples_index,
     get_field_examples,
 )
 from record_validator.marc_models import RecordModel
@@ -219,6 +223,26 @@ def test_get_field_examples(field, examples):
     assert get_field_examples(field) == examples
 
 
+def test_get_field_examples_no_examples():
+    assert get_field_examples(("fields", "949", "message")) is None
+
+
+@pytest.mark.parametrize(
+    "by_alias, key, examples",
+    [
+        (True, ("960", "subfields.s"), ["100", "200"]),
+        (False, ("960", "order_price"), ["100", "200"]),
+        (False, ("001", "value"), ["ocn123456789", "ocm123456789"]),
+        (True, ("949", "subfields.z"), ["8528"]),
+    ],
+)
+def test_get_examples_index(by_alias, key, examples):
+    index = get_examples_index(by_alias)
+    assert index[key] == examples
+    assert ("960", "order_location") not in index
+    assert get_examples_index(by_alias) is index
+
+
 class TestMarcErrorMonograph:
     def test_MarcError_string_pattern(self, stub_record):
         stub_record["852"].delete_subfield("h")
@@ -722,6 +746,19 @@ class TestMarcValidationErrorMonograph:
         assert len(errors["extra_fields"]) == 0
         assert len(errors["order_item_mismatches"]) == 0
 
+    def test_MarcValidationError_leader_position(self, stub_record):
+        with pytest.raises(ValidationError) as e:
+            RecordModel(leader="00454cam a22001575i 450x", fields=stub_record.fields)
+        error = MarcValidationError(e.value.errors())
+        assert error.errors[0].msg == "Invalid character at position 23, expected [0]"
+        assert error.to_dict()["invalid_fields"] == [
+            {
+                "error_type": "Invalid character at position 23, expected [0]",
+                "field": "leader",
+                "input": "00454cam a22001575i 450x",
+            }
+        ]
+
     def test_MarcValidationError_extra_fields(self, stub_record):
         record_dict = stub_record.as_dict()
         record_dict["fields"].append(
@@ -884,3 +921,88 @@ class TestMarcValidationErrorOther:
         ]
         assert errors["extra_fields"] == ["852"]
         assert errors["order_item_mismatches"] == []
+
+
+class TestMarcValidationErrorTruncated:
+    def test_MarcValidationError_not_truncated(self, stub_record):
+        stub_record.remove_fields("980", "910")
+        with pytest.raises(ValidationError) as e:
+            RecordModel(leader=stub_record.leader, fields=stub_record.fields)
+        errors = MarcValidationError(e.value.errors())
+        assert errors.truncated is False
+        assert errors.to_dict()["truncated"] is False
+
+    def test_MarcValidationError_truncated(self, stub_record):
+        stub_record.remove_fields("980", "910")
+        with pytest.raises(ValidationError) as e:
+            RecordModel.model_validate(
+                {"leader": stub_record.leader, "fields": stub_record.fields},
+                context={"max_errors": 1},
+            )
+        errors = MarcValidationError(e.value.errors())
+        assert errors.truncated is True
+        assert errors.error_count == 1
+        assert errors.missing_fields == ["910"]
+        assert errors.invalid_fields == []
+        assert errors.to_dict()["truncated"] is True
+
+
+class TestLazyErrors:
+    @pytest.fixture
+    def stub_errors(self, stub_record):
+        stub_record.remove_fields("980")
+        stub_record["960"].delete_subfield("t")
+        stub_record["960"].add_subfield("t", "foo")
+        stub_record.add_field(stub_record["901"])
+        with pytest.raises(ValidationError) as e:
+            RecordModel(leader=stub_record.leader, fields=stub_record.fields)
+        return e.value.errors()
+
+    def test_MarcError_lazy(self, stub_errors):
+        error = MarcError(stub_errors[-1])
+        assert not hasattr(error, "__dict__")
+        assert [error._input, error._loc, error._loc_marc, error._msg] == [_UNSET] * 4
+        assert error.loc_marc == "960$t"
+        assert error._msg is _UNSET
+        assert error.msg == error.msg
+        assert error._msg is not _UNSET
+
+    def test_MarcValidationError_lazy(self, stub_errors):
+        errors = MarcValidationError(stub_errors)
+        assert not hasattr(errors, "__dict__")
+        assert errors.error_count == 3
+        assert errors._errors is None
+        assert errors.extra_fields == ["901"]
+        assert errors.missing_fields == ["980"]
+        assert errors._invalid_fields is None
+        assert errors.invalid_fields[0]["field"] == "960$t"
+        assert errors.invalid_fields is errors.invalid_fields
+        assert errors.errors is errors.errors
+
+    def test_MarcValidationError_pickle(self, stub_errors):
+        errors = MarcValidationError(stub_errors)
+        expected = errors.to_dict()
+        assert pickle.loads(pickle.dumps(errors)).to_dict() == expected
+        assert pickle.loads(
+            pickle.dumps(MarcValidationError(stub_errors))
+        ).to_dict() == (expected)
+
+    def test_MarcValidationError_from_iter(self, stub_errors):
+        errors = MarcValidationError.from_iter(iter(stub_errors))
+        assert errors.to_dict() == MarcValidationError(stub_errors).to_dict()
+        assert [i.loc for i in errors.errors] == [
+            i.loc for i in MarcValidationError(stub_errors).errors
+        ]
+        assert errors._categories is not None
+
+    def test_MarcValidationError_from_iter_truncated(self, stub_errors):
+        details = stub_errors[:1] + [
+            {"type": "error_budget_exceeded", "loc": (), "msg": "", "input": 1}
+        ]
+        errors = MarcValidationError.from_iter(details)
+        assert errors.error_count == 1
+        assert errors.truncated is True
+        assert errors.to_dict() == MarcValidationError(details).to_dict()
+
+    def test_MarcValidationError_from_iter_empty(self):
+        assert MarcValidationError.from_iter(iter([])) is None
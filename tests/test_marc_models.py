@@ -4,7 +4,13 @@ import pytest
 from pydantic import ValidationError
 from pymarc import Leader, MARCReader
 
-from record_validator.marc_models import RecordModel
+from record_validator.cache import FieldCache
+from record_validator.marc_models import (
+    RecordModel,
+    get_record_errors,
+    is_valid,
+    iter_record_errors,
+)
 
 
 class TestRecordModelMonograph:
@@ -12,7 +18,7 @@ class TestRecordModelMonograph:
         model = RecordModel(
             leader="00000cam a2200000 a 4500",
             fields=[
-                {"008": "200101s2001    xx      b    000 0 eng  d"},
+                {"008": "200101s2001    xx      b     000 0 eng d"},
                 {
                     "050": {
                         "ind1": " ",
@@ -242,6 +248,46 @@ class TestRecordModelMonograph:
         assert len(e.value.errors()) == 1
         assert e.value.errors()[0]["type"] == leader_error
 
+    def test_RecordModel_leader_position(self, stub_record):
+        record_dict = stub_record.as_dict()
+        record_dict["leader"] = "00454cam a22001575i 4501"
+        with pytest.raises(ValidationError) as e:
+            RecordModel(**record_dict)
+        error = e.value.errors()[0]
+        assert error["loc"] == ("leader",)
+        assert error["ctx"]["position"] == 23
+        assert error["msg"] == "Invalid character at position 23, expected [0]"
+
+    def test_RecordModel_008_material_type(self, stub_record):
+        with pytest.raises(ValidationError) as e:
+            RecordModel(leader="00454cgm a22001575i 4500", fields=stub_record.fields)
+        assert len(e.value.errors()) == 1
+        error = e.value.errors()[0]
+        assert error["loc"] == ("fields", "008", "value")
+        assert error["ctx"]["position"] == 18
+        assert error["msg"] == "Invalid character at position 18, expected [\\-0-9n|]"
+
+    @pytest.mark.parametrize("engine", ["pydantic", "rules"])
+    def test_RecordModel_008_position(self, stub_record, engine):
+        stub_record["008"].data = stub_record["008"].data[:-1] + "!"
+        with pytest.raises(ValidationError) as e:
+            RecordModel.model_validate(
+                {"leader": stub_record.leader, "fields": stub_record.fields},
+                context={"engine": engine},
+            )
+        assert len(e.value.errors()) == 1
+        error = e.value.errors()[0]
+        assert error["loc"] == ("fields", "008", "value")
+        assert error["msg"] == "Invalid character at position 39, expected [ cdu|]"
+        assert (
+            error == get_record_errors(str(stub_record.leader), stub_record.fields)[0]
+        )
+
+    def test_RecordModel_008_invalid_leader(self, stub_record):
+        with pytest.raises(ValidationError) as e:
+            RecordModel(leader="00454cgm a22001575i 4501", fields=stub_record.fields)
+        assert [i["loc"] for i in e.value.errors()] == [("leader",)]
+
     @pytest.mark.parametrize(
         "fields_value",
         [{}, None],
@@ -348,7 +394,7 @@ class TestRecordModelPamphlet:
         model = RecordModel(
             leader="00000cam a2200000 a 4500",
             fields=[
-                {"008": "200101s2001    xx      b    000 0 eng  d"},
+                {"008": "200101s2001    xx      b     000 0 eng d"},
                 {
                     "050": {
                         "ind1": " ",
@@ -410,7 +456,7 @@ class TestRecordModelPamphlet:
         record_dict = {
             "leader": "00000cam a2200000 a 4500",
             "fields": [
-                {"008": "200101s2001    xx      b    000 0 eng  d"},
+                {"008": "200101s2001    xx      b     000 0 eng d"},
                 {
                     "050": {
                         "ind1": " ",
@@ -517,3 +563,90 @@ class TestRecordModelPamphlet:
             RecordModel(**record_dict)
         assert len(e.value.errors()) == 2
         assert e.value.errors()[0]["type"] == "list_type"
+
+
+class TestIsValid:
+    def test_is_valid(self, stub_record):
+        assert is_valid(stub_record) is True
+        assert is_valid(stub_record, cache=FieldCache()) is True
+
+    def test_is_valid_dict(self, stub_record):
+        record = {"leader": str(stub_record.leader), **stub_record.as_dict()}
+        assert is_valid(record) is True
+        record["fields"] = record["fields"][1:] + [{"980": "foo"}]
+        assert is_valid(record) is False
+
+    def test_is_valid_invalid_leader(self, stub_record):
+        stub_record.leader = Leader("00454cam a22001575i 4501")
+        assert is_valid(stub_record) is False
+
+    def test_is_valid_008_material_type(self, stub_record):
+        stub_record.leader = Leader("00454cgm a22001575i 4500")
+        assert is_valid(stub_record) is False
+
+    def test_is_valid_invalid_fields(self, stub_record):
+        assert is_valid({"leader": str(stub_record.leader), "fields": "foo"}) is False
+        assert is_valid({"leader": str(stub_record.leader)}) is False
+
+    @pytest.mark.parametrize("tag", ["960", "980", "949"])
+    def test_is_valid_matches_RecordModel(self, stub_record, tag):
+        stub_record[tag].add_subfield("a", "foo")
+        try:
+            RecordModel(leader=stub_record.leader, fields=stub_record.fields)
+            expected = True
+        except ValidationError:
+            expected = False
+        assert is_valid(stub_record) is expected
+
+
+class TestGetRecordErrors:
+    def _model_errors(self, leader, fields, **context):
+        try:
+            RecordModel.model_validate(
+                {"leader": leader, "fields": fields}, context=context
+            )
+        except ValidationError as e:
+            return e.errors()
+        return []
+
+    def test_get_record_errors_valid(self, stub_record):
+        assert get_record_errors(str(stub_record.leader), stub_record.fields) == []
+
+    @pytest.mark.parametrize("as_dict", [True, False])
+    def test_get_record_errors_matches_RecordModel(self, stub_record, as_dict):
+        stub_record.remove_fields("980")
+        stub_record["960"].add_subfield("t", "foo")
+        leader = "x" + str(stub_record.leader)[1:]
+        fields = stub_record.as_dict()["fields"] if as_dict else stub_record.fields
+        errors = get_record_errors(leader, fields)
+        assert errors == self._model_errors(leader, fields)
+        assert errors[0]["loc"] == ("leader",)
+        assert errors[1]["loc"] == ("fields",)
+
+    @pytest.mark.parametrize(
+        "leader", ["00454cgm a22001575i 4500", "00454cgm a22001575i 4501"]
+    )
+    @pytest.mark.parametrize("engine", ["pydantic", "rules"])
+    def test_get_record_errors_008_matches_RecordModel(
+        self, stub_record, leader, engine
+    ):
+        errors = get_record_errors(leader, stub_record.fields, engine=engine)
+        assert errors == self._model_errors(leader, stub_record.fields, engine=engine)
+        assert len(errors) == 1
+
+    def test_get_record_errors_max_errors(self, stub_record):
+        stub_record.remove_fields("980", "960")
+        leader, fields = str(stub_record.leader), stub_record.fields
+        errors = get_record_errors(leader, fields, max_errors=1, engine="rules")
+        assert errors == self._model_errors(
+            leader, fields, max_errors=1, engine="rules"
+        )
+        assert [i["type"] for i in errors] == ["missing", "error_budget_exceeded"]
+
+    @pytest.mark.parametrize("max_errors", [None, 1])
+    def test_iter_record_errors(self, stub_record, max_errors):
+        stub_record.remove_fields("980", "960")
+        leader, fields = "x" + str(stub_record.leader)[1:], stub_record.fields
+        errors = iter_record_errors(leader, fields, max_errors=max_errors)
+        assert list(errors) == get_record_errors(leader, fields, max_errors=max_errors)
+        assert next(iter_record_errors(leader, fields))["loc"] == ("leader",)
@@ -0,0 +1,86 @@
+import io
+from xml.etree import ElementTree
+
+import pytest
+from pymarc import record_to_xml
+
+from record_validator.marcxml import element_to_fields, read_records
+from record_validator.utils import field2dict
+from tests.conftest import marcxml_collection
+
+
+def test_read_records(stub_record):
+    results = list(
+        read_records(io.BytesIO(marcxml_collection(stub_record, stub_record)))
+    )
+    assert len(results) == 2
+    leader, fields, exception = results[0]
+    assert leader == str(stub_record.leader)
+    assert fields == [field2dict(i) for i in stub_record.fields]
+    assert exception is None
+
+
+def test_read_records_path(stub_record, tmp_path):
+    path = tmp_path / "records.xml"
+    path.write_bytes(marcxml_collection(stub_record))
+    assert len(list(read_records(str(path)))) == 1
+
+
+def test_read_records_single_record(stub_record):
+    data = record_to_xml(stub_record, namespace=True)
+    ((leader, fields, exception),) = list(read_records(io.BytesIO(data)))
+    assert fields == [field2dict(i) for i in stub_record.fields]
+
+
+def test_read_records_clears_elements(stub_record, monkeypatch):
+    elements = []
+    iterparse = ElementTree.iterparse
+
+    def capture(source, events):
+        for event, element in iterparse(source, events=events):
+            elements.append(element)
+            yield event, element
+
+    monkeypatch.setattr(ElementTree, "iterparse", capture)
+    records = read_records(io.BytesIO(marcxml_collection(*[stub_record] * 3)))
+    next(records)
+    record = next(i for i in elements if i.tag.endswith("record"))
+    assert len(record) > 0
+    assert len(list(records)) == 2
+    assert len(elements[0]) == 0
+    assert len(record) == 0
+
+
+def test_read_records_missing_tag():
+    data = (
+        b"<collection><record><leader>00000cam a2200000 a 4500</leader>"
+        b'<datafield ind1=" " ind2=" "><subfield code="a">foo</subfield></datafield>'
+        b"</record><record><controlfield tag='001'>1</controlfield></record>"
+        b"</collection>"
+    )
+    results = list(read_records(io.BytesIO(data)))
+    assert results[0] == (None, [], results[0][2])
+    assert isinstance(results[0][2], KeyError)
+    assert results[1] == (None, [{"001": "1"}], None)
+
+
+def test_read_records_not_well_formed(stub_record):
+    data = marcxml_collection(stub_record, stub_record)[:-50]
+    records = read_records(io.BytesIO(data))
+    assert next(records)[2] is None
+    with pytest.raises(ElementTree.ParseError):
+        next(records)
+
+
+def test_element_to_fields():
+    record = ElementTree.fromstring(
+        "<record><leader/><controlfield tag='001'/>"
+        "<datafield tag='245'><subfield code='a'/><foo/></datafield><bar/></record>"
+    )
+    assert element_to_fields(record) == (
+        "",
+        [
+            {"001": ""},
+            {"245": {"ind1": " ", "ind2": " ", "subfields": [{"a": ""}]}},
+        ],
+    )
@@ -0,0 +1,45 @@
+import io
+import json
+
+import pytest
+
+from record_validator.ndjson import annotate_line, read_records
+
+
+def test_read_records(stub_record):
+    line = json.dumps(stub_record.as_dict()).encode() + b"\n"
+    stream = io.BytesIO(line + b"\n" + line.rstrip())
+    results = list(read_records(stream))
+    assert [i[0] for i in results] == [0, len(line) + 1]
+    assert [i[1] for i in results] == [line, line.rstrip()]
+    assert results[0][2] == stub_record.as_dict()
+    assert results[0][3] is None
+
+
+@pytest.mark.parametrize(
+    "line, error",
+    [
+        (b'{"leader": \n', "JSONDecodeError"),
+        (b"[1, 2]\n", "ValueError"),
+        (b"\xff\n", "UnicodeDecodeError"),
+    ],
+)
+def test_read_records_errors(line, error):
+    results = list(read_records(io.BytesIO(line + b'{"fields": []}\n')))
+    assert results[0][2] is None
+    assert results[0][3].__class__.__name__ == error
+    assert results[1][2:] == ({"fields": []}, None)
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        (b'{"leader": "foo"}\n', {"leader": "foo", "valid": True}),
+        (b'{"leader": "foo"} \r\n', {"leader": "foo", "valid": True}),
+        (b"{ }", {"valid": True}),
+    ],
+)
+def test_annotate_line(line, expected):
+    output = annotate_line(line, "valid", True)
+    assert output.endswith(b"}\n")
+    assert json.loads(output) == expected
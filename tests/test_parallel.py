@@ -0,0 +1,86 @@
+import pytest
+
+from record_validator.parallel import split_file, validate_file_parallel
+from record_validator.streaming import validate_file
+
+
+@pytest.fixture
+def stub_file(stub_file):
+    stub_file.write_bytes(stub_file.read_bytes() * 5)
+    return stub_file
+
+
+@pytest.mark.parametrize("chunk_size", [1, 100, 1000, 100000])
+def test_split_file(stub_file, chunk_size):
+    data = stub_file.read_bytes()
+    ranges = split_file(stub_file, chunk_size=chunk_size)
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == len(data)
+    assert all(i[1] == j[0] for i, j in zip(ranges, ranges[1:]))
+    assert all(data[end - 1 : end] == b"\x1d" for _, end in ranges)
+
+
+def test_split_file_no_terminator(tmp_path):
+    path = tmp_path / "records.mrc"
+    path.write_bytes(b"foo" * 10)
+    assert split_file(path, chunk_size=10) == [(0, 30)]
+
+
+def test_split_file_empty(tmp_path):
+    path = tmp_path / "records.mrc"
+    path.write_bytes(b"")
+    assert split_file(path) == []
+
+
+def test_split_file_invalid_chunk_size(stub_file):
+    with pytest.raises(ValueError):
+        split_file(stub_file, chunk_size=0)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("chunk_size", [1, 2000])
+def test_validate_file_parallel(stub_file, workers, chunk_size):
+    expected = [i.to_dict() for i in validate_file(stub_file)]
+    results = [
+        i.to_dict()
+        for i in validate_file_parallel(
+            stub_file, workers=workers, chunk_size=chunk_size
+        )
+    ]
+    assert len(results) == 15
+    assert results == expected
+
+
+@pytest.mark.parametrize("precheck, deep", [(True, True), (False, False)])
+def test_validate_file_parallel_precheck(stub_file, precheck, deep):
+    expected = [i.to_dict() for i in validate_file(stub_file, deep=deep)]
+    results = [
+        i.to_dict()
+        for i in validate_file_parallel(
+            stub_file, workers=1, chunk_size=2000, precheck=precheck, deep=deep
+        )
+    ]
+    assert results == expected
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_validate_file_parallel_max_file_errors(stub_record, tmp_path, workers):
+    valid = stub_record.as_marc21()
+    stub_record.remove_fields("980", "910")
+    invalid = stub_record.as_marc21()
+    path = tmp_path / "records.mrc"
+    path.write_bytes((valid * 3 + invalid) * 20)
+    results = list(
+        validate_file_parallel(
+            path,
+            workers=workers,
+            chunk_size=len(valid) * 4,
+            max_errors=1,
+            max_file_errors=3,
+        )
+    )
+    assert len(results) == 12
+    assert [i.index for i in results] == list(range(12))
+    assert sum(i.error_count for i in results) == 3
+    assert [i.truncated for i in results] == [False] * 11 + [True]
+    assert results[-1].error.truncated is True
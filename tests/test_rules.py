@@ -0,0 +1,358 @@
+import copy
+from typing import Annotated, Literal, Optional, Union
+
+import pytest
+from annotated_types import Gt
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    Field,
+    ValidationError,
+    field_validator,
+    model_validator,
+)
+from pymarc import Field as MarcField
+from pymarc import Indicators, Subfield
+
+from benchmarks.generator import RECORD_TYPES, generate_records
+from record_validator.adapters import get_adapter
+from record_validator.base_fields import BaseControlField, BaseDataField
+from record_validator.field_models import (
+    ControlField008,
+    ItemField,
+    LCClass,
+    MonographDataField,
+)
+from record_validator.marc_models import is_valid
+from record_validator.rules import (
+    RuleSet,
+    compile_model,
+    get_rule_set,
+    get_validator,
+)
+from record_validator.streaming import validate_record
+from record_validator.utils import field2dict
+from record_validator.validators import fields_are_valid, validate_all
+
+
+def _adapter_errors(record_type, field):
+    try:
+        get_adapter(record_type).validate_python(field, from_attributes=True)
+    except ValidationError as e:
+        return _comparable(e.errors())
+    return []
+
+
+def _comparable(errors):
+    # exceptions in the context of value errors do not compare equal
+    return [
+        {**i, "ctx": {k: str(v) for k, v in i.get("ctx", {}).items()}} for i in errors
+    ]
+
+
+def _set_subfield(code, value):
+    def mutate(field):
+        field.delete_subfield(code)
+        field.add_subfield(code, value)
+
+    return mutate
+
+
+FIELD_MUTATIONS = [
+    lambda field: None,
+    lambda field: setattr(field, "indicators", Indicators("1", "4")),
+    lambda field: setattr(field, "indicators", Indicators("xx", "")),
+    lambda field: setattr(field, "indicators", Indicators("0", "11")),
+    lambda field: field.subfields.clear(),
+    lambda field: field.subfields.pop(0),
+    lambda field: field.subfields.pop(),
+    lambda field: field.subfields.reverse(),
+    _set_subfield("a", "ReCAP 24-12345"),
+    _set_subfield("a", "ReCAP 24-1234567"),
+    _set_subfield("a", "ReCAP 24-12345x"),
+    _set_subfield("h", "ReCAP 24-"),
+    _set_subfield("h", "4"),
+    _set_subfield("i", "123"),
+    _set_subfield("l", "rc2ma"),
+    _set_subfield("l", "foo"),
+    _set_subfield("p", "1.0"),
+    _set_subfield("s", "1"),
+    _set_subfield("t", "MAL"),
+    _set_subfield("t", "foo"),
+    _set_subfield("v", "BAR"),
+    _set_subfield("z", ""),
+    lambda field: field.add_subfield("a", "second"),
+]
+
+CONTROL_MUTATIONS = [
+    lambda field: None,
+    lambda field: setattr(field, "data", ""),
+    lambda field: setattr(field, "data", "2024"),
+    lambda field: setattr(field, "data", "20240101125000.00"),
+    lambda field: setattr(field, "data", "2024010112500a.0"),
+    lambda field: setattr(field, "data", "x" * 40),
+    lambda field: setattr(field, "data", "X" * 40),
+    lambda field: setattr(field, "data", "210505s2021    nyu     z     000 0 eng d"),
+]
+
+
+@pytest.mark.parametrize("record_type", ["evp_monograph", "evp_other", "auxam_other"])
+@pytest.mark.parametrize("as_dict", [True, False])
+def test_rule_set_matches_adapter(stub_record, record_type, as_dict):
+    rule_set = get_rule_set(record_type)
+    stub_record.add_field(MarcField(tag="007", data="cr |||||||||||"))
+    stub_record.add_field(MarcField(tag="006", data="b|||||||||||||||||"))
+    stub_record.add_field(
+        MarcField(tag="990", indicators=[" ", " "], subfields=[Subfield("a", "b")])
+    )
+    for original in stub_record.fields:
+        mutations = (
+            CONTROL_MUTATIONS if original.is_control_field() else FIELD_MUTATIONS
+        )
+        for mutate in mutations:
+            field = copy.deepcopy(original)
+            mutate(field)
+            if as_dict:
+                field = field2dict(field)
+            assert _comparable(rule_set.errors(field)) == _adapter_errors(
+                record_type, field
+            )
+
+
+@pytest.mark.parametrize("record_type", RECORD_TYPES)
+def test_rule_set_matches_adapter_generated(record_type):
+    rule_set = get_rule_set(record_type)
+    for record in generate_records(record_type, 20, error_rate=1.0, seed=1):
+        for field in record.fields:
+            assert _comparable(rule_set.errors(field)) == _adapter_errors(
+                record_type, field
+            )
+
+
+@pytest.mark.parametrize(
+    "field",
+    [
+        {"960": {"ind1": " ", "ind2": " ", "subfields": [{"s": 100}]}},
+        {"960": {"ind1": None, "ind2": " ", "subfields": [{"s": "100"}]}},
+        {"960": {"ind1": " ", "ind2": " ", "subfields": ["s"]}},
+        {"960": {"ind1": " ", "ind2": " ", "subfields": "s"}},
+        {"960": {"ind1": " ", "subfields": []}},
+        {"960": "foo"},
+        {"tag": "960", "ind1": " ", "ind2": " ", "subfields": []},
+        {"005": 20240101125000.0},
+        {"005": {"value": "20240101125000.0"}},
+        {"005": "20240101125000.0", "006": "b"},
+        {"300": {"ind1": " ", "ind2": " ", "subfields": [{"a": "1 p."}]}},
+        MarcField(tag="005"),
+        MarcField(tag="960", indicators=[" ", " "], subfields=[Subfield("s", 1.0)]),
+        MarcField(tag="960", indicators=[" ", " "], subfields=[Subfield(1, "s")]),
+    ],
+)
+def test_rule_set_falls_back_to_adapter(field):
+    rule_set = get_rule_set("evp_monograph")
+    assert _comparable(rule_set.errors(field)) == _adapter_errors(
+        "evp_monograph", field
+    )
+
+
+@pytest.mark.parametrize("record_type", ["evp_monograph", "evp_other"])
+@pytest.mark.parametrize("tag", ["009", "850", "852", "949", "999", "09a", "x50"])
+def test_rule_set_data_field_tags(record_type, tag):
+    field = {tag: {"ind1": " ", "ind2": " ", "subfields": [{"a": "foo"}]}}
+    assert _comparable(get_rule_set(record_type).errors(field)) == _adapter_errors(
+        record_type, field
+    )
+
+
+@pytest.mark.parametrize("field", [{}, "960"])
+def test_rule_set_falls_back_to_adapter_exception(field):
+    with pytest.raises(Exception) as expected:
+        get_adapter("evp_monograph").validate_python(field, from_attributes=True)
+    with pytest.raises(expected.type):
+        get_rule_set("evp_monograph").errors(field)
+
+
+def test_rule_set_control_field_as_data_field():
+    field = MarcField(tag="960", indicators=[" ", " "], subfields=[])
+    rule_set = get_rule_set("evp_monograph")
+    assert rule_set.models["005"].errors("005", field) is None
+    assert rule_set.models["960"].errors("960", MarcField("001", data="1")) is None
+
+
+def test_rule_set_field_list():
+    rule_set = get_rule_set(None)
+    assert rule_set.models == {}
+    assert rule_set.adapter is get_adapter(None)
+    assert rule_set.errors(MarcField(tag="001", data="1")) == []
+
+
+def test_get_rule_set_is_cached():
+    assert get_rule_set("evp_monograph") is get_rule_set("leila_monograph")
+    assert get_rule_set("evp_other") is not get_rule_set("auxam_other")
+    assert isinstance(get_rule_set("evp_other"), RuleSet)
+
+
+def test_get_validator():
+    assert get_validator("evp_monograph") is get_adapter("evp_monograph")
+    assert get_validator("evp_monograph", "rules") is get_rule_set("evp_monograph")
+    with pytest.raises(ValueError) as exc:
+        get_validator("evp_monograph", "foo")
+    assert "Unknown engine: foo" in str(exc.value)
+
+
+def test_rule_set_validate_python(stub_record):
+    rule_set = get_rule_set("evp_monograph")
+    assert rule_set.validate_python(stub_record["960"]) is stub_record["960"]
+    stub_record["960"].delete_subfield("t")
+    with pytest.raises(ValidationError) as exc:
+        rule_set.validate_python(stub_record["960"])
+    assert exc.value.errors()[0]["loc"] == ("960", "order_location")
+
+
+class TestCompileModel:
+    def test_compile_model(self):
+        compiled = compile_model(ItemField)
+        assert compiled is not None
+        assert [i.name for i in compiled.rules][:4] == ["tag", "ind1", "ind2"] + [
+            "item_call_no"
+        ]
+        assert compiled.rules[3].source == "a"
+        assert compiled.rules[3].required is True
+        assert compiled.defaults["item_type"] is None
+        assert len(compiled.validators) == 1
+        assert compile_model(LCClass).validators[0].__name__ == (
+            "validate_indicator_pair"
+        )
+
+    def test_compile_model_after_validator(self):
+        compiled = compile_model(ControlField008)
+        assert compiled is not None
+        errors = compiled.rules[1].errors("x" * 40, ("008",))
+        assert [(i["type"].type, i["ctx"]["position"]) for i in errors] == [
+            ("string_pattern_mismatch", 0)
+        ]
+
+    def test_compile_model_union_labels(self):
+        compiled = compile_model(MonographDataField)
+        assert [i[0] for i in compiled.rules[1].branches] == [
+            "literal['',' ']",
+            "constrained-str",
+        ]
+
+    def test_compile_model_str_unions(self):
+        class UnionField(BaseDataField):
+            ind1: Union[Literal["a"], str]
+            ind2: Union[Literal["a"], Annotated[str, Field(pattern="a")]]
+            item_type: Union[Literal["a"], Annotated[str, Field(description="b")]]
+
+        compiled = compile_model(UnionField)
+        assert [i[0] for i in compiled.rules[1].branches] == ["literal['a']", "str"]
+        assert [i[0] for i in compiled.rules[2].branches] == [
+            "literal['a']",
+            "constrained-str",
+        ]
+        assert [i[0] for i in compiled.rules[3].branches] == ["literal['a']", "str"]
+
+    def test_compile_model_not_a_field(self):
+        class NotAField(BaseModel):
+            tag: str
+
+        assert compile_model(NotAField) is None
+
+    @pytest.mark.parametrize(
+        "annotation",
+        [
+            int,
+            Literal[1],
+            Annotated[Literal["a"], Field(min_length=1)],
+            Annotated[str, Gt(1)],
+            Annotated[str, Field(strict=True)],
+            Annotated[str, AfterValidator(str.strip)],
+            Union[Literal["a"], int],
+        ],
+    )
+    def test_compile_model_unsupported_constraint(self, annotation):
+        class Unsupported(BaseDataField):
+            item_type: annotation  # type: ignore[valid-type]
+
+        assert compile_model(Unsupported) is None
+
+    def test_compile_model_union_with_metadata(self):
+        class Unsupported(BaseDataField):
+            item_type: Annotated[Union[Literal["a"], str], Field(min_length=1)]
+
+        assert compile_model(Unsupported) is None
+
+    def test_compile_model_annotated_metadata(self):
+        class Unsupported(BaseControlField):
+            value: Optional[Annotated[str, Gt(1)]] = None
+
+        assert compile_model(Unsupported) is None
+
+    def test_compile_model_no_alias(self):
+        class Unsupported(BaseDataField):
+            foo: str
+
+        assert compile_model(Unsupported) is None
+
+    def test_compile_model_field_validator(self):
+        class Unsupported(BaseDataField):
+            @field_validator("ind1")
+            @classmethod
+            def check_ind1(cls, value: str) -> str:
+                return value
+
+        assert compile_model(Unsupported) is None
+
+    def test_compile_model_wrap_validator(self):
+        class Unsupported(BaseDataField):
+            @model_validator(mode="wrap")
+            @classmethod
+            def check(cls, value, handler):
+                return handler(value)
+
+        assert compile_model(Unsupported) is None
+
+
+class TestEngine:
+    @pytest.fixture
+    def stub_invalid_record(self, stub_record):
+        stub_record.remove_fields("980")
+        stub_record["960"].delete_subfield("t")
+        stub_record["960"].add_subfield("t", "foo")
+        stub_record["949"].delete_subfield("h")
+        stub_record["050"].indicators = Indicators("1", "4")
+        return stub_record
+
+    def test_validate_all(self, stub_invalid_record):
+        errors = {}
+        for engine in ["pydantic", "rules"]:
+            with pytest.raises(ValidationError) as exc:
+                validate_all(stub_invalid_record.fields, engine=engine)
+            errors[engine] = _comparable(exc.value.errors())
+        assert errors["rules"] == errors["pydantic"]
+
+    def test_validate_all_valid(self, stub_record):
+        assert validate_all(stub_record.fields, engine="rules") == stub_record.fields
+
+    def test_validate_all_unknown_engine(self, stub_record):
+        with pytest.raises(ValueError):
+            validate_all(stub_record.fields, engine="foo")
+
+    def test_fields_are_valid(self, stub_record, stub_invalid_record):
+        assert fields_are_valid(stub_invalid_record.fields, engine="rules") is False
+
+    def test_fields_are_valid_valid(self, stub_record):
+        assert fields_are_valid(stub_record.fields, engine="rules") is True
+
+    def test_is_valid(self, stub_record):
+        assert is_valid(stub_record, engine="rules") is True
+
+    def test_validate_record(self, stub_invalid_record):
+        errors = {
+            engine: validate_record(
+                stub_invalid_record.leader, stub_invalid_record.fields, engine=engine
+            ).to_dict()
+            for engine in ["pydantic", "rules"]
+        }
+        assert errors["rules"] == errors["pydantic"]
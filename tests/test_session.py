@@ -0,0 +1,186 @@
+import copy
+import random
+
+import pytest
+from pymarc import Field as MarcField
+from pymarc import Subfield
+
+from benchmarks.generator import RECORD_TYPES, generate_records
+from record_validator.cache import FieldCache
+from record_validator.session import RecordValidationSession
+from record_validator.streaming import validate_record
+
+
+def _expected(session):
+    error = validate_record(session.leader, session.fields, engine=session.engine)
+    return error.to_dict() if error is not None else None
+
+
+def _actual(error):
+    return error.to_dict() if error is not None else None
+
+
+def _position(session, tag):
+    return [
+        next(iter(i)) if isinstance(i, dict) else i.tag for i in session.fields
+    ].index(tag)
+
+
+def test_session_valid(stub_record):
+    session = RecordValidationSession.from_record(stub_record)
+    assert session.error is None
+    assert session.record_type == "evp_monograph"
+    assert session.fields == stub_record.fields
+    assert session.fields is not stub_record.fields
+
+
+def test_session_dict_fields(stub_record):
+    stub_record.remove_fields("980")
+    session = RecordValidationSession(
+        str(stub_record.leader), stub_record.as_dict()["fields"]
+    )
+    assert session.error.to_dict() == _expected(session)
+    assert session.error.missing_fields == ["980"]
+
+
+@pytest.mark.parametrize("engine", ["pydantic", "rules"])
+def test_session_replace_field(stub_record, engine):
+    session = RecordValidationSession.from_record(stub_record, engine=engine)
+    order = copy.deepcopy(stub_record["960"])
+    order.delete_subfield("t")
+    order.add_subfield("t", "foo")
+    error = session.replace_field(_position(session, "960"), order)
+    assert _actual(error) == _expected(session)
+    assert error.invalid_fields[0]["field"] == "960$t"
+    assert _actual(session.replace_field(-3, session.fields[-3])) == _actual(error)
+    assert session.replace_field(_position(session, "960"), stub_record["960"]) is None
+
+
+def test_session_add_and_remove_field(stub_record):
+    session = RecordValidationSession.from_record(stub_record)
+    error = session.remove_field(_position(session, "980"))
+    assert error.missing_fields == ["980"]
+    assert _actual(error) == _expected(session)
+    error = session.add_field(stub_record["901"], index=0)
+    assert _actual(error) == _expected(session)
+    assert error.extra_fields == ["901"]
+    assert session.remove_field(0).extra_fields == []
+    assert session.add_field(stub_record["980"], index=-100) is None
+    assert session.fields[0] is stub_record["980"]
+
+
+def test_session_index_error(stub_record):
+    session = RecordValidationSession.from_record(stub_record)
+    with pytest.raises(IndexError):
+        session.remove_field(100)
+    with pytest.raises(IndexError):
+        session.replace_field(100, stub_record["980"])
+    assert session.error is None
+
+
+def test_session_record_type_change(stub_record):
+    session = RecordValidationSession.from_record(stub_record)
+    physical_description = MarcField(
+        tag="300",
+        indicators=[" ", " "],
+        subfields=[Subfield(code="a", value="2 volumes")],
+    )
+    error = session.replace_field(_position(session, "300"), physical_description)
+    assert session.record_type == "evp_other"
+    assert _actual(error) == _expected(session)
+    assert error.extra_fields == ["852", "949"]
+    error = session.replace_field(
+        _position(session, "300"), copy.deepcopy(stub_record["300"])
+    )
+    assert session.record_type == "evp_monograph"
+    assert error is None
+
+
+def test_session_record_type_same_adapter(stub_record):
+    session = RecordValidationSession.from_record(stub_record)
+    vendor = copy.deepcopy(stub_record["901"])
+    vendor.delete_subfield("a")
+    vendor.add_subfield("a", "LEILA")
+    item = copy.deepcopy(stub_record["949"])
+    item.delete_subfield("v")
+    item.add_subfield("v", "LEILA")
+    session.replace_field(_position(session, "901"), vendor)
+    error = session.replace_field(_position(session, "949"), item)
+    assert session.record_type == "leila_monograph"
+    assert _actual(error) == _expected(session)
+
+
+def test_session_order_items(stub_record):
+    session = RecordValidationSession.from_record(stub_record)
+    item = copy.deepcopy(stub_record["949"])
+    item.delete_subfield("l")
+    item.add_subfield("l", "rcmb2")
+    error = session.replace_field(_position(session, "949"), item)
+    assert _actual(error) == _expected(session)
+    assert error.order_item_mismatches != []
+    assert session.error.to_dict() == error.to_dict()
+    error = session.add_field(stub_record["960"])
+    assert _actual(error) == _expected(session)
+    assert error.order_item_mismatches == []
+    error = session.remove_field(-1)
+    item.delete_subfield("l")
+    item.add_subfield("l", "foo")
+    error = session.replace_field(_position(session, "949"), item)
+    assert _actual(error) == _expected(session)
+    assert error.order_item_mismatches == []
+
+
+def test_session_set_leader(stub_record):
+    session = RecordValidationSession.from_record(stub_record)
+    error = session.set_leader("00454cam a22001575i 4501")
+    assert error.errors[0].loc == ("leader",)
+    assert _actual(error) == _expected(session)
+    assert session.set_leader(stub_record.leader) is None
+
+
+def test_session_set_leader_008(stub_record):
+    session = RecordValidationSession.from_record(stub_record)
+    error = session.set_leader("00454cgm a22001575i 4500")
+    assert [i.loc for i in error.errors] == [("fields", "008", "value")]
+    assert _actual(error) == _expected(session)
+    error = session.set_leader("00454cgm a22001575i 4501")
+    assert [i.loc for i in error.errors] == [("leader",)]
+    assert _actual(error) == _expected(session)
+
+
+def test_session_008_position(stub_record):
+    session = RecordValidationSession.from_record(stub_record)
+    field = MarcField(tag="008", data=stub_record["008"].data[:-1] + "!")
+    error = session.replace_field(_position(session, "008"), field)
+    assert error.errors[0].msg.startswith("Invalid character at position 39")
+    assert _actual(error) == _expected(session)
+
+
+def test_session_cache(stub_record):
+    cache = FieldCache()
+    session = RecordValidationSession.from_record(stub_record, cache=cache)
+    assert cache.misses == len(stub_record.fields)
+    session.replace_field(0, stub_record.fields[0])
+    assert cache.hits == 1
+    assert session.error is None
+
+
+@pytest.mark.parametrize("record_type", RECORD_TYPES)
+def test_session_matches_RecordModel(record_type):
+    rand = random.Random(0)
+    records = list(generate_records(record_type, 10, error_rate=0.5, seed=1))
+    pool = [i for record in records for i in record.fields]
+    for record in records:
+        session = RecordValidationSession.from_record(record)
+        assert _actual(session.error) == _expected(session)
+        for _ in range(10):
+            edit = rand.choice(["add", "remove", "replace"])
+            position = rand.randrange(len(session.fields))
+            field = copy.deepcopy(rand.choice(pool))
+            if edit == "add":
+                error = session.add_field(field, index=position)
+            elif edit == "remove":
+                error = session.remove_field(position)
+            else:
+                error = session.replace_field(position, field)
+            assert _actual(error) == _expected(session)
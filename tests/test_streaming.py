@@ -0,0 +1,388 @@
+import copy
+import io
+import json
+import re
+
+import pytest
+
+from benchmarks.generator import RECORD_TYPES, generate_records
+from record_validator.cache import FieldCache
+from record_validator.marc_errors import MarcValidationError
+from record_validator.streaming import (
+    RecordResult,
+    validate_bytes,
+    validate_file,
+    validate_marcxml,
+    validate_ndjson,
+    validate_record,
+    write_ndjson,
+)
+from tests.conftest import marcxml_collection
+
+
+def test_validate_record_valid(stub_record):
+    assert validate_record(stub_record.leader, stub_record.fields) is None
+
+
+def test_validate_record_invalid(stub_record):
+    stub_record.remove_fields("980")
+    error = validate_record(stub_record.leader, stub_record.as_dict()["fields"])
+    assert isinstance(error, MarcValidationError)
+    assert error.missing_fields == ["980"]
+
+
+def test_RecordResult_to_dict():
+    result = RecordResult(index=1, offset=100, length=50, parse_error="foo")
+    assert result.valid is False
+    assert result.to_dict() == {
+        "index": 1,
+        "offset": 100,
+        "length": 50,
+        "control_number": None,
+        "valid": False,
+        "parse_error": "foo",
+        "errors": None,
+        "truncated": False,
+    }
+    assert result.error_count == 1
+
+
+def test_validate_bytes(stub_record):
+    data = stub_record.as_marc21()
+    with memoryview(data) as view:
+        result = validate_bytes(view[:], index=3, offset=10)
+    assert (result.index, result.offset, result.length) == (3, 10, len(data))
+    assert result.valid is True
+    assert validate_bytes(data, deep=False).valid is True
+
+
+@pytest.mark.parametrize("engine", ["pydantic", "rules"])
+@pytest.mark.parametrize("max_errors", [None, 2])
+def test_validate_bytes_raw(stub_record, engine, max_errors):
+    data = [stub_record.as_marc21()]
+    stub_record.remove_fields("980")
+    stub_record["960"].add_subfield("t", "foo")
+    stub_record.leader = "x" + str(stub_record.leader)[1:]
+    data.append(stub_record.as_marc21())
+    for record in data:
+        expected = validate_bytes(record, engine=engine, max_errors=max_errors)
+        result = validate_bytes(
+            record, engine=engine, max_errors=max_errors, decoder="raw"
+        )
+        assert result.to_dict() == expected.to_dict()
+    assert result.valid is False
+
+
+@pytest.mark.parametrize("decoder", ["pymarc", "raw"])
+def test_validate_bytes_008_material_type(stub_record, decoder):
+    stub_record.leader = "00454cgm a22001575i 4500"
+    result = validate_bytes(stub_record.as_marc21(), decoder=decoder)
+    assert result.error.invalid_fields == [
+        {
+            "field": "008",
+            "input": stub_record["008"].data,
+            "error_type": "Invalid character at position 18, expected [\\-0-9n|]. "
+            "Examples: ['210505s2021    nyu           000 0 eng d']",
+        }
+    ]
+
+
+def test_validate_bytes_raw_matches_pymarc_008_position(stub_record):
+    stub_record["008"].data = stub_record["008"].data[:-1] + "!"
+    data = stub_record.as_marc21()
+    expected = validate_bytes(data).to_dict()
+    assert validate_bytes(data, decoder="raw").to_dict() == expected
+    assert expected["errors"]["invalid_fields"][0]["error_type"].startswith(
+        "Invalid character at position 39, expected [ cdu|]. Examples: "
+    )
+
+
+def test_validate_bytes_raw_matches_pymarc_generated():
+    for record_type in RECORD_TYPES:
+        for record in generate_records(record_type, 10, error_rate=1.0, seed=1):
+            data = record.as_marc21()
+            expected = validate_bytes(data).to_dict()
+            assert validate_bytes(data, decoder="raw").to_dict() == expected
+
+
+def test_validate_bytes_raw_parse_error(stub_record):
+    data = stub_record.as_marc21().replace(b"\x1faF00", b"\x1faF0\xff")
+    assert "UnicodeDecodeError" in validate_bytes(data, decoder="raw").parse_error
+    result = validate_bytes(data, decoder="raw", utf8_handling="replace")
+    assert result.parse_error is None
+    assert result.control_number == "on1381158740"
+
+
+def test_validate_bytes_unknown_decoder(stub_record):
+    with pytest.raises(ValueError) as exc:
+        validate_bytes(stub_record.as_marc21(), decoder="foo")
+    assert "Unknown decoder: foo" in str(exc.value)
+
+
+class TestValidateFile:
+    def test_validate_file_stream(self, stub_record):
+        valid = stub_record.as_marc21()
+        stub_record.remove_fields("980")
+        invalid = stub_record.as_marc21()
+        results = list(validate_file(io.BytesIO(valid + invalid)))
+        assert [i.index for i in results] == [0, 1]
+        assert [i.offset for i in results] == [0, len(valid)]
+        assert [i.length for i in results] == [len(valid), len(invalid)]
+        assert [i.control_number for i in results] == ["on1381158740"] * 2
+        assert [i.valid for i in results] == [True, False]
+        assert results[0].error is None
+        assert results[1].error.to_dict()["missing_fields"] == ["980"]
+
+    def test_validate_file_path(self, stub_record, tmp_path):
+        path = tmp_path / "records.mrc"
+        path.write_bytes(stub_record.as_marc21() * 3)
+        results = list(validate_file(path))
+        assert len(results) == 3
+        assert all(i.valid for i in results)
+        results = list(validate_file(str(path)))
+        assert len(results) == 3
+
+    def test_validate_file_lazy(self, stub_record):
+        stream = io.BytesIO(stub_record.as_marc21() * 3)
+        results = validate_file(stream)
+        next(results)
+        assert stream.tell() == len(stub_record.as_marc21())
+
+    def test_validate_file_parse_error(self, stub_record):
+        record = stub_record.as_marc21()
+        bad_length = b"abcde" + record[5:]
+        bad_base_address = record[:12] + b"00000" + record[17:]
+        data = record + bad_length + bad_base_address + record
+        results = list(validate_file(io.BytesIO(data)))
+        assert len(results) == 4
+        assert [i.valid for i in results] == [True, False, False, True]
+        assert results[1].parse_error.startswith("RecordLengthInvalid")
+        assert results[2].parse_error.startswith("BaseAddressNotFound")
+        assert results[1].error is None
+        assert results[3].offset == len(record) * 3
+        assert results[3].control_number == "on1381158740"
+
+    def test_validate_file_no_001(self, stub_record):
+        stub_record.remove_fields("001")
+        results = list(validate_file(io.BytesIO(stub_record.as_marc21())))
+        assert results[0].control_number is None
+        assert results[0].valid is True
+
+    def test_validate_file_precheck(self, stub_record):
+        valid = stub_record.as_marc21()
+        stub_record["960"].delete_subfield("t")
+        bad_order = stub_record.as_marc21()
+        stub_record.remove_fields("980")
+        missing = stub_record.as_marc21()
+        data = valid + bad_order + missing
+        results = list(validate_file(io.BytesIO(data), precheck=True))
+        assert [i.valid for i in results] == [True, False, False]
+        assert results[1].error.to_dict()["missing_fields"] == ["960$t"]
+        assert results[2].error.to_dict()["missing_fields"] == ["980"]
+        assert results[2].error.error_count == 1
+        assert results[2].control_number == "on1381158740"
+        deep = list(validate_file(io.BytesIO(data)))
+        assert deep[2].error.error_count == 2
+
+    def test_validate_file_precheck_only(self, stub_record):
+        valid = stub_record.as_marc21()
+        stub_record["960"].delete_subfield("t")
+        bad_order = stub_record.as_marc21()
+        stub_record.remove_fields("980")
+        missing = stub_record.as_marc21()
+        results = list(
+            validate_file(io.BytesIO(valid + bad_order + missing), deep=False)
+        )
+        assert [i.valid for i in results] == [True, True, False]
+        assert [i.control_number for i in results] == ["on1381158740"] * 3
+
+    def test_validate_file_precheck_parse_error(self, stub_record):
+        record = stub_record.as_marc21()
+        bad_base_address = record[:12] + b"00000" + record[17:]
+        results = list(validate_file(io.BytesIO(bad_base_address), precheck=True))
+        assert results[0].parse_error.startswith("BaseAddressNotFound")
+
+    def test_validate_file_cache(self, stub_record):
+        cache = FieldCache()
+        valid = stub_record.as_marc21()
+        stub_record["960"].delete_subfield("t")
+        stub_record["960"].add_subfield("t", "foo")
+        data = valid + stub_record.as_marc21() * 2
+        expected = [i.to_dict() for i in validate_file(io.BytesIO(data))]
+        results = [i.to_dict() for i in validate_file(io.BytesIO(data), cache=cache)]
+        assert results == expected
+        assert cache.misses == len(stub_record.fields) + 1
+        assert cache.hits == 2 * len(stub_record.fields) - 1
+
+    @pytest.mark.parametrize("precheck", [True, False])
+    def test_validate_file_max_errors(self, stub_record, precheck):
+        stub_record.remove_fields("980", "910")
+        data = io.BytesIO(stub_record.as_marc21() * 2)
+        results = list(validate_file(data, precheck=precheck, max_errors=1))
+        assert len(results) == 2
+        assert all(i.error.error_count == 1 for i in results)
+        assert all(i.error.truncated for i in results)
+        assert not any(i.truncated for i in results)
+
+    @pytest.mark.parametrize(
+        "max_file_errors, expected",
+        [(1, [False, True]), (3, [False, False, False, True]), (4, [False] * 4)],
+    )
+    def test_validate_file_max_file_errors(
+        self, stub_record, max_file_errors, expected
+    ):
+        valid = stub_record.as_marc21()
+        stub_record.remove_fields("980")
+        invalid = stub_record.as_marc21()
+        data = io.BytesIO(valid + invalid + b"abcde\x1d" + invalid)
+        results = list(validate_file(data, max_file_errors=max_file_errors))
+        assert [i.truncated for i in results] == expected
+
+    def test_validate_file_max_file_errors_path(self, stub_record, tmp_path):
+        stub_record.remove_fields("980")
+        path = tmp_path / "records.mrc"
+        path.write_bytes(stub_record.as_marc21() * 5)
+        results = list(validate_file(path, max_file_errors=2))
+        assert len(results) == 2
+        assert results[-1].truncated is True
+
+
+class TestValidateMarcxml:
+    def test_validate_marcxml(self, stub_record):
+        valid = copy.deepcopy(stub_record)
+        stub_record.remove_fields("980")
+        data = marcxml_collection(valid, stub_record)
+        results = list(validate_marcxml(io.BytesIO(data)))
+        assert [i.index for i in results] == [0, 1]
+        assert [i.offset for i in results] == [None, None]
+        assert [i.control_number for i in results] == ["on1381158740"] * 2
+        assert [i.valid for i in results] == [True, False]
+        expected = list(validate_file(io.BytesIO(stub_record.as_marc21())))
+        assert results[1].error.to_dict() == expected[0].error.to_dict()
+
+    def test_validate_marcxml_path(self, stub_record, tmp_path):
+        path = tmp_path / "records.xml"
+        path.write_bytes(marcxml_collection(*[stub_record] * 3))
+        assert [i.valid for i in validate_marcxml(path)] == [True] * 3
+        assert len(list(validate_marcxml(str(path)))) == 3
+
+    def test_validate_marcxml_no_leader(self, stub_record):
+        data = re.sub(rb"<leader>[^<]*</leader>", b"", marcxml_collection(stub_record))
+        (result,) = list(validate_marcxml(io.BytesIO(data)))
+        assert result.parse_error is None
+        assert result.error.invalid_fields == [
+            {"field": "leader", "input": "", "error_type": result.error.errors[0].msg}
+        ]
+
+    def test_validate_marcxml_parse_errors(self, stub_record):
+        data = marcxml_collection(stub_record, stub_record).replace(
+            b' tag="245"', b"", 1
+        )
+        results = list(validate_marcxml(io.BytesIO(data[:-50])))
+        assert len(results) == 2
+        assert results[0].parse_error == "KeyError: 'tag'"
+        assert results[1].parse_error.startswith("ParseError")
+        assert results[1].index == 1
+
+    def test_validate_marcxml_options(self, stub_record):
+        cache = FieldCache()
+        stub_record.remove_fields("980")
+        data = marcxml_collection(*[stub_record] * 3)
+        results = list(
+            validate_marcxml(
+                io.BytesIO(data), cache=cache, max_file_errors=2, engine="rules"
+            )
+        )
+        assert [i.truncated for i in results] == [False, True]
+        assert cache.hits == len(stub_record.fields)
+
+    def test_validate_marcxml_max_errors(self, stub_record):
+        stub_record.remove_fields("980", "910")
+        data = marcxml_collection(*[stub_record] * 2)
+        results = list(validate_marcxml(io.BytesIO(data), max_errors=1))
+        assert all(i.error.error_count == 1 for i in results)
+        assert all(i.error.truncated for i in results)
+
+
+def _ndjson(*records):
+    return b"".join(json.dumps(i.as_dict()).encode() + b"\n" for i in records)
+
+
+class TestValidateNdjson:
+    def test_validate_ndjson(self, stub_record):
+        valid = _ndjson(stub_record)
+        stub_record.remove_fields("980")
+        data = valid + b"foo\n" + _ndjson(stub_record)
+        results = list(validate_ndjson(io.BytesIO(data)))
+        assert [i.index for i in results] == [0, 1, 2]
+        assert [i.offset for i in results] == [0, len(valid), len(valid) + 4]
+        assert [i.length for i in results] == [
+            len(valid),
+            4,
+            len(data) - len(valid) - 4,
+        ]
+        assert [i.control_number for i in results] == ["on1381158740", None] * 1 + [
+            "on1381158740"
+        ]
+        assert [i.valid for i in results] == [True, False, False]
+        assert results[1].parse_error.startswith("JSONDecodeError")
+        expected = list(validate_file(io.BytesIO(stub_record.as_marc21())))
+        assert results[2].error.to_dict() == expected[0].error.to_dict()
+
+    def test_validate_ndjson_path(self, stub_record, tmp_path):
+        path = tmp_path / "records.json"
+        path.write_bytes(_ndjson(*[stub_record] * 3))
+        assert [i.valid for i in validate_ndjson(path)] == [True] * 3
+        assert len(list(validate_ndjson(str(path)))) == 3
+
+    def test_validate_ndjson_no_fields(self):
+        (result,) = list(validate_ndjson(io.BytesIO(b'{"leader": "foo"}')))
+        assert result.control_number is None
+        assert result.valid is False
+        assert result.error.missing_fields != []
+
+    def test_validate_ndjson_no_leader(self, stub_record):
+        record = {"fields": stub_record.as_dict()["fields"]}
+        (result,) = list(validate_ndjson(io.BytesIO(json.dumps(record).encode())))
+        assert [i["input"] for i in result.error.invalid_fields] == [""]
+
+    def test_validate_ndjson_options(self, stub_record):
+        cache = FieldCache()
+        stub_record.remove_fields("980", "910")
+        data = _ndjson(*[stub_record] * 3)
+        results = list(
+            validate_ndjson(
+                io.BytesIO(data),
+                cache=cache,
+                max_errors=1,
+                max_file_errors=2,
+                engine="rules",
+            )
+        )
+        assert [i.truncated for i in results] == [False, True]
+        assert all(i.error.truncated for i in results)
+
+    def test_write_ndjson(self, stub_record, tmp_path):
+        valid = _ndjson(stub_record)
+        stub_record.remove_fields("980")
+        path = tmp_path / "records.json"
+        path.write_bytes(valid + b"[]\n" + _ndjson(stub_record))
+        output = io.BytesIO()
+        write_ndjson(path, output, engine="rules")
+        lines = [json.loads(i) for i in output.getvalue().splitlines()]
+        assert len(lines) == 3
+        assert lines[0]["fields"] == json.loads(valid)["fields"]
+        assert lines[0]["validation"] == {
+            "valid": True,
+            "parse_error": None,
+            "errors": None,
+        }
+        assert lines[1] == {
+            "validation": {
+                "valid": False,
+                "parse_error": "ValueError: Expected a JSON object",
+                "errors": None,
+            }
+        }
+        assert lines[2]["leader"] == str(stub_record.leader)
+        assert lines[2]["validation"]["errors"]["missing_fields"] == ["980"]
@@ -1,9 +1,11 @@
 import pytest
 
 from record_validator.utils import (
+    NormalizedRecord,
     dict2subfield,
     field2dict,
     get_record_type,
+    normalize_record,
 )
 
 
@@ -28,6 +30,11 @@ def test_dict2subfield_test():
     assert dict2subfield(field, "h") == ["ReCAP 24-100000"]
 
 
+def test_dict2subfield_missing_code():
+    field = {"852": {"ind1": "8", "ind2": " ", "subfields": [{"h": "ReCAP 24-100000"}]}}
+    assert dict2subfield(field, "a") == [None]
+
+
 def test_field2dict_marc(stub_record):
     fields = stub_record.fields
     assert len([field2dict(i) for i in fields]) == len(fields)
@@ -41,6 +48,13 @@ def test_field2dict_pymarc_dict(stub_record):
     assert field2dict(fields[0]) == {"001": "on1381158740"}
 
 
+def test_field2dict_returns_dicts_in_format(stub_record):
+    for field in stub_record.as_dict()["fields"]:
+        assert field2dict(field) is field
+    field = {"300": {"ind1": " ", "ind2": " ", "subfields": [], "foo": "bar"}}
+    assert field2dict(field) == {"300": {"ind1": " ", "ind2": " ", "subfields": []}}
+
+
 def test_field2dict_dict():
     fields = [
         {"tag": "001", "value": "on1381158740"},
@@ -84,3 +98,51 @@ def test_get_record_type_bad_input():
 def test_get_record_type_dict(stub_record):
     record_dict = stub_record.as_dict()
     assert get_record_type(fields=record_dict["fields"]) == "evp_monograph"
+
+
+class TestNormalizedRecord:
+    def test_tags(self, stub_record_multiple_items):
+        record = NormalizedRecord(stub_record_multiple_items.fields)
+        assert record.fields is stub_record_multiple_items.fields
+        assert record.tags == [i.tag for i in stub_record_multiple_items.fields]
+        assert record.tag_counts["949"] == 2
+        assert record.tag_counts["001"] == 1
+        assert record.tag_positions["949"] == [8, 11]
+        assert record.field_dicts[0] == {"001": "on1381158740"}
+
+    @pytest.mark.parametrize(
+        "tag, code",
+        [
+            ("949", "v"),
+            ("949", "l"),
+            ("949", "x"),
+            ("960", "t"),
+            ("650", "v"),
+        ],
+    )
+    def test_get_subfields_matches_dict2subfield(
+        self, stub_record_multiple_items, tag, code
+    ):
+        stub_record_multiple_items.get_fields("949")[1].delete_subfield("l")
+        fields = stub_record_multiple_items.as_dict()["fields"]
+        record = NormalizedRecord(fields)
+        expected = []
+        for field in fields:
+            if tag in field:
+                expected.extend(dict2subfield(field, code))
+        assert record.get_subfields(tag, code) == expected
+        assert record.subfield_index[(tag, code)] == expected
+
+    def test_get_subfields_padding(self, stub_record_multiple_items):
+        stub_record_multiple_items.get_fields("949")[0].delete_subfield("l")
+        record = NormalizedRecord(stub_record_multiple_items.fields)
+        assert record.get_subfields("949", "l") == [None, "rcmf2"]
+
+    def test_normalize_record(self, stub_record):
+        record = normalize_record(stub_record.fields)
+        assert isinstance(record, NormalizedRecord)
+        assert normalize_record(record) is record
+
+    def test_get_record_type(self, stub_aux_other_record):
+        record = NormalizedRecord(stub_aux_other_record.fields)
+        assert get_record_type(record) == "auxam_other"
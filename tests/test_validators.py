@@ -2,12 +2,31 @@ from contextlib import nullcontext as does_not_raise
 
 import pytest
 from pydantic import ValidationError
-
+from pydantic_core import PydanticCustomError
+from pymarc import Field as MarcField
+from pymarc import Leader, Subfield
+
+from benchmarks.generator import RECORD_TYPES, generate_records
+from record_validator.cache import FieldCache
+from record_validator.constants import (
+    LEADER_BYTES,
+    LEADER_CHARACTERS,
+    character_class,
+)
 from record_validator.validators import (
+    apply_error_budget,
+    check_leader,
+    fields_are_valid,
+    find_leader_error,
+    iter_errors,
+    iter_order_item_violations,
+    tags_are_valid,
     validate_all,
     validate_fields,
+    validate_fixed_fields,
     validate_leader,
     validate_order_items,
+    validate_tags,
 )
 
 
@@ -22,6 +41,65 @@ def test_validate_leader(stub_record):
     assert isinstance(valid_leader_marc, str)
 
 
+@pytest.mark.parametrize(
+    "leader,position",
+    [
+        ("00454cam a22001575i 4500", None),
+        ("00454cam\ta22001575i\u30004500", None),
+        ("a0454cam a22001575i 4500", 0),
+        ("00454bam a22001575i 4500", 5),
+        ("00454cam b22001575i 4500", 9),
+        ("00454cam a22001575i 4501", 23),
+        ("00454cam a22001575i 4500foo", None),
+        ("00454cam a2200", 14),
+        ("", 0),
+    ],
+)
+def test_find_leader_error(leader, position):
+    assert find_leader_error(leader) == position
+
+
+def test_find_leader_error_bytes(stub_record):
+    data = stub_record.as_marc21()
+    assert find_leader_error(data) is None
+    assert find_leader_error(memoryview(data)) is None
+    assert find_leader_error(bytearray(data[:24])) is None
+    assert find_leader_error(data[:7] + b"x" + data[8:]) == 7
+    assert find_leader_error(data[:20]) == 20
+    assert find_leader_error("00454cam\u3000a22001575i 4500".encode()) == 8
+
+
+def test_leader_characters():
+    assert [character_class(i) for i in LEADER_CHARACTERS] == (
+        ["[0-9]"] * 5
+        + ["[acdnp]", "[ac-gi-kmoprt]", "[a-dims]", "[\\sa]", "[\\sa]", "[2]", "[2]"]
+        + ["[0-9]"] * 5
+        + ["[\\s1-8uz]", "[\\sacinu]", "[\\sa-c]", "[4]", "[5]", "[0]", "[0]"]
+    )
+    assert [
+        i == frozenset(map(chr, j)) for i, j in zip(LEADER_CHARACTERS, LEADER_BYTES)
+    ]
+
+
+def test_find_leader_error_each_position():
+    characters = "0123456789abcdefghijklmnopqrstuvwxyz \t\x1c\x85\xa0\u2028\u3000"
+    for position, allowed in enumerate(LEADER_CHARACTERS):
+        for char in characters:
+            leader = list("00454cam a22001575i 4500")
+            leader[position] = char
+            expected = None if char in allowed else position
+            assert find_leader_error("".join(leader)) == expected
+
+
+def test_check_leader():
+    assert check_leader("00454cam a22001575i 4500") == "00454cam a22001575i 4500"
+    with pytest.raises(PydanticCustomError) as e:
+        check_leader("00454cax a22001575i 4501")
+    assert e.value.type == "string_pattern_mismatch"
+    assert e.value.context == {"pattern": "[a-dims]", "position": 7}
+    assert e.value.message() == "Invalid character at position 7, expected [a-dims]"
+
+
 class TestValidateMonograph:
     def test_validate_all(self, stub_record):
         with does_not_raise():
@@ -404,3 +482,287 @@ class TestValidateAuxamOther:
                 "910",
             ]
         )
+
+
+def _remove_subfield(tag, code):
+    def mutate(record):
+        record[tag].delete_subfield(code)
+
+    return mutate
+
+
+def _replace_subfield(tag, code, value):
+    def mutate(record):
+        record[tag].delete_subfield(code)
+        record[tag].add_subfield(code, value)
+
+    return mutate
+
+
+MUTATIONS = [
+    lambda record: None,
+    lambda record: record.remove_fields("980"),
+    lambda record: record.remove_fields("949"),
+    lambda record: record.add_field(record["960"]),
+    _remove_subfield("960", "t"),
+    _replace_subfield("960", "t", "foo"),
+    _replace_subfield("960", "t", "MAL"),
+    _remove_subfield("949", "h"),
+    _replace_subfield("949", "i", "123"),
+    _replace_subfield("300", "a", "5 pages"),
+    _replace_subfield("852", "h", "ReCAP 24-"),
+    _replace_subfield("901", "a", "AUXAM"),
+    lambda record: _replace_subfield("300", "a", "5 pages")(record)
+    or record.remove_fields("949", "852"),
+    lambda record: record.add_field(
+        MarcField(tag="09a", indicators=[" ", " "], subfields=[Subfield("a", "b")])
+    ),
+]
+
+
+class TestFieldsAreValid:
+    @pytest.mark.parametrize("mutate", MUTATIONS)
+    @pytest.mark.parametrize("as_dict", [True, False])
+    def test_fields_are_valid_matches_validate_all(self, stub_record, mutate, as_dict):
+        mutate(stub_record)
+        fields = stub_record.as_dict()["fields"] if as_dict else stub_record.fields
+        try:
+            validate_all(fields)
+            expected = True
+        except ValidationError:
+            expected = False
+        assert fields_are_valid(fields) is expected
+        cache = FieldCache()
+        assert fields_are_valid(fields, cache=cache) is expected
+        assert fields_are_valid(fields, cache=cache) is expected
+
+    @pytest.mark.parametrize("mutate", MUTATIONS)
+    def test_tags_are_valid_matches_validate_tags(self, stub_record, mutate):
+        mutate(stub_record)
+        for record_type in ["evp_monograph", "evp_other", "auxam_other"]:
+            tag_counts = {
+                i.tag: len(stub_record.get_fields(i.tag)) for i in stub_record
+            }
+            errors = validate_tags(tag_counts, record_type)
+            assert tags_are_valid(tag_counts, record_type) is (errors == [])
+
+    def test_iter_order_item_violations(self, stub_record):
+        stub_record["960"].delete_subfield("t")
+        stub_record["960"].add_subfield("t", "MAF")
+        stub_record["949"].delete_subfield("l")
+        stub_record["949"].delete_subfield("h")
+        stub_record["949"].delete_subfield("t")
+        violations = iter_order_item_violations(stub_record.fields)
+        assert next(violations) == (
+            "order_item_mismatch",
+            {"order_location": "MAF", "item_location": None, "item_type": None},
+        )
+        assert list(violations) == [("item_agency", "MAF")]
+
+    def test_iter_order_item_violations_no_items(self, stub_pamphlet_record):
+        assert list(iter_order_item_violations(stub_pamphlet_record.fields)) == []
+
+
+class TestErrorBudget:
+    @pytest.fixture
+    def stub_invalid_record(self, stub_record):
+        stub_record.remove_fields("980", "910")
+        stub_record["960"].delete_subfield("s")
+        stub_record["960"].add_subfield("s", "foo")
+        stub_record["949"].delete_subfield("i")
+        stub_record["949"].add_subfield("i", "123")
+        return stub_record
+
+    @pytest.mark.parametrize(
+        "max_errors, expected",
+        [
+            (
+                None,
+                ["missing", "missing", "string_too_short", "string_pattern_mismatch"],
+            ),
+            (1, ["missing", "error_budget_exceeded"]),
+            (2, ["missing", "missing", "error_budget_exceeded"]),
+            (3, ["missing", "missing", "string_too_short", "error_budget_exceeded"]),
+            (4, ["missing", "missing", "string_too_short", "string_pattern_mismatch"]),
+            (5, ["missing", "missing", "string_too_short", "string_pattern_mismatch"]),
+        ],
+    )
+    def test_validate_all_max_errors(self, stub_invalid_record, max_errors, expected):
+        with pytest.raises(ValidationError) as e:
+            validate_all(stub_invalid_record.fields, max_errors=max_errors)
+        assert [i["type"] for i in e.value.errors()] == expected
+
+    def test_validate_all_max_errors_stops_adapter_loop(self, stub_invalid_record):
+        cache = FieldCache()
+        with pytest.raises(ValidationError):
+            validate_all(stub_invalid_record.fields, cache=cache, max_errors=1)
+        assert cache.misses == 0
+
+    @pytest.mark.parametrize("max_errors", [1, 2])
+    def test_validate_all_max_errors_exact_other(
+        self, stub_pamphlet_record, max_errors
+    ):
+        stub_pamphlet_record.remove_fields("980")
+        with pytest.raises(ValidationError) as e:
+            validate_all(stub_pamphlet_record.fields, max_errors=max_errors)
+        assert [i["type"] for i in e.value.errors()] == ["missing"]
+
+    def test_validate_all_max_errors_ctx(self, stub_invalid_record):
+        with pytest.raises(ValidationError) as e:
+            validate_all(stub_invalid_record.fields, max_errors=1)
+        error = e.value.errors()[-1]
+        assert error["ctx"] == {"max_errors": 1}
+        assert error["msg"] == "Validation stopped after 1 errors"
+
+    @pytest.mark.parametrize(
+        "max_errors, expected",
+        [
+            (1, ["value_error", "error_budget_exceeded"]),
+            (2, ["value_error", "order_item_mismatch"]),
+            (3, ["value_error", "order_item_mismatch"]),
+        ],
+    )
+    def test_validate_all_max_errors_order_items(
+        self, stub_record, max_errors, expected
+    ):
+        stub_record["960"].delete_subfield("t")
+        stub_record["960"].add_subfield("t", "MAL")
+        stub_record["949"].delete_subfield("h")
+        with pytest.raises(ValidationError) as e:
+            validate_all(stub_record.fields, max_errors=max_errors)
+        assert [i["type"] for i in e.value.errors()] == expected
+
+    def test_validate_all_max_errors_valid(self, stub_record):
+        assert validate_all(stub_record.fields, max_errors=1) == stub_record.fields
+
+    def test_validate_all_invalid_max_errors(self, stub_record):
+        with pytest.raises(ValueError):
+            validate_all(stub_record.fields, max_errors=0)
+
+    def test_validate_order_items_max_errors(self, stub_record_multiple_items):
+        stub_record_multiple_items["960"].delete_subfield("t")
+        stub_record_multiple_items["960"].add_subfield("t", "MAL")
+        fields = stub_record_multiple_items.fields
+        assert len(validate_order_items(fields, error_locs=[])) == 2
+        assert len(validate_order_items(fields, error_locs=[], max_errors=1)) == 1
+
+    @pytest.mark.parametrize(
+        "max_errors, truncated, expected",
+        [
+            (None, True, ["a", "b", "c"]),
+            (3, False, ["a", "b", "c"]),
+            (4, True, ["a", "b", "c", "error_budget_exceeded"]),
+            (2, False, ["a", "b", "error_budget_exceeded"]),
+        ],
+    )
+    def test_apply_error_budget(self, max_errors, truncated, expected):
+        errors = apply_error_budget(["a", "b", "c"], max_errors, truncated=truncated)
+        assert [i if isinstance(i, str) else i["type"].type for i in errors] == (
+            expected
+        )
+
+
+class TestIterErrors:
+    def _validate_all_errors(self, fields, **kwargs):
+        try:
+            validate_all(fields, **kwargs)
+        except ValidationError as e:
+            return self._comparable(e.errors())
+        return []
+
+    def _comparable(self, errors):
+        return [{**i, "ctx": repr(i.get("ctx"))} for i in errors]
+
+    @pytest.mark.parametrize("engine", ["pydantic", "rules"])
+    @pytest.mark.parametrize("max_errors", [None, 1, 3])
+    @pytest.mark.parametrize("record_type", RECORD_TYPES)
+    def test_iter_errors_matches_validate_all(self, record_type, max_errors, engine):
+        kwargs = {"max_errors": max_errors, "engine": engine}
+        for record in generate_records(record_type, 10, error_rate=0.5, seed=1):
+            expected = self._validate_all_errors(record.fields, **kwargs)
+            assert self._comparable(iter_errors(record.fields, **kwargs)) == expected
+
+    @pytest.mark.parametrize("max_errors", [None, 1, 2])
+    def test_iter_errors_order_items(self, stub_record, max_errors):
+        stub_record["960"].delete_subfield("t")
+        stub_record["960"].add_subfield("t", "MAL")
+        stub_record["949"].delete_subfield("h")
+        expected = self._validate_all_errors(stub_record.fields, max_errors=max_errors)
+        errors = iter_errors(stub_record.fields, max_errors=max_errors)
+        assert self._comparable(errors) == expected
+
+    def test_iter_errors_is_lazy(self, stub_record):
+        cache = FieldCache()
+        stub_record.remove_fields("980")
+        errors = iter_errors(stub_record.fields, cache=cache)
+        assert next(errors)["msg"] == "Field required: 980"
+        assert cache.misses == 0
+
+    def test_iter_errors_valid(self, stub_record):
+        assert list(iter_errors(stub_record.fields)) == []
+
+    @pytest.mark.parametrize(
+        "kwargs", [{"max_errors": 0}, {"engine": "foo"}], ids=["max_errors", "engine"]
+    )
+    def test_iter_errors_invalid_args(self, stub_record, kwargs):
+        with pytest.raises(ValueError):
+            iter_errors(stub_record.fields, **kwargs)
+
+
+class TestValidateFixedFields:
+    VM_LEADER = "00454cgm a22001575i 4500"
+
+    @pytest.mark.parametrize("as_dict", [True, False])
+    def test_validate_fixed_fields(self, stub_record, as_dict):
+        fields = stub_record.as_dict()["fields"] if as_dict else stub_record.fields
+        assert validate_fixed_fields(fields, stub_record.leader) == []
+        errors = validate_fixed_fields(fields, self.VM_LEADER)
+        assert len(errors) == 1
+        assert errors[0]["loc"] == ("008", "value")
+        assert errors[0]["input"] == stub_record["008"].data
+        assert errors[0]["type"].context == {"pattern": "[\\-0-9n|]", "position": 18}
+
+    @pytest.mark.parametrize(
+        "leader", ["00454cxm a22001575i 4500", "", Leader("00454cam a22001575i 4500")]
+    )
+    def test_validate_fixed_fields_no_errors(self, stub_record, leader):
+        assert validate_fixed_fields(stub_record.fields, leader) == []
+
+    def test_validate_fixed_fields_invalid_008(self, stub_record):
+        stub_record["008"].data = stub_record["008"].data[:-1] + "!"
+        assert validate_fixed_fields(stub_record.fields, self.VM_LEADER) == []
+        stub_record["008"].data = stub_record["008"].data[:20]
+        assert validate_fixed_fields(stub_record.fields, self.VM_LEADER) == []
+
+    @pytest.mark.parametrize("engine", ["pydantic", "rules"])
+    def test_validate_all_leader(self, stub_record, engine):
+        validate_all(stub_record.fields, leader=stub_record.leader, engine=engine)
+        with pytest.raises(ValidationError) as e:
+            validate_all(stub_record.fields, leader=self.VM_LEADER, engine=engine)
+        errors = e.value.errors()
+        assert len(errors) == 1
+        assert errors[0]["type"] == "string_pattern_mismatch"
+        assert errors[0]["loc"] == ("008", "value")
+        assert errors[0]["msg"] == (
+            "Invalid character at position 18, expected [\\-0-9n|]"
+        )
+        assert list(iter_errors(stub_record.fields, leader=self.VM_LEADER)) == errors
+
+    def test_validate_all_leader_max_errors(self, stub_record):
+        stub_record.remove_fields("980")
+        with pytest.raises(ValidationError) as e:
+            validate_all(stub_record.fields, leader=self.VM_LEADER, max_errors=1)
+        assert [i["type"] for i in e.value.errors()] == [
+            "missing",
+            "error_budget_exceeded",
+        ]
+        with pytest.raises(ValidationError) as e:
+            validate_all(stub_record.fields, leader=self.VM_LEADER, max_errors=2)
+        assert [i["type"] for i in e.value.errors()] == [
+            "missing",
+            "string_pattern_mismatch",
+        ]
+
+    def test_fields_are_valid_leader(self, stub_record):
+        assert fields_are_valid(stub_record.fields, leader=stub_record.leader) is True
+        assert fields_are_valid(stub_record.fields, leader=self.VM_LEADER) is False